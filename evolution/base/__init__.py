@@ -1,13 +1,23 @@
 from .base_algorithm import BaseAlgorithm
+from .base_evaluation import EvaluationBackend, SerialEvaluation, ThreadPoolEvaluation, ProcessPoolEvaluation
+from .base_gene_mask import GeneMask
 from .base_genome import BaseGenome
 from .base_genome_factory import BaseGenomeFactory
 from .base_genome_parameters import BaseGenomeParameters
-from .base_geometry import BaseGeometry, DenseGeometry, PlaneGeometry
+from .base_geometry import BaseGeometry, DenseGeometry, PlaneGeometry, SubsetGeometry, geometry_levels, \
+    connection_lengths
 from .base_result import BaseResult
+from .base_steady_state import SteadyStateEvolution
 from .base_strategies import PopulateStrategy, SelectionStrategy, CrossoverStrategy, MutationStrategy, \
-    FitnessStrategy, TerminationStrategy
+    FitnessStrategy, TerminationStrategy, RestartStrategy, EdgeExtractionStrategy, \
+    SurrogateModel, DetailSchedule
+from .base_surrogate_evaluation import SurrogateEvaluation, SurrogateAccuracy
 from .base_translator import BaseTranslator
 
 __all__ = ["BaseAlgorithm", "BaseGenome", "BaseGenomeParameters", "BaseGeometry", "DenseGeometry", "PlaneGeometry",
            "BaseGenomeFactory", "BaseResult", "BaseTranslator", "FitnessStrategy", "SelectionStrategy",
-           "MutationStrategy", "CrossoverStrategy", "PopulateStrategy", "TerminationStrategy"]
+           "MutationStrategy", "CrossoverStrategy", "PopulateStrategy", "TerminationStrategy",
+           "RestartStrategy", "EvaluationBackend", "SerialEvaluation", "ThreadPoolEvaluation",
+           "ProcessPoolEvaluation", "SteadyStateEvolution", "EdgeExtractionStrategy",
+           "SurrogateModel", "SurrogateEvaluation", "SurrogateAccuracy", "GeneMask",
+           "SubsetGeometry", "geometry_levels", "connection_lengths", "DetailSchedule"]
@@ -1,13 +1,15 @@
+import time
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 
 import numpy as np
 
+from evolution.base.base_evaluation import EvaluationBackend
 from evolution.base.base_genome import BaseGenome
 from evolution.base.base_genome_factory import BaseGenomeFactory
 from evolution.base.base_result import BaseResult
 from evolution.base.base_strategies import PopulateStrategy, SelectionStrategy, CrossoverStrategy, MutationStrategy, \
-    TerminationStrategy, Population
+    TerminationStrategy, RestartStrategy, Population
 from evolution.base.base_translator import BaseTranslator
 
 
@@ -20,12 +22,21 @@ class BaseAlgorithm(ABC):
                  crossover_strategy: CrossoverStrategy,
                  mutation_strategy: MutationStrategy,
                  termination_strategy: TerminationStrategy,
-                 print_info: bool = False) -> None:
+                 print_info: bool = False,
+                 restart_strategy: Optional[RestartStrategy] = None,
+                 evaluation_backend: Optional[EvaluationBackend] = None,
+                 evaluation_chunk_size: Optional[int] = None) -> None:
         """
         Instantiates a new algorithm with a given translator and genome factory.
         The translator will be used to transform the raw genome data to meaningful variables.
         :param translator: The translator for transforming dna to meaningful variables
         :param genome_factory: A factory for creating genomes
+        :param restart_strategy: Optional strategy, which replaces a stagnating population with a new one
+        :param evaluation_backend: Optional backend for evaluating populations, e.g. in parallel. If None, every
+            genome is evaluated with fitness in the calling thread
+        :param evaluation_chunk_size: If set, populations are evaluated in chunks of this size. Between chunks, the
+            termination strategy may interrupt the generation (see TerminationStrategy.should_interrupt), e.g. for
+            deadlines. If None, generations are only interrupted between whole populations
         """
         super().__init__()
 
@@ -34,10 +45,18 @@ class BaseAlgorithm(ABC):
         self.crossover_strategy = crossover_strategy
         self.mutation_strategy = mutation_strategy
         self.termination_strategy = termination_strategy
+        self.restart_strategy = restart_strategy
+        self.evaluation_backend = evaluation_backend
+        self.evaluation_chunk_size = evaluation_chunk_size
 
         self.translator = translator
         self.genome_factory = genome_factory
         self._best_fitness = -np.inf
+        self._survivor_fitness = -np.inf
+        self._n_evaluations = 0
+        self._fitness_invalidated = False
+        self._run_start_time = time.monotonic()
+        self._run_start_evaluations = 0
 
         self.print_info = print_info
 
@@ -49,36 +68,125 @@ class BaseAlgorithm(ABC):
         """
         raise NotImplemented
 
+    @property
+    def n_evaluations(self):
+        """
+        The number of fitness evaluations performed so far
+        """
+        return self._n_evaluations
+
+    @property
+    def best_fitness(self) -> float:
+        """
+        The best fitness of the current run (since the last fitness invalidation)
+        """
+        return self._best_fitness
+
+    @property
+    def fitness_invalidated(self) -> bool:
+        """
+        True, if invalidate_fitness was called and not applied yet (see apply_fitness_invalidation)
+        """
+        return self._fitness_invalidated
+
+    def add_evaluations(self, n_evaluations: int) -> None:
+        """
+        Counts fitness evaluations, which were performed outside of run, e.g. by SteadyStateEvolution.
+        """
+        self._n_evaluations += n_evaluations
+
+    def observe_fitness(self, genome: BaseGenome, genome_fitness: float) -> None:
+        """
+        Updates the best fitness with an evaluated genome and calls on_best_genome_found, if it is a new best genome.
+        """
+        if genome_fitness > self._best_fitness:
+            self._best_fitness = genome_fitness
+            self.on_best_genome_found(genome, genome_fitness)
+
+    def validate_evaluation_backend(self) -> None:
+        """
+        Raises a ValueError, if genomes can not be evaluated one by one with fitness by an evaluation backend, e.g.
+        because evaluate_population scores populations with a different scoring scheme.
+        """
+        pass
+
+    def evaluate_population(self, population: Population) -> List[float]:
+        """
+        Calculates the fitness values for a whole population. Evaluates every genome with fitness by default.
+        Override this method to evaluate populations in batches or with a cheaper scoring scheme.
+        :param population: The population to evaluate
+        :return: List of fitness values, the ith value belongs to the ith genome in population
+        """
+        if self.evaluation_backend is not None:
+            return self.evaluation_backend.evaluate(population)
+        return [self.fitness(genome) for genome in population]
+
     def run(self, start_dna: np.array) -> BaseResult:
         """
         Stars and runs the algorithm. Calls all installed callbacks.
         :return:
         """
+        start_dna = self.prepare_run(start_dna)
+        if self.evaluation_backend is not None:
+            self.evaluation_backend.start(self)
+        try:
+            return self._run(start_dna)
+        finally:
+            if self.evaluation_backend is not None:
+                self.evaluation_backend.shutdown()
+
+    def _run(self, start_dna: np.array) -> BaseResult:
         population = self.populate_strategy.populate(self.genome_factory, start_dna)
 
         current_generation = 0
 
         result = BaseResult()
-        while not self.termination_strategy.should_terminate(current_generation, self._best_fitness):
+        while not (self.check_interrupt()
+                   or self.termination_strategy.should_terminate(current_generation, self._best_fitness)):
             if self.print_info:
                 print("Running generation No.{:4}".format(current_generation))
 
-            population_fitness = [self.fitness(genome) for genome in population]
+            population_fitness, interrupted = self._evaluate_in_chunks(population)
+            # An interrupted generation only consists of the genomes evaluated so far
             population_fitness, population = (list(t) for t in
                                               zip(*sorted(zip(population_fitness, population), reverse=True)))
 
             current_best_fitness = population_fitness[0]
 
-            result.add_generation(current_generation, population[0], population_fitness[0], population[0],
+            best_genome = self.genome_factory.expand_genome(population[0])
+            result.add_generation(current_generation, best_genome, population_fitness[0], best_genome,
                                   population_fitness[0])
 
-            if current_best_fitness > self._best_fitness:
-                self._best_fitness = current_best_fitness
-                self.on_best_genome_found(population[0], population_fitness[0])
+            self.observe_fitness(population[0], current_best_fitness)
+
+            if interrupted:
+                if self.print_info:
+                    print("Interrupted generation No.{:4}".format(current_generation))
+                break
 
+            self.on_population_evaluated(current_generation, population, population_fitness)
+            fitness_invalidated = self.apply_fitness_invalidation(result, self.evaluation_backend)
             self.on_display_population(current_generation, population, population_fitness)
 
+            genome_bounds = self.genome_factory.genome_bounds
+            if not fitness_invalidated:
+                self.termination_strategy.observe_population(population, population_fitness, genome_bounds)
+            if self.restart_strategy is not None:
+                self.restart_strategy.observe_population(population, population_fitness, genome_bounds)
+                n_run_evaluations = self._n_evaluations - self._run_start_evaluations
+                if self.restart_strategy.budget_exhausted(n_run_evaluations + len(population)):
+                    break
+                if self.restart_strategy.should_restart(current_generation, self._best_fitness, n_run_evaluations):
+                    if self.print_info:
+                        print("Restarting in generation No.{:4}".format(current_generation))
+                    population = self.restart_strategy.restart(self.genome_factory, population[0])
+                    self._survivor_fitness = -np.inf
+                    current_generation += 1
+                    continue
+
             next_generation = population[:2]
+            if not fitness_invalidated:
+                self._survivor_fitness = population_fitness[len(next_generation) - 1]
 
             for j in range((len(population) // 2) - 1):
                 parent_a, parent_b = self.selection_strategy.select(population, population_fitness)
@@ -94,6 +202,84 @@ class BaseAlgorithm(ABC):
 
         return result
 
+    def prepare_run(self, start_dna: np.array) -> np.array:
+        """
+        Prepares a run, before the initial population is created or the algorithm is sent to other processes:
+        frozen genes are fixed, the run's clock and evaluation counter are started, the restart strategy is reset
+        and on_run_started is called.
+        :return: The free sub-vector of the start dna
+        """
+        start_dna = self.genome_factory.bind_frozen_genes(start_dna)
+        self._run_start_time = time.monotonic()
+        self._run_start_evaluations = self._n_evaluations
+        if self.restart_strategy is not None:
+            self.restart_strategy.start_run()
+        self.on_run_started()
+        return start_dna
+
+    def check_interrupt(self) -> bool:
+        """
+        Passes the number of evaluations and the elapsed time of the current run to the termination strategy.
+        :return: True, if the termination strategy asks to stop immediately
+        """
+        self.termination_strategy.observe_progress(self._n_evaluations - self._run_start_evaluations,
+                                                   time.monotonic() - self._run_start_time)
+        return self.termination_strategy.should_interrupt()
+
+    def _evaluate_in_chunks(self, population: Population):
+        # Returns the fitness of the evaluated genomes (a prefix of the population) and whether it was interrupted
+        chunk_size = self.evaluation_chunk_size or len(population)
+        population_fitness = []
+        for chunk_start in range(0, len(population), chunk_size):
+            chunk = population[chunk_start:chunk_start + chunk_size]
+            n_true_evaluations = self._n_true_evaluations(self.evaluation_backend)
+            population_fitness += self.evaluate_population(chunk)
+            if n_true_evaluations is None:
+                self._n_evaluations += len(chunk)
+            else:
+                self._n_evaluations += self._n_true_evaluations(self.evaluation_backend) - n_true_evaluations
+            if chunk_start + chunk_size < len(population) and self.check_interrupt():
+                return population_fitness, True
+        return population_fitness, False
+
+    @staticmethod
+    def _n_true_evaluations(evaluation_backend: Optional[EvaluationBackend]) -> Optional[int]:
+        # Backends may skip genomes (see SurrogateEvaluation), only their true evaluations count
+        return None if evaluation_backend is None else evaluation_backend.n_true_evaluations
+
+    def invalidate_fitness(self):
+        """
+        Call this method if the fitness function changes during a run (e.g. when switching to another level of
+        detail). Fitness values before and after are not comparable, therefore the best fitness, the termination and
+        restart strategies and the result's best genome are reset after the current generation.
+        """
+        self._fitness_invalidated = True
+
+    def apply_fitness_invalidation(self, result: BaseResult, evaluation_backend: Optional[EvaluationBackend]) -> bool:
+        """
+        Resets everything, which depends on previous fitness values, if invalidate_fitness was called.
+        The evaluation backend is bound again, so that other processes receive the changed fitness function.
+        :return: True, if the fitness was invalidated
+        """
+        if not self._fitness_invalidated:
+            return False
+        self._fitness_invalidated = False
+        self._best_fitness = -np.inf
+        self._survivor_fitness = -np.inf
+        self.termination_strategy.reset()
+        if self.restart_strategy is not None:
+            self.restart_strategy.reset()
+        result.reset_best()
+        if evaluation_backend is not None:
+            evaluation_backend.start(self)
+        return True
+
+    def __getstate__(self):
+        # Backends hold pools and connections, they are never sent to other processes
+        state = self.__dict__.copy()
+        state["evaluation_backend"] = None
+        return state
+
     # ####################### Callbacks ########################
 
     def on_display_population(self, current_generation: int, population: Population, population_fitness: List[float]):
@@ -111,6 +297,24 @@ class BaseAlgorithm(ABC):
         """
         pass
 
+    def on_run_started(self):
+        """
+        This callback is called once before the initial population is created. Reset per-run state here.
+        """
+        pass
+
+    def on_population_evaluated(self, current_generation: int, population: Population,
+                                population_fitness: List[float]):
+        """
+        This callback is called every generation after the population was evaluated and sorted, before the
+        termination is checked. Call invalidate_fitness here, if the fitness function changes for the next generation.
+
+        :param current_generation: Current number of generation / iteration
+        :param population: Fresh population, sorted w.r.t. the fitness value
+        :param population_fitness: List of the fitness values for the population
+        """
+        pass
+
     def on_best_genome_found(self, genome: BaseGenome, genome_fitness: float):
         """
         This callback is called if a new best genome was found.
@@ -0,0 +1,152 @@
+import multiprocessing
+import pickle
+from abc import ABC as AbstractBaseClass, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, Executor
+from multiprocessing.context import BaseContext
+from typing import List, Optional, Union
+
+from evolution.base.base_genome import BaseGenome
+
+
+class EvaluationBackend(AbstractBaseClass):
+    """
+    An evaluation backend computes fitness values for an algorithm, e.g. in parallel.
+
+    The algorithm binds itself with start before the first evaluation and calls shutdown when it is done.
+    Genomes are submitted one by one (submit) or as a whole population (evaluate).
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self._algorithm = None
+
+    def start(self, algorithm) -> None:
+        """
+        Binds the backend to an algorithm, whose fitness method is used for all evaluations.
+        :param algorithm: The algorithm, a BaseAlgorithm
+        """
+        self._algorithm = algorithm
+
+    @abstractmethod
+    def submit(self, genome: BaseGenome) -> Future:
+        """
+        Schedules the evaluation of a single genome.
+        :param genome: The genome
+        :return: A future, which resolves to the genome's fitness
+        """
+        raise NotImplementedError
+
+    @property
+    def n_true_evaluations(self) -> Optional[int]:
+        """
+        The number of genomes truly evaluated by evaluate so far, for backends which evaluate only some of the given
+        genomes (see SurrogateEvaluation). None, if every given genome is evaluated
+        """
+        return None
+
+    def evaluate(self, population: List[BaseGenome]) -> List[float]:
+        """
+        Evaluates a whole population and waits for all results.
+        :param population: The population
+        :return: List of fitness values, the ith value belongs to the ith genome in population
+        """
+        futures = [self.submit(genome) for genome in population]
+        return [future.result() for future in futures]
+
+    def shutdown(self) -> None:
+        pass
+
+
+class SerialEvaluation(EvaluationBackend):
+    """
+    Evaluates every genome immediately in the calling thread.
+    """
+    def submit(self, genome: BaseGenome) -> Future:
+        future = Future()
+        try:
+            future.set_result(self._algorithm.fitness(genome))
+        except Exception as exception:
+            future.set_exception(exception)
+        return future
+
+
+class ThreadPoolEvaluation(EvaluationBackend):
+    """
+    Evaluates genomes on a pool of threads. Useful if the fitness function releases the GIL (e.g. OpenCV).
+    The algorithm's fitness method has to be thread safe.
+    """
+    def __init__(self, n_workers: Optional[int] = None) -> None:
+        super().__init__()
+        self._n_workers = n_workers or multiprocessing.cpu_count()
+        self._executor: Optional[Executor] = None
+
+    @property
+    def n_workers(self):
+        return self._n_workers
+
+    def start(self, algorithm) -> None:
+        super().start(algorithm)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self._n_workers)
+
+    def submit(self, genome: BaseGenome) -> Future:
+        return self._executor.submit(self._algorithm.fitness, genome)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+# The algorithm of a ProcessPoolEvaluation worker process, installed once by _initialize_worker
+_worker_algorithm = None
+
+
+def _initialize_worker(algorithm_bytes: bytes):
+    global _worker_algorithm
+    _worker_algorithm = pickle.loads(algorithm_bytes)
+
+
+def _evaluate_dna(dna) -> float:
+    return _worker_algorithm.fitness(_worker_algorithm.genome_factory.create(dna))
+
+
+class ProcessPoolEvaluation(EvaluationBackend):
+    """
+    Evaluates genomes on a pool of worker processes.
+
+    The algorithm is pickled and sent to every worker once on start. Afterwards, only dna arrays and fitness values
+    are exchanged.
+    """
+    def __init__(self, n_workers: Optional[int] = None, mp_context: Union[str, BaseContext, None] = None) -> None:
+        """
+        :param n_workers: The number of worker processes, defaults to the number of cpus
+        :param mp_context: Optional multiprocessing start method, e.g. "fork", "spawn" or "forkserver", or a
+            context, e.g. from evolution.camera.worker_context
+        """
+        super().__init__()
+        self._n_workers = n_workers or multiprocessing.cpu_count()
+        self._mp_context = mp_context
+        self._executor: Optional[Executor] = None
+
+    @property
+    def n_workers(self):
+        return self._n_workers
+
+    def start(self, algorithm) -> None:
+        super().start(algorithm)
+        self.shutdown()
+        context = self._mp_context
+        if context is None or isinstance(context, str):
+            context = multiprocessing.get_context(context)
+        self._executor = ProcessPoolExecutor(self._n_workers,
+                                             mp_context=context,
+                                             initializer=_initialize_worker,
+                                             initargs=(pickle.dumps(algorithm),))
+
+    def submit(self, genome: BaseGenome) -> Future:
+        return self._executor.submit(_evaluate_dna, genome.dna)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,112 @@
+from typing import List, Optional, Union, Dict
+
+import numpy as np
+
+
+class GeneMask:
+    """
+    Describes which genes of the full dna are evolved.
+
+    Frozen genes keep a fixed value. Tied genes always share the value of the first gene of their group (the
+    leader). All remaining genes and the group leaders are free. The evolution works on the free sub-vector only,
+    which is expanded to the full dna for translation.
+
+    Parameters files declare masks with two optional top level keys, e.g.
+        "frozen": ["d0", "d1", "d2", "d3"]      values are taken from the start dna, or
+        "frozen": {"cx": 400, "cy": 300}        with explicit values
+        "tied": [["fu", "fv"]]                  fv always equals fu
+    """
+    def __init__(self,
+                 gene_names: List[str],
+                 frozen: Optional[Union[List[str], Dict[str, float]]] = None,
+                 tied: Optional[List[List[str]]] = None) -> None:
+        """
+        :param gene_names: The names of all genes of the full dna
+        :param frozen: Names of the frozen genes, or a dict mapping names to fixed values
+        :param tied: Groups of gene names, which share one value
+        """
+        super().__init__()
+        self._gene_names = list(gene_names)
+        n_genes = len(self._gene_names)
+
+        self._frozen_values = np.full(n_genes, np.nan)
+        self._is_frozen = np.zeros(n_genes, dtype=bool)
+        frozen = frozen or []
+        for name in frozen:
+            index = self._index(name)
+            self._is_frozen[index] = True
+            if isinstance(frozen, dict):
+                self._frozen_values[index] = frozen[name]
+
+        leaders = np.arange(n_genes)
+        for group in tied or []:
+            indices = [self._index(name) for name in group]
+            if np.any(self._is_frozen[indices]):
+                raise ValueError("Tied genes {} must not be frozen".format(group))
+            if np.any(leaders[indices] != indices):
+                raise ValueError("Gene of {} is already tied to another group".format(group))
+            leaders[indices] = indices[0]
+
+        self._free_genes = np.flatnonzero(~self._is_frozen & (leaders == np.arange(n_genes)))
+        free_index = np.full(n_genes, -1)
+        free_index[self._free_genes] = np.arange(len(self._free_genes))
+        # For every gene, the index of the free gene it is copied from (-1 for frozen genes)
+        self._sources = np.where(self._is_frozen, -1, free_index[leaders])
+
+    def _index(self, name: str) -> int:
+        if name not in self._gene_names:
+            raise ValueError("Unknown gene '{}', use one of {}".format(name, self._gene_names))
+        return self._gene_names.index(name)
+
+    @property
+    def n_genes(self) -> int:
+        """
+        The number of genes of the full dna
+        """
+        return len(self._gene_names)
+
+    @property
+    def n_free_genes(self) -> int:
+        return len(self._free_genes)
+
+    @property
+    def free_genes(self) -> np.array:
+        """
+        Indices of the free genes in the full dna
+        """
+        return self._free_genes
+
+    @property
+    def is_frozen(self) -> np.array:
+        return self._is_frozen
+
+    @property
+    def frozen_values(self) -> np.array:
+        """
+        The fixed values of all frozen genes, nan for frozen genes without explicit value and for all other genes
+        """
+        return self._frozen_values
+
+    @property
+    def is_identity(self) -> bool:
+        return self.n_free_genes == self.n_genes
+
+    def reduce(self, dna: np.array) -> np.array:
+        """
+        :param dna: Full dna (..., n_genes)
+        :return: The free sub-vector (..., n_free_genes)
+        """
+        return np.asarray(dna)[..., self._free_genes]
+
+    def expand(self, free_dna: np.array, template_dna: np.array) -> np.array:
+        """
+        :param free_dna: Free sub-vector (..., n_free_genes)
+        :param template_dna: Full dna, which provides the values of all frozen genes
+        :return: Full dna (..., n_genes)
+        """
+        free_dna = np.asarray(free_dna)
+        dna = np.empty(free_dna.shape[:-1] + (self.n_genes,), dtype=np.result_type(free_dna, np.float64))
+        dna[...] = template_dna
+        evolved = ~self._is_frozen
+        dna[..., evolved] = free_dna[..., self._sources[evolved]]
+        return dna
@@ -14,6 +14,8 @@ class BaseGenomeFactory(AbstractBaseClass):
         """
         super().__init__()
         self._genome_parameters = genome_parameters
+        self._gene_mask = genome_parameters.gene_mask
+        self._template_dna = self._gene_mask.frozen_values.copy()
 
     def validate_bounds(self, genome: BaseGenome, bounds: np.array):
         """
@@ -50,6 +52,55 @@ class BaseGenomeFactory(AbstractBaseClass):
         empty_dna = np.zeros((self._genome_parameters.n_genes))
         return self.create(empty_dna, self._genome_parameters._default_display_name)
 
+    @property
+    def genome_parameters(self) -> BaseGenomeParameters:
+        return self._genome_parameters
+
     @property
     def genome_bounds(self):
         return self._genome_parameters.genome_bounds
+
+    @property
+    def gene_mask(self):
+        return self._gene_mask
+
+    def bind_frozen_genes(self, start_dna: np.array) -> np.array:
+        """
+        Takes the values of all frozen genes without explicit value in the parameters file from the start dna.
+        Called by the algorithm before the first genome is created.
+        :param start_dna: The full start dna (or its free sub-vector, if no frozen values are needed)
+        :return: The free sub-vector of the start dna
+        """
+        start_dna = np.asarray(start_dna, dtype=np.float64)
+        if start_dna.shape[-1] == self._gene_mask.n_genes:
+            self._template_dna = np.where(np.isnan(self._gene_mask.frozen_values), start_dna,
+                                          self._gene_mask.frozen_values)
+            return self._gene_mask.reduce(start_dna)
+        if np.any(np.isnan(self._template_dna[self._gene_mask.is_frozen])):
+            raise ValueError("The values of the frozen genes are unknown, pass the full start dna")
+        return start_dna
+
+    def reduce_dna(self, dna: np.array) -> np.array:
+        """
+        :param dna: Full dna (..., n_genes of the full dna)
+        :return: The free sub-vector, which is evolved
+        """
+        return self._gene_mask.reduce(dna)
+
+    def expand_dna(self, dna: np.array) -> np.array:
+        """
+        Expands the free sub-vector to the full dna. Full dna is returned as is.
+        :param dna: Free sub-vector (..., n_free_genes) or full dna
+        :return: Full dna (..., n_genes of the full dna)
+        """
+        if self._gene_mask.is_identity or np.shape(dna)[-1] == self._gene_mask.n_genes:
+            return dna
+        return self._gene_mask.expand(dna, self._template_dna)
+
+    def expand_genome(self, genome: BaseGenome) -> BaseGenome:
+        """
+        :return: The genome itself if no genes are masked, otherwise a new genome with the full dna
+        """
+        if self._gene_mask.is_identity:
+            return genome
+        return self.create(self.expand_dna(genome.dna))
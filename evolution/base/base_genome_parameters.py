@@ -1,9 +1,12 @@
+import copy
 import json as json
 from functools import cached_property
 from typing import Optional
 
 import numpy as np
 
+from evolution.base.base_gene_mask import GeneMask
+
 
 class BaseGenomeParameters:
     def __init__(self,
@@ -18,19 +21,34 @@ class BaseGenomeParameters:
     def default_display_name(self):
         return self._default_display_name
 
+    @cached_property
+    def gene_names(self):
+        return [g["name"] for g in self._parameters["dna"]]
+
+    @cached_property
+    def gene_mask(self) -> GeneMask:
+        """
+        The frozen and tied genes declared by the optional "frozen" and "tied" keys, see GeneMask
+        """
+        return GeneMask(self.gene_names, self._parameters.get("frozen"), self._parameters.get("tied"))
+
     @cached_property
     def n_genes(self):
-        return len(self._parameters["dna"])
+        """
+        The number of evolved (free) genes. All tables below only describe the free genes, a tied gene group is
+        described by its first gene.
+        """
+        return self.gene_mask.n_free_genes
 
     @cached_property
     def mutation_table(self):
-        dna_parameters = self._parameters["dna"]
+        dna_parameters = self._free_gene_parameters
         dna_mutation = [g["mutation"] for g in dna_parameters]
         return np.array([[m["low"], m["high"], m["probability"]] for m in dna_mutation]).T
 
     @cached_property
     def distributions(self):
-        dna_parameters = self._parameters["dna"]
+        dna_parameters = self._free_gene_parameters
         dna_mutation = [g["mutation"] for g in dna_parameters]
         distributions = []
         for m in dna_mutation:
@@ -43,6 +61,16 @@ class BaseGenomeParameters:
 
     @cached_property
     def genome_bounds(self):
-        dna_parameters = self._parameters["dna"]
+        dna_parameters = self._free_gene_parameters
         dna_bounds = [g["bounds"] for g in dna_parameters]
         return np.array([[m["low"], m["high"]] for m in dna_bounds]).T
+
+    def to_json(self) -> dict:
+        """
+        :return: A copy of the parameters, in the format of the parameters file
+        """
+        return copy.deepcopy(self._parameters)
+
+    @property
+    def _free_gene_parameters(self):
+        return [self._parameters["dna"][i] for i in self.gene_mask.free_genes]
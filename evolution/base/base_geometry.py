@@ -1,5 +1,5 @@
-import itertools
-from typing import List
+from functools import cached_property
+from typing import List, Optional, Sequence
 
 import numpy as np
 from abc import ABC as AbstractBaseClass, abstractmethod
@@ -34,6 +34,24 @@ class BaseGeometry(AbstractBaseClass):
         """
         return self._connections
 
+    @cached_property
+    def segments(self):
+        """
+        Access the geometries line segments as s x 2 array of world_point index pairs. Every connection with n
+        indices contributes n - 1 segments.
+        :return:
+        """
+        segments = [(a, b) for p_idx in self._connections for a, b in zip(p_idx[:-1], p_idx[1:])]
+        return np.array(segments, dtype=np.int64).reshape(-1, 2)
+
+    @cached_property
+    def segment_connections(self):
+        """
+        Access the index of the connection every segment belongs to
+        :return:
+        """
+        return np.repeat(np.arange(len(self._connections)), [max(len(p_idx) - 1, 0) for p_idx in self._connections])
+
     @abstractmethod
     def provide_world_points(self) -> np.array:
         """
@@ -51,6 +69,62 @@ class BaseGeometry(AbstractBaseClass):
         pass
 
 
+class SubsetGeometry(BaseGeometry):
+    """
+    A SubsetGeometry keeps all world points of another geometry, but only some of its connections.
+    This is used for coarse levels of detail, see geometry_levels.
+    """
+    def __init__(self, other: BaseGeometry, connection_indices: Sequence[int]) -> None:
+        self.other = other
+        self.connection_indices = np.sort(np.asarray(connection_indices, dtype=np.int64))
+        super().__init__()
+
+    def provide_world_points(self) -> np.array:
+        return self.other.world_points
+
+    def provide_connection_list(self) -> List[List[int]]:
+        return [self.other.connections[i] for i in self.connection_indices]
+
+
+def connection_lengths(geometry: BaseGeometry) -> np.array:
+    """
+    :return: The world space length of every connection of the geometry
+    """
+    segments = geometry.segments
+    lengths = np.linalg.norm(geometry.world_points[segments[:, 1]] - geometry.world_points[segments[:, 0]], axis=1)
+    return np.bincount(geometry.segment_connections, weights=lengths, minlength=len(geometry.connections))
+
+
+def geometry_levels(geometry: BaseGeometry, fractions: Sequence[float] = (0.3, 0.6, 1.0),
+                    importance: Optional[np.array] = None) -> List[BaseGeometry]:
+    """
+    Precomputes levels of detail, from coarse to fine.
+
+    Connections are ranked by importance. Every level keeps the most important connections, which together make up
+    at least the given fraction of the total importance. A fraction of 1 keeps the geometry itself.
+
+    :param geometry: The full geometry
+    :param fractions: Increasing fractions of the total importance, one per level
+    :param importance: One value per connection, e.g. user tagged weights or projected lengths
+        (see camera_kernels.projected_connection_lengths). Defaults to the world space length of every connection
+    :return: One geometry per fraction
+    """
+    if importance is None:
+        importance = connection_lengths(geometry)
+    importance = np.asarray(importance, dtype=np.float64)
+    order = np.argsort(-importance, kind="stable")
+    cumulative_share = np.cumsum(importance[order]) / max(np.sum(importance), 1e-12)
+
+    levels = []
+    for fraction in fractions:
+        if fraction >= 1.0:
+            levels.append(geometry)
+            continue
+        n_connections = min(int(np.searchsorted(cumulative_share, fraction - 1e-12)) + 1, len(order))
+        levels.append(SubsetGeometry(geometry, order[:n_connections]))
+    return levels
+
+
 class DenseGeometry(BaseGeometry):
     """
     A DenseGeometry samples the bounding volume for a given geometry in
@@ -65,7 +139,8 @@ class DenseGeometry(BaseGeometry):
         min_pts = np.min(self.other.world_points, axis=0)
         max_pts = np.max(self.other.world_points, axis=0)
         steps = np.linspace(min_pts, max_pts, self.n_samples)
-        return np.array([list(value) for value in list(itertools.product(*steps.T))])
+        grid = np.meshgrid(*steps.T, indexing="ij")
+        return np.stack(grid, axis=-1).reshape(-1, 3)
 
     def provide_connection_list(self) -> list:
         return []
@@ -86,11 +161,10 @@ class PlaneGeometry(BaseGeometry):
         min_pts = np.min(self.other.world_points, axis=0)
         max_pts = np.max(self.other.world_points, axis=0)
 
-        xz_steps = np.linspace([min_pts[0], min_pts[2]], [max_pts[0], max_pts[2]], self.n_samples)
-        xz_product = np.array([list(value) for value in list(itertools.product(*xz_steps.T))])
-        final_product = np.insert(xz_product, 1, self.height, axis=1)
-
-        return final_product
+        xs = np.linspace(min_pts[0], max_pts[0], self.n_samples)
+        zs = np.linspace(min_pts[2], max_pts[2], self.n_samples)
+        x_grid, z_grid = np.meshgrid(xs, zs, indexing="ij")
+        return np.stack((x_grid.ravel(), np.full(x_grid.size, float(self.height)), z_grid.ravel()), axis=1)
 
     def provide_connection_list(self) -> list:
         return []
@@ -15,6 +15,13 @@ class BaseResult:
             self._best_genome = best_genome
             self._best_fitness = best_fitness
 
+    def reset_best(self):
+        """
+        Forgets the best genome, e.g. because the fitness function changed and fitness values are not comparable
+        """
+        self._best_genome = None
+        self._best_fitness = -np.inf
+
     @property
     def best_genome(self):
         return self._best_genome, self._best_fitness
@@ -0,0 +1,208 @@
+from bisect import bisect_right
+from concurrent.futures import wait, FIRST_COMPLETED
+from typing import Optional, List
+
+import numpy as np
+
+from evolution.base.base_algorithm import BaseAlgorithm
+from evolution.base.base_evaluation import EvaluationBackend, SerialEvaluation
+from evolution.base.base_genome import BaseGenome
+from evolution.base.base_result import BaseResult
+
+
+class SteadyStateEvolution:
+    """
+    Asynchronous steady-state evolution without generational barriers.
+
+    In contrast to BaseAlgorithm.run, the population is never evaluated as a whole. Offspring are bred on demand from
+    the current population and submitted to the evaluation backend. Every finished evaluation is inserted into the
+    population immediately, so workers never wait for the slowest evaluation of a generation.
+
+    The algorithm's strategies are reused: populate, selection, crossover and mutation as usual. Termination is
+    checked once per "equivalent generation", i.e. every time population size many evaluations have finished.
+    Termination strategies may interrupt the run after every finished evaluation (see
+    TerminationStrategy.should_interrupt). Restart strategies are not supported. If the algorithm invalidates its
+    fitness (see BaseAlgorithm.invalidate_fitness), pending evaluations are drained and the population is evaluated
+    again. Genomes are evaluated one by one with the algorithm's fitness, algorithms which score whole populations
+    differently (see BaseAlgorithm.validate_evaluation_backend) are rejected.
+
+    Replacement schemes:
+    (A) "worst": a new genome replaces the worst genome, if it is better
+    (B) "tournament": a new genome replaces the worst of tournament_size random genomes, if it is better.
+        The best genome is never part of a tournament.
+    """
+    REPLACEMENTS = ("worst", "tournament")
+
+    def __init__(self,
+                 algorithm: BaseAlgorithm,
+                 evaluation_backend: Optional[EvaluationBackend] = None,
+                 replacement: str = "worst",
+                 tournament_size: int = 4,
+                 max_in_flight: Optional[int] = None) -> None:
+        """
+        :param algorithm: The algorithm, which provides the strategies and the fitness function
+        :param evaluation_backend: The backend evaluating the genomes. Defaults to the algorithm's backend or to a
+            SerialEvaluation if the algorithm has none
+        :param replacement: One of SteadyStateEvolution.REPLACEMENTS
+        :param tournament_size: The tournament size for tournament replacement
+        :param max_in_flight: The maximum number of submitted, unfinished evaluations. Defaults to the population size
+        """
+        super().__init__()
+        if replacement not in SteadyStateEvolution.REPLACEMENTS:
+            raise ValueError("Unknown replacement '{}', use one of {}".format(replacement,
+                                                                             SteadyStateEvolution.REPLACEMENTS))
+        algorithm.validate_evaluation_backend()
+        if evaluation_backend is None:
+            evaluation_backend = algorithm.evaluation_backend or SerialEvaluation()
+
+        self._algorithm = algorithm
+        self._evaluation_backend = evaluation_backend
+        self._replacement = replacement
+        self._tournament_size = tournament_size
+        self._max_in_flight = max_in_flight
+
+        self._population: List[BaseGenome] = []
+        self._population_fitness: List[float] = []
+        self._n_replacements = 0
+
+    @property
+    def n_replacements(self):
+        """
+        The number of evaluated genomes which entered the full population
+        """
+        return self._n_replacements
+
+    def run(self, start_dna: np.array) -> BaseResult:
+        """
+        Runs the steady-state evolution until the algorithm's termination strategy stops it.
+        :param start_dna: The start dna passed to the populate strategy
+        :return: The result, one entry per equivalent generation
+        """
+        algorithm = self._algorithm
+        start_dna = algorithm.prepare_run(start_dna)
+        self._evaluation_backend.start(algorithm)
+        try:
+            return self._run(start_dna)
+        finally:
+            self._evaluation_backend.shutdown()
+
+    def _run(self, start_dna: np.array) -> BaseResult:
+        algorithm = self._algorithm
+        initial_population = algorithm.populate_strategy.populate(algorithm.genome_factory, start_dna)
+        population_size = len(initial_population)
+        max_in_flight = self._max_in_flight or population_size
+
+        self._population, self._population_fitness = [], []
+        unevaluated = list(reversed(initial_population))
+        pending = {}
+
+        current_generation = 0
+        generation_evaluations = 0
+        result = BaseResult()
+        terminated = algorithm.check_interrupt() or \
+            algorithm.termination_strategy.should_terminate(current_generation, algorithm.best_fitness)
+
+        while not terminated:
+            while len(pending) < max_in_flight:
+                if unevaluated:
+                    offspring = [unevaluated.pop()]
+                elif len(self._population) >= population_size:
+                    # Selection strategies expect a full population, breeding starts once it is evaluated
+                    offspring = self._breed()
+                else:
+                    break
+                for genome in offspring:
+                    pending[self._evaluation_backend.submit(genome)] = genome
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                genome = pending.pop(future)
+                self._insert(genome, future.result(), population_size)
+                algorithm.add_evaluations(1)
+                generation_evaluations += 1
+            if algorithm.check_interrupt():
+                # The interrupted generation is recorded as well, the result contains the best genome so far
+                if generation_evaluations > 0:
+                    self._add_generation(current_generation, result)
+                break
+
+            while not terminated and generation_evaluations >= population_size:
+                generation_evaluations -= population_size
+                terminated = self._on_generation(current_generation, result)
+                current_generation += 1
+
+            if algorithm.fitness_invalidated and not terminated:
+                self._reevaluate(pending, result)
+
+        for future in pending:
+            future.cancel()
+
+        return result
+
+    def _reevaluate(self, pending: dict, result: BaseResult):
+        # The fitness function changed: results of pending evaluations are outdated and the whole population is
+        # evaluated again. This is the only barrier, it happens once per change (e.g. level of detail switch)
+        algorithm = self._algorithm
+        wait(pending)
+        algorithm.add_evaluations(len(pending))
+        pending.clear()
+        algorithm.apply_fitness_invalidation(result, self._evaluation_backend)
+
+        population = self._population
+        n_true_evaluations = self._evaluation_backend.n_true_evaluations
+        population_fitness = self._evaluation_backend.evaluate(population)
+        if n_true_evaluations is None:
+            algorithm.add_evaluations(len(population))
+        else:
+            algorithm.add_evaluations(self._evaluation_backend.n_true_evaluations - n_true_evaluations)
+        self._population_fitness, self._population = (list(t) for t in
+                                                      zip(*sorted(zip(population_fitness, population), reverse=True)))
+        algorithm.observe_fitness(self._population[0], self._population_fitness[0])
+
+    def _add_generation(self, current_generation: int, result: BaseResult):
+        best_genome = self._algorithm.genome_factory.expand_genome(self._population[0])
+        result.add_generation(current_generation, best_genome, self._population_fitness[0], best_genome,
+                              self._population_fitness[0])
+
+    def _breed(self) -> List[BaseGenome]:
+        algorithm = self._algorithm
+        parent_a, parent_b = algorithm.selection_strategy.select(self._population, self._population_fitness)
+        offspring_a, offspring_b = algorithm.crossover_strategy.crossover(algorithm.genome_factory, parent_a, parent_b)
+
+        algorithm.mutation_strategy.mutate(algorithm.genome_factory, offspring_a)
+        algorithm.mutation_strategy.mutate(algorithm.genome_factory, offspring_b)
+        return [offspring_a, offspring_b]
+
+    def _insert(self, genome: BaseGenome, genome_fitness: float, population_size: int):
+        self._algorithm.observe_fitness(genome, genome_fitness)
+
+        if len(self._population) >= population_size:
+            if self._replacement == "worst" or len(self._population) < 2:
+                index = len(self._population) - 1
+            else:
+                candidates = np.random.choice(np.arange(1, len(self._population)),
+                                              min(self._tournament_size, len(self._population) - 1), replace=False)
+                index = int(candidates.max())
+            if not genome_fitness > self._population_fitness[index]:
+                return
+            del self._population[index]
+            del self._population_fitness[index]
+            self._n_replacements += 1
+
+        # The population is sorted descending w.r.t. the fitness, like in BaseAlgorithm.run
+        position = len(self._population_fitness) - bisect_right(self._population_fitness[::-1], genome_fitness)
+        self._population.insert(position, genome)
+        self._population_fitness.insert(position, genome_fitness)
+
+    def _on_generation(self, current_generation: int, result: BaseResult) -> bool:
+        algorithm = self._algorithm
+        if algorithm.print_info:
+            print("Finished equivalent generation No.{:4}".format(current_generation))
+
+        self._add_generation(current_generation, result)
+        population, population_fitness = self._population, self._population_fitness
+        algorithm.on_population_evaluated(current_generation, population, population_fitness)
+        algorithm.on_display_population(current_generation, population, population_fitness)
+        algorithm.termination_strategy.observe_population(population, population_fitness,
+                                                          algorithm.genome_factory.genome_bounds)
+        return algorithm.termination_strategy.should_terminate(current_generation + 1, algorithm.best_fitness)
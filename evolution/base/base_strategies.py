@@ -1,6 +1,8 @@
+import hashlib
+
 import numpy as np
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 from evolution.base.base_genome import BaseGenome
 from evolution.base.base_genome_factory import BaseGenomeFactory
@@ -8,11 +10,29 @@ from evolution.base.base_genome_factory import BaseGenomeFactory
 Population = List[BaseGenome]
 
 
+def array_digest(values: np.array) -> str:
+    """
+    :return: A short hash of an array's shape and values, for identifiers of strategies with array parameters
+    """
+    values = np.ascontiguousarray(values)
+    digest = hashlib.sha1(str(values.shape).encode())
+    digest.update(values.tobytes())
+    return digest.hexdigest()[:12]
+
+
 class Strategy(ABC):
     @abstractmethod
     def printable_identifier(self):
         raise NotImplementedError
 
+    def result_identifier(self) -> str:
+        """
+        An identifier, which differs for strategies with different results: the printable identifier and all
+        parameters, which change the outcome of a run. Parameters which only change the speed (e.g. thread counts)
+        and values taken from the genome parameters are left out.
+        """
+        return self.printable_identifier()
+
 
 class PopulateStrategy(Strategy):
     @abstractmethod
@@ -20,11 +40,39 @@ class PopulateStrategy(Strategy):
         raise NotImplementedError
 
 
+class EdgeExtractionStrategy(Strategy):
+    @abstractmethod
+    def extract_edges(self, image: np.array) -> np.array:
+        """
+        Extracts the edges of the geometric object from an image.
+        :param image: The BGR image
+        :return: Binary edge image (uint8, edges are 255)
+        """
+        raise NotImplementedError
+
+
 class FitnessStrategy(Strategy):
     @abstractmethod
     def create_fitness(self, edge_image: np.array) -> np.array:
         raise NotImplementedError
 
+    def aggregate_frame_scores(self, frame_scores: np.array) -> np.array:
+        """
+        Combines the scores of a camera on every frame of a stacked fitness map (height x width x n_frames, see
+        MultiFrameFitness) into one score. Scorers call this method for stacked maps only.
+        :param frame_scores: (..., n_frames) scores
+        :return: (...) scores, the mean over all frames by default
+        """
+        return np.mean(frame_scores, axis=-1)
+
+    @property
+    def orientation_bins(self) -> Optional[int]:
+        """
+        If set, fitness maps have one channel per line orientation bin (height x width x orientation_bins, see
+        OrientedDistanceMap) and scorers look up every projected segment in the channel of its direction.
+        """
+        return None
+
 
 class SelectionStrategy(Strategy):
     @abstractmethod
@@ -67,3 +115,146 @@ class TerminationStrategy(Strategy):
     @abstractmethod
     def should_terminate(self, current_generation: int, best_fitness: float) -> bool:
         raise NotImplementedError
+
+    def observe_population(self, population: Population, population_fitness: List[float],
+                           genome_bounds: np.array) -> None:
+        """
+        Called once per generation with the evaluated population, sorted w.r.t. the fitness, before
+        should_terminate is called. Override this method if the strategy depends on the population itself.
+        :param population: The sorted population
+        :param population_fitness: The fitness values of the population
+        :param genome_bounds: 2 x n_genes bounds array
+        """
+        pass
+
+    def observe_progress(self, n_evaluations: int, elapsed_time: float) -> None:
+        """
+        Called before should_terminate and, while a generation is evaluated, before should_interrupt.
+        Override this method if the strategy depends on the run's budget. The progress is not affected by reset.
+        :param n_evaluations: The number of fitness evaluations since the run started
+        :param elapsed_time: The seconds since the run started
+        """
+        pass
+
+    def should_interrupt(self) -> bool:
+        """
+        Called while a generation is evaluated (see BaseAlgorithm.evaluation_chunk_size). If True, the generation is
+        stopped immediately and the run ends with the best genome found so far.
+        """
+        return False
+
+    def reset(self) -> None:
+        """
+        Resets the strategy's internal state, e.g. after a restart of the population.
+        """
+        pass
+
+
+class RestartStrategy(Strategy):
+    def observe_population(self, population: Population, population_fitness: List[float],
+                           genome_bounds: np.array) -> None:
+        """
+        Called once per generation with the evaluated population, sorted w.r.t. the fitness.
+        """
+        pass
+
+    @abstractmethod
+    def should_restart(self, current_generation: int, best_fitness: float, n_evaluations: int) -> bool:
+        """
+        :param current_generation: The current generation
+        :param best_fitness: The best fitness of the current run
+        :param n_evaluations: The number of fitness evaluations of the current run
+        :return: True, if the population should be replaced by restart
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def restart(self, genome_factory: BaseGenomeFactory, best_genome: BaseGenome) -> Population:
+        """
+        Creates a new population, e.g. around the best genome found so far.
+        :param genome_factory: The genome factory
+        :param best_genome: The best genome found so far
+        :return: The new population
+        """
+        raise NotImplementedError
+
+    def budget_exhausted(self, n_evaluations: int) -> bool:
+        """
+        :param n_evaluations: The number of fitness evaluations of the current run after the next generation
+        :return: True, if the run should stop because the next generation would exceed the run's evaluation budget
+        """
+        return False
+
+    def reset(self) -> None:
+        """
+        Forgets all previous fitness values, e.g. after the fitness function changed (see
+        BaseAlgorithm.invalidate_fitness). The number of restarts is kept.
+        """
+        pass
+
+    def start_run(self) -> None:
+        """
+        Called at the start of every run (see BaseAlgorithm.prepare_run). Forgets everything about previous runs,
+        including the number of restarts.
+        """
+        self.reset()
+
+
+class SurrogateModel(Strategy):
+    """
+    A cheap regression model of the fitness function. All dna passed to a surrogate is normalized to [0, 1] w.r.t.
+    the genome bounds.
+    """
+    @abstractmethod
+    def update(self, normalized_dna: np.array, fitness: np.array) -> None:
+        """
+        Adds truly evaluated samples to the model.
+        :param normalized_dna: n x n_genes normalized dna
+        :param fitness: n fitness values, all finite
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def predict(self, normalized_dna: np.array) -> np.array:
+        """
+        :param normalized_dna: n x n_genes normalized dna
+        :return: n predicted fitness values
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def reset(self) -> None:
+        """
+        Forgets all samples, e.g. at the start of a run or after the fitness function changed
+        """
+        raise NotImplementedError
+
+    @property
+    @abstractmethod
+    def n_samples(self) -> int:
+        raise NotImplementedError
+
+
+class DetailSchedule(Strategy):
+    """
+    Decides which level of detail of the geometry is used for the evaluation of the next generation.
+    Levels are ordered from coarse (0) to fine (n_levels - 1) and never decrease during a run.
+    """
+    def observe_population(self, population: Population, population_fitness: List[float],
+                           genome_bounds: np.array) -> None:
+        """
+        Called once per generation with the evaluated population, sorted w.r.t. the fitness.
+        """
+        pass
+
+    @abstractmethod
+    def level(self, current_generation: int, n_levels: int) -> int:
+        """
+        :param current_generation: The generation, which was just evaluated
+        :param n_levels: The number of levels
+        :return: The level for the next generation
+        """
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        pass
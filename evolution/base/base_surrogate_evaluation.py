@@ -0,0 +1,178 @@
+import math
+import threading
+from concurrent.futures import Future
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from evolution.base.base_evaluation import EvaluationBackend, SerialEvaluation
+from evolution.base.base_genome import BaseGenome
+from evolution.base.base_strategies import SurrogateModel
+
+
+class SurrogateAccuracy(NamedTuple):
+    """
+    How well the surrogate predicted the genomes which were truly evaluated after pre-screening
+    """
+    n_true_evaluations: int
+    n_skipped: int
+    n_cached: int
+    mean_absolute_error: float
+    rank_correlation: float
+
+    @property
+    def saved_fraction(self) -> float:
+        n_total = self.n_true_evaluations + self.n_skipped + self.n_cached
+        return (self.n_skipped + self.n_cached) / n_total if n_total > 0 else 0.0
+
+    def __str__(self):
+        return "true={} skipped={} cached={} saved={:.1%} mae={:.3f} spearman={:.3f}".format(
+            self.n_true_evaluations, self.n_skipped, self.n_cached, self.saved_fraction, self.mean_absolute_error,
+            self.rank_correlation)
+
+
+def _ranks(values: np.array) -> np.array:
+    ranks = np.empty(len(values))
+    ranks[np.argsort(values)] = np.arange(len(values))
+    return ranks
+
+
+class SurrogateEvaluation(EvaluationBackend):
+    """
+    Pre-screens populations with a cheap surrogate model before evaluating them with the true fitness.
+
+    Every truly evaluated (dna, fitness) pair trains the surrogate. Once it knows n_warmup samples, only the
+    fraction of each population with the best predictions plus an exploration quota of random genomes is evaluated
+    by the inner backend. Genomes which were already evaluated in the previous population (e.g. the elites) reuse
+    their fitness. All other genomes get their prediction, but ranked below every truly evaluated genome, so the
+    best genome of a generation always has a true fitness.
+
+    Single submitted genomes (e.g. by SteadyStateEvolution) are always evaluated truly.
+
+    The surrogate is emptied by start, i.e. at the start of every run and whenever the fitness function changes (see
+    BaseAlgorithm.invalidate_fitness), and is warmed up again.
+    """
+    def __init__(self,
+                 surrogate: SurrogateModel,
+                 evaluation_backend: Optional[EvaluationBackend] = None,
+                 fraction: float = 0.5,
+                 exploration: float = 0.1,
+                 n_warmup: int = 64) -> None:
+        """
+        :param surrogate: The surrogate model, e.g. KNearestNeighbours or RadialBasis
+        :param evaluation_backend: The backend for true evaluations, defaults to SerialEvaluation
+        :param fraction: The fraction of new genomes with the best predictions, which is evaluated truly
+        :param exploration: The fraction of new genomes, which is evaluated truly regardless of the prediction
+        :param n_warmup: The number of true evaluations before the surrogate is used
+        """
+        super().__init__()
+        self._surrogate = surrogate
+        self._evaluation_backend = evaluation_backend or SerialEvaluation()
+        self._fraction = fraction
+        self._exploration = exploration
+        self._n_warmup = n_warmup
+
+        self._lock = threading.Lock()
+        self._lower, self._range = None, None
+        self._previous = {}
+        self._lowest_finite = np.inf
+        self._n_true_evaluations = 0
+        self._n_skipped = 0
+        self._n_cached = 0
+        self._predicted, self._actual = [], []
+
+    @property
+    def accuracy(self) -> SurrogateAccuracy:
+        predicted, actual = np.array(self._predicted), np.array(self._actual)
+        finite = np.isfinite(predicted) & np.isfinite(actual)
+        predicted, actual = predicted[finite], actual[finite]
+        mean_absolute_error = float(np.mean(np.abs(predicted - actual))) if len(actual) > 0 else np.nan
+        rank_correlation = float(np.corrcoef(_ranks(predicted), _ranks(actual))[0, 1]) if len(actual) > 1 else np.nan
+        return SurrogateAccuracy(self._n_true_evaluations, self._n_skipped, self._n_cached, mean_absolute_error,
+                                 rank_correlation)
+
+    @property
+    def n_true_evaluations(self) -> Optional[int]:
+        return self._n_true_evaluations
+
+    def start(self, algorithm) -> None:
+        super().start(algorithm)
+        lower, upper = algorithm.genome_factory.genome_bounds
+        self._lower = lower
+        self._range = np.where(upper > lower, upper - lower, 1.0)
+        # Samples of previous runs or geometry levels are not comparable with the current fitness function
+        with self._lock:
+            self._surrogate.reset()
+            self._lowest_finite = np.inf
+        self._previous = {}
+        self._evaluation_backend.start(algorithm)
+
+    def shutdown(self) -> None:
+        self._evaluation_backend.shutdown()
+
+    def submit(self, genome: BaseGenome) -> Future:
+        future = self._evaluation_backend.submit(genome)
+        dna = np.array(genome.dna, dtype=np.float64)
+        future.add_done_callback(lambda done: self._learn_future(dna, done))
+        return future
+
+    def evaluate(self, population: List[BaseGenome]) -> List[float]:
+        dna_stack = np.array([genome.dna for genome in population], dtype=np.float64)
+        fitness = np.full(len(population), np.nan)
+
+        keys = [dna.tobytes() for dna in dna_stack]
+        cached = np.array([key in self._previous for key in keys], dtype=bool)
+        fitness[cached] = [self._previous[key] for key, is_cached in zip(keys, cached) if is_cached]
+        new = np.flatnonzero(~cached)
+
+        if self._surrogate.n_samples < self._n_warmup or len(new) == 0:
+            evaluate, predictions = new, None
+        else:
+            with self._lock:
+                predictions = self._surrogate.predict(self._normalize(dna_stack[new]))
+            n_best = math.ceil(self._fraction * len(new))
+            order = np.argsort(-predictions)
+            best, rest = order[:n_best], order[n_best:]
+            n_explore = min(math.ceil(self._exploration * len(new)), len(rest))
+            explore = np.random.choice(rest, n_explore, replace=False) if n_explore > 0 else rest[:0]
+            evaluate = np.sort(new[np.concatenate((best, explore))])
+
+        true_fitness = np.array(self._evaluation_backend.evaluate([population[i] for i in evaluate]),
+                                dtype=np.float64)
+        fitness[evaluate] = true_fitness
+        self._learn(dna_stack[evaluate], true_fitness)
+
+        if predictions is not None:
+            is_evaluated = np.isin(new, evaluate)
+            self._predicted += list(predictions[is_evaluated])
+            self._actual += list(fitness[new[is_evaluated]])
+
+            skipped = new[~is_evaluated]
+            known = fitness[~np.isnan(fitness)]
+            worst_known = np.min(known) if len(known) > 0 else np.inf
+            fitness[skipped] = np.minimum(predictions[~is_evaluated], np.nextafter(worst_known, -np.inf))
+            self._n_skipped += len(skipped)
+
+        self._n_cached += int(np.sum(cached))
+        self._n_true_evaluations += len(evaluate)
+        self._previous = {keys[i]: fitness[i] for i in np.concatenate((np.flatnonzero(cached), evaluate))}
+        return list(fitness)
+
+    def _normalize(self, dna_stack: np.array) -> np.array:
+        return (dna_stack - self._lower) / self._range
+
+    def _learn_future(self, dna: np.array, future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            self._learn(dna[None, :], [future.result()])
+
+    def _learn(self, dna_stack: np.array, fitness) -> None:
+        fitness = np.asarray(fitness, dtype=np.float64)
+        with self._lock:
+            finite = np.isfinite(fitness)
+            if np.any(finite):
+                self._lowest_finite = min(self._lowest_finite, np.min(fitness[finite]))
+            if not np.isfinite(self._lowest_finite):
+                return
+            # Culled genomes (-inf) are learned as the worst fitness seen so far
+            fitness = np.where(finite, fitness, self._lowest_finite)
+            self._surrogate.update(self._normalize(dna_stack), fitness)
@@ -1,9 +1,43 @@
-from .camera_algorithm import GeneticCameraAlgorithm
-from .camera_genome_factory import CameraGenomeFactory
-from .camera_genome_parameters import CameraGenomeParameters
-from .camera_rendering import render_geometry_with_camera
-from .camera_translator import CameraTranslator
-from .object_geometry import ObjGeometry
-
-__all__ = ["GeneticCameraAlgorithm", "CameraGenomeFactory", "CameraGenomeParameters", "CameraTranslator", "ObjGeometry",
-           "render_geometry_with_camera"]
+import importlib
+
+# Submodules are imported on first access of one of their names (PEP 562), e.g. worker processes which only load
+# geometries do not import numba and OpenCV
+_submodules = {
+    "camera_algorithm": ["GeneticCameraAlgorithm"],
+    "camera_genome_factory": ["CameraGenomeFactory"],
+    "camera_genome_parameters": ["CameraGenomeParameters"],
+    "camera_initialization": ["VanishingPointPopulation", "camera_hypotheses", "detect_line_segments",
+                              "estimate_vanishing_points", "dominant_directions", "VanishingPoint"],
+    "camera_library": ["CameraLibrary", "LibraryEntry", "LibraryPopulation", "CachedResult", "run_with_library",
+                       "edge_descriptor", "image_hash", "geometry_hash", "bundle_hash", "rescale_intrinsics"],
+    "camera_kernels": ["PopulationScorer", "projected_connection_lengths"],
+    "camera_rendering": ["render_geometry_with_camera"],
+    "camera_workers": ["worker_context", "load_geometry", "load_genome_parameters", "warm_up"],
+    "multi_view": ["MultiViewCameraAlgorithm", "MultiViewGenomeParameters", "MultiViewTranslator"],
+    "camera_reprojection": ["reprojection_errors", "ReprojectionErrors"],
+    "camera_scorer": ["CameraScorer"],
+    "camera_translator": ["CameraTranslator"],
+    "object_geometry": ["ObjGeometry"],
+}
+_modules = {name: module for module, names in _submodules.items() for name in names}
+
+__all__ = ["GeneticCameraAlgorithm", "CameraGenomeFactory", "CameraGenomeParameters", "CameraTranslator",
+           "ObjGeometry", "CameraScorer", "PopulationScorer", "render_geometry_with_camera", "reprojection_errors",
+           "ReprojectionErrors", "projected_connection_lengths", "VanishingPointPopulation", "camera_hypotheses",
+           "detect_line_segments", "estimate_vanishing_points", "dominant_directions", "VanishingPoint",
+           "CameraLibrary", "LibraryEntry", "LibraryPopulation", "CachedResult", "run_with_library", "edge_descriptor",
+           "image_hash", "geometry_hash", "bundle_hash", "rescale_intrinsics", "MultiViewCameraAlgorithm",
+           "MultiViewGenomeParameters", "MultiViewTranslator", "worker_context", "load_geometry",
+           "load_genome_parameters", "warm_up"]
+
+
+def __getattr__(name):
+    if name not in _modules:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module("." + _modules[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,15 +1,19 @@
-from typing import List
+import threading
+from typing import List, Optional
 
 import numpy as np
 import cv2 as cv
 
 from evolution.base.base_algorithm import BaseAlgorithm
+from evolution.base.base_evaluation import EvaluationBackend
 from evolution.base.base_genome import BaseGenome
 from evolution.base.base_geometry import BaseGeometry
-from evolution.base.base_strategies import Population
+from evolution.base.base_strategies import Population, RestartStrategy, DetailSchedule
 from evolution.camera.camera_genome_factory import CameraGenomeFactory
 from evolution.camera.camera_genome_parameters import CameraGenomeParameters
+from evolution.camera.camera_kernels import PopulationScorer
 from evolution.camera.camera_rendering import render_geometry_with_camera
+from evolution.camera.camera_scorer import CameraScorer
 from evolution.camera.camera_translator import CameraTranslator
 from evolution.strategies.strategy_bundle import StrategyBundle
 
@@ -20,29 +24,153 @@ class GeneticCameraAlgorithm(BaseAlgorithm):
                  strategy_bundle: StrategyBundle,
                  edge_image: np.array,
                  geometry: BaseGeometry,
-                 headless=True) -> None:
-        super().__init__(CameraTranslator(),
-                         CameraGenomeFactory(genome_parameters),
+                 headless=True,
+                 early_exit: bool = False,
+                 fitness_map: Optional[np.array] = None,
+                 scoring_backend: Optional[str] = None,
+                 restart_strategy: Optional[RestartStrategy] = None,
+                 evaluation_backend: Optional[EvaluationBackend] = None,
+                 geometry_levels: Optional[List[BaseGeometry]] = None,
+                 detail_schedule: Optional[DetailSchedule] = None,
+                 evaluation_chunk_size: Optional[int] = None) -> None:
+        """
+        :param genome_parameters: The camera genome parameters
+        :param strategy_bundle: The strategies used by the algorithm
+        :param edge_image: The binary edge image the geometry is fitted to, or a stack of edge images for a
+            MultiFrameFitness strategy
+        :param geometry: The geometry to fit
+        :param headless: If False, the population is displayed every generation
+        :param early_exit: If True, genomes which can not beat the worst surviving genome of the previous generation
+            are only scored partially and rank below all completely scored genomes. See CameraScorer.score_bounded.
+            Computing the bounds has a cost, early exits only pay off for expensive fitness maps (e.g. oriented maps)
+            and populations with many hopeless genomes, see examples/early_exit.py
+        :param fitness_map: Optional precomputed fitness map. If None, the map is created from the edge image with
+            the bundle's fitness strategy
+        :param scoring_backend: If set, populations are scored in one batch by a PopulationScorer with this backend
+            ("auto", "numba" or "numpy") instead of rendering every genome with OpenCV. Can not be combined with
+            early_exit
+        :param restart_strategy: Optional strategy, which replaces a stagnating population with a new one
+        :param evaluation_backend: Optional backend for evaluating genomes in parallel. Every thread scores with its
+            own CameraScorer, so thread pools are safe to use. Can not be combined with early_exit or scoring_backend
+        :param geometry_levels: Optional levels of detail, from coarse to fine (see geometry_levels). The last level
+            should be the full geometry. Defaults to [geometry]
+        :param detail_schedule: Decides when to switch to the next finer level. Required for more than one level.
+            Every switch resets the best fitness and the termination strategy, since fitness values of different
+            levels are not comparable
+        :param evaluation_chunk_size: If set, populations are evaluated in chunks of this size and deadlines (see
+            WallClockDeadline) may interrupt a generation between chunks
+        """
+        if early_exit and scoring_backend is not None:
+            raise ValueError("early_exit can not be combined with a scoring_backend")
+        genome_factory = CameraGenomeFactory(genome_parameters)
+        super().__init__(CameraTranslator(genome_factory),
+                         genome_factory,
                          strategy_bundle.populate_strategy,
                          strategy_bundle.selection_strategy,
                          strategy_bundle.crossover_strategy,
                          strategy_bundle.mutation_strategy,
-                         strategy_bundle.termination_strategy)
-        h, w = edge_image.shape
+                         strategy_bundle.termination_strategy,
+                         restart_strategy=restart_strategy,
+                         evaluation_backend=evaluation_backend,
+                         evaluation_chunk_size=evaluation_chunk_size)
+        h, w = edge_image.shape[-2:]
         self._headless = headless
-        self._fitness_map = strategy_bundle.fitness_strategy.create_fitness(edge_image)
+        self._early_exit = early_exit
+        if fitness_map is None:
+            fitness_map = strategy_bundle.fitness_strategy.create_fitness(edge_image)
+        self._fitness_map = fitness_map
+        # Combines the per frame scores of stacked fitness maps
+        self._aggregate_frame_scores = strategy_bundle.fitness_strategy.aggregate_frame_scores
+        self._orientation_bins = strategy_bundle.fitness_strategy.orientation_bins
 
         self._geometry = geometry
-        self._display_image = np.zeros((h, w, 3))
-        self._render_image = np.zeros_like(self._fitness_map, dtype=np.uint8)
+        self._geometry_levels = [geometry] if geometry_levels is None else list(geometry_levels)
+        if len(self._geometry_levels) > 1 and detail_schedule is None:
+            raise ValueError("A detail schedule is required for more than one geometry level")
+        self._detail_schedule = detail_schedule
+        self._level = 0
+        self._display_image = None if headless else np.zeros((h, w, 3))
+        self._scorers = []
+        self._scorers_lock = threading.Lock()
+        self._thread_local = threading.local()
+        self._population_scorers = None
+        if scoring_backend is not None:
+            self._population_scorers = [PopulationScorer(self._fitness_map, level_geometry, scoring_backend,
+                                                         self._aggregate_frame_scores, self._orientation_bins)
+                                        for level_geometry in self._geometry_levels]
         self._current_best_genome = None
+        if evaluation_backend is not None:
+            self.validate_evaluation_backend()
+
+    @property
+    def level(self) -> int:
+        """
+        The index of the current geometry level
+        """
+        return self._level
+
+    @property
+    def _scorer(self) -> CameraScorer:
+        # CameraScorer renders into scratch images, therefore every thread gets its own instance per level
+        scorers = getattr(self._thread_local, "scorers", None)
+        if scorers is None:
+            scorers = self._thread_local.scorers = {}
+        scorer = scorers.get(self._level)
+        if scorer is None:
+            scorer = CameraScorer(self._fitness_map, self._geometry_levels[self._level], self.translator,
+                                  aggregate=self._aggregate_frame_scores,
+                                  n_orientation_bins=self._orientation_bins)
+            scorers[self._level] = scorer
+            with self._scorers_lock:
+                self._scorers.append(scorer)
+        return scorer
+
+    @property
+    def n_partial_scores(self):
+        return sum(scorer.n_partial_scores for scorer in self._scorers)
+
+    @property
+    def n_culled(self):
+        return sum(scorer.n_culled for scorer in self._scorers + (self._population_scorers or []))
 
     def fitness(self, genome) -> float:
-        self._render_image[:] = 0
-        camera_matrix, t_vec, r_vec, d_vec = self.translator.translate_genome(genome)
-        render_geometry_with_camera(self._render_image, self._geometry, camera_matrix, t_vec, r_vec, d_vec, (255,), 2)
-        fitness_lookup = cv.bitwise_and(self._fitness_map, self._fitness_map, mask=self._render_image)
-        return fitness_lookup.sum().astype(float)
+        return self._scorer.score(genome)
+
+    def validate_evaluation_backend(self) -> None:
+        # Both score populations in evaluate_population, backends only call fitness
+        if self._early_exit or self._population_scorers is not None:
+            raise ValueError("An evaluation backend can not be combined with early_exit or a scoring_backend")
+
+    def evaluate_population(self, population: Population) -> List[float]:
+        if self._population_scorers is not None:
+            dna_stack = self.genome_factory.expand_dna(np.array([genome.dna for genome in population]))
+            return list(self._population_scorers[self._level].score(dna_stack))
+        if not self._early_exit:
+            return super().evaluate_population(population)
+        scores = []
+        for genome in population:
+            score, is_partial = self._scorer.score_bounded(genome, self._survivor_fitness)
+            # Partial scores are truncated sums, which depend on the rendering order. They are moved below every
+            # finite complete score, so selection strategies never prefer a partially scored genome
+            scores.append(score - 3 * self._scorer.score_bound if is_partial else score)
+        return scores
+
+    def on_run_started(self):
+        self._level = 0
+        if self._detail_schedule is not None:
+            self._detail_schedule.reset()
+
+    def on_population_evaluated(self, current_generation, population: Population, population_fitness: List[float]):
+        if self._detail_schedule is None:
+            return
+        self._detail_schedule.observe_population(population, population_fitness, self.genome_factory.genome_bounds)
+        n_levels = len(self._geometry_levels)
+        level = max(self._level, min(self._detail_schedule.level(current_generation, n_levels), n_levels - 1))
+        if level != self._level:
+            if self.print_info:
+                print("Switching to geometry level {} in generation No.{:4}".format(level, current_generation))
+            self._level = level
+            self.invalidate_fitness()
 
     def on_display_population(self, current_generation, population: Population, population_fitness: List[float]):
         if not self._headless:
@@ -66,3 +194,15 @@ class GeneticCameraAlgorithm(BaseAlgorithm):
     def on_best_genome_found(self, new_best: BaseGenome, genome_fitness: float):
         super().on_best_genome_found(new_best, genome_fitness)
         self._current_best_genome = new_best
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        for key in ("_scorers", "_scorers_lock", "_thread_local"):
+            del state[key]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._scorers = []
+        self._scorers_lock = threading.Lock()
+        self._thread_local = threading.local()
@@ -0,0 +1,383 @@
+from itertools import combinations, permutations, product
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+import cv2 as cv
+
+from evolution.base.base_genome_factory import BaseGenomeFactory
+from evolution.base.base_geometry import BaseGeometry
+from evolution.base.base_strategies import PopulateStrategy, array_digest
+from evolution.camera.camera_rendering import project_segments
+from evolution.strategies.populate import ValueUniformPopulation
+
+
+class VanishingPoint(NamedTuple):
+    """
+    A vanishing point in homogeneous pixel coordinates (unit length, the last component is 0 for points at infinity)
+    """
+    point: np.array
+    support: float
+    n_segments: int
+
+
+def detect_line_segments(edge_image: np.array, threshold: int = 40, min_length: float = 30,
+                         max_gap: float = 5) -> np.array:
+    """
+    Detects straight line segments in a binary edge image with the probabilistic Hough transform.
+    :return: k x 4 array of segments (x0, y0, x1, y1)
+    """
+    lines = cv.HoughLinesP(edge_image, 1, np.pi / 180, threshold, minLineLength=min_length, maxLineGap=max_gap)
+    if lines is None:
+        return np.zeros((0, 4))
+    return lines.reshape(-1, 4).astype(np.float64)
+
+
+def estimate_vanishing_points(segments: np.array, n_points: int = 3, n_iterations: int = 300,
+                              angle_threshold: float = np.deg2rad(1.5), min_segments: int = 3) -> List[VanishingPoint]:
+    """
+    Estimates vanishing points one after another with RANSAC: the intersection of two random segments is
+    accepted, if many (long) segments point towards it. The inliers are removed before the next point is searched.
+
+    :param segments: k x 4 array of segments (x0, y0, x1, y1), see detect_line_segments
+    :param n_points: The maximum number of vanishing points
+    :param n_iterations: The number of RANSAC iterations per vanishing point
+    :param angle_threshold: The maximum angle between a segment and the direction to the vanishing point
+    :param min_segments: The minimum number of segments supporting a vanishing point
+    :return: The vanishing points, sorted by their support (the total length of their segments)
+    """
+    # Conditioning: homogeneous computations are done in coordinates of unit scale
+    center = np.mean(segments.reshape(-1, 2), axis=0) if len(segments) else np.zeros(2)
+    scale = max(float(np.max(np.abs(segments.reshape(-1, 2) - center))), 1.0) if len(segments) else 1.0
+    normalization = np.array([[1 / scale, 0, -center[0] / scale], [0, 1 / scale, -center[1] / scale], [0, 0, 1]])
+
+    start_points = (segments[:, :2] - center) / scale
+    end_points = (segments[:, 2:] - center) / scale
+    ones = np.ones((len(segments), 1))
+    lines = np.cross(np.hstack((start_points, ones)), np.hstack((end_points, ones)))
+    lines /= np.maximum(np.linalg.norm(lines[:, :2], axis=1, keepdims=True), 1e-12)
+    midpoints = (start_points + end_points) / 2
+    directions = end_points - start_points
+    lengths = np.linalg.norm(directions, axis=1)
+    directions /= np.maximum(lengths[:, None], 1e-12)
+
+    def inliers(vp: np.array) -> np.array:
+        to_vp = vp[:2] - midpoints * vp[2]
+        to_vp /= np.maximum(np.linalg.norm(to_vp, axis=1, keepdims=True), 1e-12)
+        return np.abs(directions[:, 0] * to_vp[:, 1] - directions[:, 1] * to_vp[:, 0]) < np.sin(angle_threshold)
+
+    vanishing_points = []
+    remaining = np.ones(len(segments), dtype=bool)
+    for _ in range(n_points):
+        candidates = np.flatnonzero(remaining)
+        if len(candidates) < max(min_segments, 2):
+            break
+        probabilities = lengths[candidates] / np.sum(lengths[candidates])
+        best_support, best_inliers = 0.0, None
+        for _ in range(n_iterations):
+            i, j = np.random.choice(candidates, 2, replace=False, p=probabilities)
+            vp = np.cross(lines[i], lines[j])
+            if np.linalg.norm(vp) < 1e-12:
+                continue
+            vp_inliers = inliers(vp / np.linalg.norm(vp)) & remaining
+            support = np.sum(lengths[vp_inliers])
+            if support > best_support:
+                best_support, best_inliers = support, vp_inliers
+        if best_inliers is None or np.count_nonzero(best_inliers) < min_segments:
+            break
+
+        # Least squares refinement: the point closest to all inlier lines
+        weighted_lines = lines[best_inliers] * lengths[best_inliers, None]
+        vp = np.linalg.svd(weighted_lines)[2][-1]
+        point = np.linalg.solve(normalization, vp)
+        vanishing_points.append(VanishingPoint(point / np.linalg.norm(point), float(best_support * scale),
+                                               int(np.count_nonzero(best_inliers))))
+        remaining &= ~best_inliers
+
+    return sorted(vanishing_points, key=lambda vp: -vp.support)
+
+
+def dominant_directions(geometry: BaseGeometry, n_directions: int = 3,
+                        angle_threshold: float = np.deg2rad(5)) -> np.array:
+    """
+    Groups the geometry's segments by their world space direction.
+    :return: n x 3 unit directions, sorted by the total length of their segments
+    """
+    segments = geometry.segments
+    vectors = geometry.world_points[segments[:, 1]] - geometry.world_points[segments[:, 0]]
+    lengths = np.linalg.norm(vectors, axis=1)
+    vectors = vectors[lengths > 0] / lengths[lengths > 0, None]
+    lengths = lengths[lengths > 0]
+
+    groups = []
+    remaining = np.ones(len(vectors), dtype=bool)
+    while np.any(remaining):
+        reference = vectors[np.argmax(np.where(remaining, lengths, -1))]
+        members = remaining & (np.abs(vectors @ reference) > np.cos(angle_threshold))
+        # The principal axis of the members is their common direction, independent of their signs
+        scatter = (vectors[members] * lengths[members, None]).T @ vectors[members]
+        groups.append((np.sum(lengths[members]), np.linalg.eigh(scatter)[1][:, -1]))
+        remaining &= ~members
+
+    groups.sort(key=lambda group: -group[0])
+    return np.array([direction for _, direction in groups[:n_directions]]).reshape(-1, 3)
+
+
+def _sample_segments(geometry: BaseGeometry, n_samples: int) -> np.array:
+    segments = geometry.segments
+    start, end = geometry.world_points[segments[:, 0]], geometry.world_points[segments[:, 1]]
+    alphas = np.linspace(0, 1, n_samples)[None, :, None]
+    return (start[:, None] + alphas * (end - start)[:, None]).reshape(-1, 3)
+
+
+class _Chamfer:
+    """
+    Truncated chamfer distance between a projected geometry and the edge image, measured in both directions.
+    The edge image's distance map is computed once, edge pixels are measured against the projected segments directly.
+    """
+    def __init__(self, edge_image: np.array, geometry: BaseGeometry, n_samples: int, truncation: float) -> None:
+        self.geometry = geometry
+        self.world_samples = _sample_segments(geometry, n_samples)
+        self.truncation = truncation
+        self.height, self.width = edge_image.shape
+        self.distances, labels = cv.distanceTransformWithLabels(~edge_image, cv.DIST_L2, 5,
+                                                                labelType=cv.DIST_LABEL_PIXEL)
+        # Labels are assigned to the edge pixels in raster order
+        edge_pixels = np.argwhere(edge_image > 0)[:, ::-1].astype(np.float64)
+        self.nearest_edge = edge_pixels[np.maximum(labels - 1, 0)]
+        self.edge_samples = edge_pixels[::max(len(edge_pixels) // 2000, 1)].astype(np.float32)
+
+    def project(self, camera_matrix: np.array, r_vector: np.array, t_vector: np.array, d_vector: np.array):
+        rotation_matrix, _ = cv.Rodrigues(r_vector)
+        in_front = (self.world_samples @ rotation_matrix[2] + t_vector[2]) > 1e-3
+        if not np.any(in_front):
+            return np.zeros((0, 2)), in_front
+        projected, _ = cv.projectPoints(self.world_samples[in_front], r_vector, t_vector, camera_matrix, d_vector)
+        projected = projected.reshape(-1, 2)
+        inside = np.all((projected >= 0) & (projected < (self.width - 1, self.height - 1)), axis=1)
+        visible = np.zeros(len(self.world_samples), dtype=bool)
+        visible[np.flatnonzero(in_front)[inside]] = True
+        return projected[inside], visible
+
+    def distance(self, camera_matrix: np.array, r_vector: np.array, t_vector: np.array, d_vector: np.array) -> float:
+        projected, visible = self.project(camera_matrix, r_vector, t_vector, d_vector)
+        pixels = projected.astype(np.int32)
+        forward = np.minimum(self.distances[pixels[:, 1], pixels[:, 0]], self.truncation)
+        forward = (np.sum(forward) + self.truncation * np.count_nonzero(~visible)) / len(visible)
+
+        segments, _ = project_segments(self.geometry, camera_matrix, t_vector, r_vector, d_vector,
+                                       self.width, self.height)
+        if len(segments) == 0:
+            return 2 * self.truncation
+        backward = np.mean(np.minimum(self._segment_distances(segments), self.truncation))
+        return forward + backward
+
+    def _segment_distances(self, segments: np.array) -> np.array:
+        # Distance of every edge sample to the closest of the k x 2 x 2 projected segments
+        start = segments[:, 0].astype(np.float32)
+        direction = segments[:, 1] - start
+        inverse_squared_length = 1 / np.maximum(np.sum(direction ** 2, axis=1), 1e-6)
+        offset_x = self.edge_samples[:, 0, None] - start[:, 0]
+        offset_y = self.edge_samples[:, 1, None] - start[:, 1]
+        alphas = np.clip((offset_x * direction[:, 0] + offset_y * direction[:, 1]) * inverse_squared_length, 0, 1)
+        offset_x -= alphas * direction[:, 0]
+        offset_y -= alphas * direction[:, 1]
+        return np.sqrt(np.min(offset_x * offset_x + offset_y * offset_y, axis=1))
+
+    def refine(self, camera_matrix: np.array, r_vector: np.array, t_vector: np.array, d_vector: np.array,
+               n_iterations: int):
+        """
+        Iterative closest points: every visible sample is paired with its nearest edge pixel and the pose is
+        refined with solvePnP. The maximum pairing distance shrinks every iteration.
+        """
+        for max_distance in np.geomspace(4 * self.truncation, self.truncation / 4, n_iterations):
+            projected, visible = self.project(camera_matrix, r_vector, t_vector, d_vector)
+            pixels = projected.astype(np.int32)
+            close = self.distances[pixels[:, 1], pixels[:, 0]] < max_distance
+            if np.count_nonzero(close) < 6:
+                break
+            world_points = self.world_samples[visible][close]
+            image_points = self.nearest_edge[pixels[close, 1], pixels[close, 0]]
+            success, r_refined, t_refined = cv.solvePnP(world_points, image_points, camera_matrix, d_vector,
+                                                        r_vector.copy(), t_vector.copy(), True,
+                                                        cv.SOLVEPNP_ITERATIVE)
+            if not success or not np.all(np.isfinite(t_refined)):
+                break
+            r_vector, t_vector = r_refined.ravel(), t_refined.ravel()
+        return r_vector, t_vector
+
+
+def camera_hypotheses(edge_image: np.array, geometry: BaseGeometry, start_dna: np.array, n_hypotheses: int = 4,
+                      focal_length: Optional[float] = None, bounds: Optional[np.array] = None,
+                      n_directions: int = 4, n_refined: int = 12, n_iterations: int = 10,
+                      truncation: float = 20.0) -> List[np.array]:
+    """
+    Estimates cameras analytically from the straight lines in the edge image.
+
+    (A) Line segments are detected and grouped into vanishing points.
+    (B) Every assignment of vanishing points to the geometry's dominant directions (including their signs) yields a
+        rotation and a focal length, for which the viewing rays of the vanishing points agree best with the
+        directions (unless the focal length is given). The translation places the geometry's center onto the center
+        of the edges, at the distance where both have the same spread.
+    (C) The most promising hypotheses are refined with iterative closest points and ranked by their chamfer distance.
+
+    Principal point and distortion are taken from the start dna.
+
+    :param edge_image: The binary edge image
+    :param geometry: The geometry
+    :param start_dna: The full start dna
+    :param n_hypotheses: The maximum number of returned cameras
+    :param focal_length: Known focal length. If None, it is searched within the bounds of fu (or around the start
+        dna's fu)
+    :param bounds: Optional 2 x 15 bounds of the full dna. Hypotheses outside of the bounds are discarded
+    :param n_directions: The number of the geometry's dominant directions, vanishing points may be assigned to
+    :param n_refined: The number of hypotheses, which are refined
+    :param n_iterations: The number of iterative closest point iterations
+    :param truncation: Pixel distance, at which the chamfer distance is truncated
+    :return: Up to n_hypotheses full dna, the best first. Empty, if less than two vanishing points were found
+    """
+    start_dna = np.asarray(start_dna, dtype=np.float64)
+    principal_point = start_dna[2:4]
+    d_vector = start_dna[10:]
+    edge_pixels = np.argwhere(edge_image > 0)[:, ::-1].astype(np.float64)
+    world_directions = dominant_directions(geometry, n_directions)
+    vanishing_points = estimate_vanishing_points(detect_line_segments(edge_image), min(len(world_directions), 3))
+    if len(vanishing_points) < 2 or len(edge_pixels) == 0:
+        return []
+
+    if focal_length is not None:
+        focal_lengths = np.array([focal_length], dtype=np.float64)
+    elif bounds is not None:
+        focal_lengths = np.geomspace(max(bounds[0][0], 1.0), max(bounds[1][0], 2.0), 200)
+    else:
+        focal_lengths = np.geomspace(start_dna[0] / 4, start_dna[0] * 4, 200)
+
+    chamfer = _Chamfer(edge_image, geometry, 10, truncation)
+    world_center = np.mean(chamfer.world_samples, axis=0)
+    edge_center = np.mean(edge_pixels, axis=0)
+    edge_spread = np.sqrt(np.mean(np.sum((edge_pixels - edge_center) ** 2, axis=1)))
+
+    # Viewing rays of the vanishing points for every focal length: n_focal_lengths x n_points x 3
+    points = np.array([vp.point for vp in vanishing_points])
+    image_directions = np.stack(np.broadcast_arrays(
+        (points[None, :, 0] - principal_point[0] * points[None, :, 2]) / focal_lengths[:, None],
+        (points[None, :, 1] - principal_point[1] * points[None, :, 2]) / focal_lengths[:, None],
+        points[None, :, 2]), axis=-1)
+    image_directions /= np.linalg.norm(image_directions, axis=-1, keepdims=True)
+
+    # All vanishing points are matched at once, and every pair on its own in case one of them is spurious
+    vp_subsets = [tuple(range(len(vanishing_points)))]
+    if len(vanishing_points) > 2:
+        vp_subsets += list(combinations(range(len(vanishing_points)), 2))
+
+    candidates = []
+    for vp_subset, assignment in ((vp_subset, assignment) for vp_subset in vp_subsets
+                                  for assignment in permutations(range(len(world_directions)), len(vp_subset))):
+        matched_world_directions = world_directions[list(assignment)]
+        for signs in product((1, -1), repeat=len(vp_subset)):
+            # Kabsch: the rotations, which map the world directions onto the signed image directions. The focal
+            # length, for which both sets of directions agree best, is chosen
+            matched_directions = image_directions[:, vp_subset] * np.array(signs)[None, :, None]
+            u, _, vt = np.linalg.svd(matched_world_directions.T[None] @ matched_directions)
+            v_ut = np.swapaxes(vt, 1, 2) @ np.swapaxes(u, 1, 2)
+            correction = np.ones((len(focal_lengths), 3))
+            correction[:, 2] = np.sign(np.linalg.det(v_ut))
+            rotation_matrices = (np.swapaxes(vt, 1, 2) * correction[:, None, :]) @ np.swapaxes(u, 1, 2)
+            alignment_errors = np.max(np.linalg.norm(
+                matched_world_directions[None] @ np.swapaxes(rotation_matrices, 1, 2) - matched_directions, axis=-1),
+                axis=-1)
+            best = int(np.argmin(alignment_errors))
+            if alignment_errors[best] > 0.1:
+                continue
+
+            f, rotation_matrix = focal_lengths[best], rotation_matrices[best]
+            camera_matrix = np.array([[f, 0, principal_point[0]], [0, f, principal_point[1]], [0, 0, 1]])
+            relative_points = (chamfer.world_samples - world_center) @ rotation_matrix.T
+            distance = f * np.sqrt(np.mean(np.sum(relative_points[:, :2] ** 2, axis=1))) / max(edge_spread, 1)
+            t_vector = distance * (np.linalg.inv(camera_matrix) @ np.append(edge_center, 1)) \
+                - rotation_matrix @ world_center
+            r_vector = cv.Rodrigues(rotation_matrix)[0].ravel()
+            dna = np.concatenate(([f, f], principal_point, t_vector, r_vector, d_vector))
+            if bounds is not None and not _within_bounds(dna, bounds):
+                continue
+            candidates.append((chamfer.distance(camera_matrix, r_vector, t_vector, d_vector), dna))
+
+    candidates.sort(key=lambda candidate: candidate[0])
+    refined = []
+    for _, dna in candidates[:n_refined]:
+        camera_matrix = np.array([[dna[0], 0, dna[2]], [0, dna[1], dna[3]], [0, 0, 1]])
+        r_vector, t_vector = chamfer.refine(camera_matrix, dna[7:10], dna[4:7], d_vector, n_iterations)
+        dna = np.concatenate((dna[:4], t_vector, r_vector, d_vector))
+        if bounds is not None and not _within_bounds(dna, bounds):
+            continue
+        refined.append((chamfer.distance(camera_matrix, r_vector, t_vector, d_vector), dna))
+
+    refined.sort(key=lambda candidate: candidate[0])
+    hypotheses = []
+    for _, dna in refined:
+        # Different hypotheses often converge to the same camera
+        if not any(np.allclose(dna, other, rtol=1e-2, atol=1e-2) for other in hypotheses):
+            hypotheses.append(dna)
+    return hypotheses[:n_hypotheses]
+
+
+def _within_bounds(dna: np.array, bounds: np.array, tolerance: float = 0.1) -> bool:
+    lower, upper = bounds
+    margin = tolerance * (upper - lower)
+    return bool(np.all((dna >= lower - margin) & (dna <= upper + margin)))
+
+
+class VanishingPointPopulation(PopulateStrategy):
+    # Half widths of the uniform noise around every hypothesis
+    _hypothesis_range = np.array([20, 20, 0, 0, 0.05, 0.05, 0.20, np.deg2rad(0.5), np.deg2rad(0.5), np.deg2rad(0.5),
+                                  0, 0, 0, 0, 0])
+
+    def __init__(self, edge_image: np.array, geometry: BaseGeometry, population_size: int = 16,
+                 n_hypotheses: int = 4, spread: Optional[np.array] = None) -> None:
+        """
+        Seeds the population around cameras, which are estimated from vanishing points of the edge image
+        (see camera_hypotheses). Every hypothesis gets an equal share of the population, the first genome of every
+        share is the hypothesis itself. Falls back to ValueUniformPopulation around the start dna, if no camera
+        could be estimated.
+
+        The start dna provides the principal point and the distortion. A frozen fu is used as known focal length.
+
+        :param edge_image: The binary edge image the geometry is fitted to
+        :param geometry: The geometry
+        :param population_size: The population size
+        :param n_hypotheses: The maximum number of hypotheses
+        :param spread: Optional half widths of the uniform noise around the hypotheses (full dna)
+        """
+        super().__init__()
+        self.edge_image = edge_image
+        self.geometry = geometry
+        self.population_size = population_size
+        self.n_hypotheses = n_hypotheses
+        self.spread = self._hypothesis_range if spread is None else np.asarray(spread, dtype=np.float64)
+
+    def populate(self, genome_factory: BaseGenomeFactory, start_dna: np.array):
+        full_start_dna = genome_factory.expand_dna(start_dna)
+        lower_bounds, upper_bounds = genome_factory.genome_bounds
+        full_bounds = np.array([genome_factory.expand_dna(lower_bounds), genome_factory.expand_dna(upper_bounds)])
+        focal_length = full_start_dna[0] if genome_factory.gene_mask.is_frozen[0] else None
+
+        hypotheses = camera_hypotheses(self.edge_image, self.geometry, full_start_dna, self.n_hypotheses,
+                                       focal_length, full_bounds)
+        if len(hypotheses) == 0:
+            return ValueUniformPopulation(self.population_size).populate(genome_factory, start_dna)
+
+        spread = genome_factory.reduce_dna(self.spread)
+        population = []
+        for i in range(self.population_size):
+            dna = genome_factory.reduce_dna(hypotheses[i % len(hypotheses)])
+            if i >= len(hypotheses):
+                dna = dna + np.random.uniform(-spread, spread)
+            population.append(genome_factory.create(np.clip(dna, lower_bounds, upper_bounds)))
+        return population
+
+    def printable_identifier(self):
+        return "VanishingPointPopulation(n={}, hypotheses={})".format(self.population_size, self.n_hypotheses)
+
+    def result_identifier(self) -> str:
+        return "VanishingPointPopulation(n={}, hypotheses={}, spread={}, image={}, geometry={})".format(
+            self.population_size, self.n_hypotheses, array_digest(self.spread), array_digest(self.edge_image),
+            array_digest(self.geometry.world_points))
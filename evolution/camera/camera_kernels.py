@@ -0,0 +1,429 @@
+import importlib.util
+import math
+import threading
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from evolution.base.base_geometry import BaseGeometry
+from evolution.camera.camera_rendering import clip_segments
+
+# numba is imported with the first compiled scorer, importing it takes longer than importing NumPy and OpenCV
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+
+def rotation_matrices(r_vectors: np.array) -> np.array:
+    """ Converts a stack of rotation vectors to rotation matrices (Rodrigues' formula).
+
+    :param r_vectors: n x 3 rotation vectors
+    :return: n x 3 x 3 rotation matrices
+    """
+    theta = np.linalg.norm(r_vectors, axis=1)
+    safe_theta = np.where(theta < 1e-12, 1.0, theta)
+    k = r_vectors / safe_theta[:, None]
+    k[theta < 1e-12] = 0
+
+    cos, sin = np.cos(theta)[:, None, None], np.sin(theta)[:, None, None]
+    k_cross = np.zeros((len(r_vectors), 3, 3))
+    k_cross[:, 0, 1], k_cross[:, 0, 2] = -k[:, 2], k[:, 1]
+    k_cross[:, 1, 0], k_cross[:, 1, 2] = k[:, 2], -k[:, 0]
+    k_cross[:, 2, 0], k_cross[:, 2, 1] = -k[:, 1], k[:, 0]
+    return cos * np.eye(3) + (1 - cos) * (k[:, :, None] * k[:, None, :]) + sin * k_cross
+
+
+def _project_point(x, y, z, r, t, fx, fy, cx, cy, k1, k2, p1, p2, k3):
+    """
+    Pinhole projection with OpenCV's distortion model. Works on scalars (compiled backend) and on broadcastable
+    arrays (NumPy backend) with exactly the same sequence of floating point operations.
+    """
+    xc = r[0] * x + r[1] * y + r[2] * z + t[0]
+    yc = r[3] * x + r[4] * y + r[5] * z + t[1]
+    zc = r[6] * x + r[7] * y + r[8] * z + t[2]
+    return _project_camera_point(xc, yc, zc, fx, fy, cx, cy, k1, k2, p1, p2, k3)
+
+
+def _project_camera_point(xc, yc, zc, fx, fy, cx, cy, k1, k2, p1, p2, k3):
+    """ The second half of _project_point: projects a point given in camera space. """
+    xn = xc / zc
+    yn = yc / zc
+    r2 = xn * xn + yn * yn
+    radial = 1 + k1 * r2 + k2 * r2 * r2 + k3 * r2 * r2 * r2
+    xd = xn * radial + 2 * p1 * xn * yn + p2 * (r2 + 2 * xn * xn)
+    yd = yn * radial + p1 * (r2 + 2 * yn * yn) + 2 * p2 * xn * yn
+    return fx * xd + cx, fy * yd + cy
+
+
+def _clip_segment(u0, v0, u1, v1, image_width, image_height):
+    """
+    Clips one 2d segment to the image box [0, width - 1] x [0, height - 1] (Liang-Barsky), with the same floating
+    point operations as clip_segments. Returns the entry and exit parameters along the segment, the segment is
+    invisible if t_enter > t_exit.
+    """
+    if not (math.isfinite(u0) and math.isfinite(v0) and math.isfinite(u1) and math.isfinite(v1)):
+        return 1.0, 0.0
+    du, dv = u1 - u0, v1 - v0
+    t_enter, t_exit = 0.0, 1.0
+    for side in range(4):
+        if side == 0:
+            p, q = -du, u0
+        elif side == 1:
+            p, q = du, image_width - 1 - u0
+        elif side == 2:
+            p, q = -dv, v0
+        else:
+            p, q = dv, image_height - 1 - v0
+        if p == 0:
+            if q < 0:
+                return 1.0, 0.0
+        elif p < 0:
+            t_enter = max(t_enter, q / p)
+        else:
+            t_exit = min(t_exit, q / p)
+    return t_enter, t_exit
+
+
+def project_points_batch(dna_stack: np.array, world_points: np.array) -> np.array:
+    """ Projects world points with a whole stack of cameras.
+
+    The dna layout matches CameraTranslator: fu, fv, cx, cy, tx, ty, tz, rx, ry, rz, d0, ..., d4
+
+    Points behind the camera are projected as well (mirrored through the camera center), see camera_depths.
+
+    :param dna_stack: n x 15 camera dna
+    :param world_points: m x 3 world points
+    :return: n x m x 2 projected points
+    """
+    dna_stack = np.asarray(dna_stack, dtype=np.float64)
+    rotations = rotation_matrices(dna_stack[:, 7:10]).reshape(-1, 9)
+    x, y, z = (world_points[None, :, i].astype(np.float64) for i in range(3))
+    r = [rotations[:, i, None] for i in range(9)]
+    t = [dna_stack[:, 4 + i, None] for i in range(3)]
+    fx, fy, cx, cy, k1, k2, p1, p2, k3 = (dna_stack[:, i, None] for i in (0, 1, 2, 3, 10, 11, 12, 13, 14))
+    u, v = _project_point(x, y, z, r, t, fx, fy, cx, cy, k1, k2, p1, p2, k3)
+    return np.stack((u, v), axis=-1)
+
+
+def camera_depths(dna_stack: np.array, world_points: np.array) -> np.array:
+    """ The depth (camera space z) of world points for a whole stack of cameras, negative behind the camera.
+
+    :param dna_stack: n x 15 camera dna
+    :param world_points: m x 3 world points
+    :return: n x m depths
+    """
+    dna_stack = np.asarray(dna_stack, dtype=np.float64)
+    rotations = rotation_matrices(dna_stack[:, 7:10]).reshape(-1, 9)
+    x, y, z = (world_points[None, :, i].astype(np.float64) for i in range(3))
+    # The same operations as in _project_point
+    return rotations[:, 6, None] * x + rotations[:, 7, None] * y + rotations[:, 8, None] * z + dna_stack[:, 6, None]
+
+
+def projected_connection_lengths(geometry: BaseGeometry, dna: np.array) -> np.array:
+    """ Projects the geometry with a (rough) camera and measures every connection in pixels.
+
+    Useful as importance for geometry_levels, the connections which appear longest in the image are kept first.
+
+    :param geometry: The geometry
+    :param dna: The full camera dna, see CameraTranslator
+    :return: The pixel length of every connection
+    """
+    points = project_points_batch(np.asarray(dna).reshape(1, -1), geometry.world_points)[0]
+    segments = geometry.segments
+    lengths = np.nan_to_num(np.linalg.norm(points[segments[:, 1]] - points[segments[:, 0]], axis=1))
+    return np.bincount(geometry.segment_connections, weights=lengths, minlength=len(geometry.connections))
+
+
+def orientation_bins(dx: np.array, dy: np.array, n_bins: int) -> np.array:
+    """
+    Quantizes line directions: bin b is centered at the angle b * pi / n_bins (x to the right, y downwards).
+    :param dx: x components of the directions
+    :param dy: y components of the directions
+    :param n_bins: The number of orientation bins
+    :return: The bin of every direction
+    """
+    angles = np.arctan2(dy, dx)
+    angles = np.where(angles < 0, angles + np.pi, angles)
+    return (angles * n_bins / np.pi + 0.5).astype(np.int64) % n_bins
+
+
+def visible_segments_batch(dna_stack: np.array, world_points: np.array, segments: np.array, image_width: int,
+                           image_height: int, near_plane: float = 1e-3) -> Tuple[np.array, np.array, np.array]:
+    """ The visible parts of the segments for a whole stack of cameras, like project_segments for a single camera.
+
+    Segments completely behind the near plane are dropped and segments crossing it are cut at the near plane (in
+    camera space). The projected segments are clipped exactly to the image box and truncated to integer pixels.
+
+    :param dna_stack: n x 15 camera dna, see CameraTranslator
+    :param world_points: m x 3 world points
+    :param segments: s x 2 indices of the segments' world points
+    :param image_width: The image width
+    :param image_height: The image height
+    :param near_plane: The distance of the near plane in front of the camera
+    :return: A tuple of the camera and the segment index of every visible segment (ordered by camera, then segment)
+        and its k x 2 x 2 pixel end points
+    """
+    dna_stack = np.asarray(dna_stack, dtype=np.float64)
+    rotations = rotation_matrices(dna_stack[:, 7:10]).reshape(-1, 9)
+    x, y, z = (world_points[None, :, i].astype(np.float64) for i in range(3))
+    # The same operations as in _project_point
+    xc, yc, zc = (rotations[:, 3 * i, None] * x + rotations[:, 3 * i + 1, None] * y + rotations[:, 3 * i + 2, None] * z
+                  + dna_stack[:, 4 + i, None] for i in range(3))
+    camera_points = np.stack((xc, yc, zc), axis=-1)
+
+    start, end = camera_points[:, segments[:, 0]], camera_points[:, segments[:, 1]]
+    cameras, segment_indices = np.nonzero((start[..., 2] >= near_plane) | (end[..., 2] >= near_plane))
+    start, end = start[cameras, segment_indices], end[cameras, segment_indices]
+
+    # Cut segments crossing the near plane
+    with np.errstate(divide='ignore', invalid='ignore'):
+        alpha = ((near_plane - start[:, 2]) / (end[:, 2] - start[:, 2]))[:, None]
+        near_points = start + alpha * (end - start)
+    start = np.where(start[:, 2:] < near_plane, near_points, start)
+    end = np.where(end[:, 2:] < near_plane, near_points, end)
+
+    fx, fy, cx, cy, k1, k2, p1, p2, k3 = (dna_stack[cameras, i] for i in (0, 1, 2, 3, 10, 11, 12, 13, 14))
+    with np.errstate(over='ignore', invalid='ignore'):
+        u0, v0 = _project_camera_point(start[:, 0], start[:, 1], start[:, 2], fx, fy, cx, cy, k1, k2, p1, p2, k3)
+        u1, v1 = _project_camera_point(end[:, 0], end[:, 1], end[:, 2], fx, fy, cx, cy, k1, k2, p1, p2, k3)
+        start, end, visible = clip_segments(np.stack((u0, v0), axis=1), np.stack((u1, v1), axis=1), image_width,
+                                            image_height)
+    pixel_segments = np.stack((start[visible], end[visible]), axis=1).astype(np.int64)
+    return cameras[visible], segment_indices[visible], pixel_segments
+
+
+def _score_population_numpy(dna_stack: np.array, world_points: np.array, segments: np.array,
+                            fitness_map: np.array, n_bins: int, near_plane: float) -> Tuple[np.array, np.array]:
+    # fitness_map is height x width x n_frames, the scores are n_cameras x n_frames. For oriented maps (n_bins > 0),
+    # the channels are orientation bins and every segment is looked up in the channel of its direction.
+    # Cameras without any visible segment are culled (score 0) and flagged
+    n_cameras = len(dna_stack)
+    image_height, image_width, n_frames = fitness_map.shape
+    cameras, _, pixel_segments = visible_segments_batch(dna_stack, world_points, segments, image_width, image_height,
+                                                        near_plane)
+    culled = np.bincount(cameras, minlength=n_cameras) == 0
+    if np.all(culled):
+        return np.zeros((n_cameras, 1 if n_bins > 0 else n_frames)), culled
+
+    start = pixel_segments[:, 0]
+    delta = pixel_segments[:, 1] - start
+    steps = np.abs(delta).max(axis=1)
+
+    # One sample per pixel step along every visible segment, the clipped end points are inside of the image
+    counts = steps + 1
+    owner = np.repeat(np.arange(len(pixel_segments)), counts)
+    offsets = np.cumsum(counts) - counts
+    i = np.arange(counts.sum()) - np.repeat(offsets, counts)
+    safe_steps = np.maximum(steps, 1)[owner]
+    xs = np.floor(start[owner, 0] + (i * delta[owner, 0]) / safe_steps + 0.5).astype(np.int64)
+    ys = np.floor(start[owner, 1] + (i * delta[owner, 1]) / safe_steps + 0.5).astype(np.int64)
+
+    camera = cameras[owner]
+    pixel = ys * image_width + xs
+
+    # Every pixel counts once per camera
+    unique_keys, first_samples = np.unique(camera * (image_width * image_height) + pixel, return_index=True)
+    unique_camera, unique_pixel = np.divmod(unique_keys, image_width * image_height)
+    if n_bins > 0:
+        # Like the compiled loop, a pixel covered by several segments is looked up in the first segment's channel
+        channels = orientation_bins(delta[:, 0], delta[:, 1], n_bins)[owner[first_samples]]
+        values = fitness_map.reshape(-1, n_frames)[unique_pixel, channels].astype(np.float64)
+        return np.bincount(unique_camera, weights=values, minlength=n_cameras)[:, np.newaxis], culled
+    values = fitness_map.reshape(-1, n_frames)[unique_pixel].astype(np.float64)
+    scores = np.stack([np.bincount(unique_camera, weights=values[:, f], minlength=n_cameras)
+                       for f in range(n_frames)], axis=1)
+    return scores, culled
+
+
+def _score_population_loop(dna_stack, rotations, world_points, segments, fitness_map, stamps, first_stamp, n_bins,
+                           near_plane):
+    """
+    Scores one camera after the other in a single loop: cuts every segment at the near plane, projects and clips it to
+    the image like visible_segments_batch, walks along it pixel by pixel and accumulates the fitness of every pixel
+    which was not visited before by the same camera.
+    Visited pixels are marked with a per camera stamp, so the stamp image never needs to be cleared.
+    The fitness map is height x width x n_frames, every pixel is looked up in all frames (n_cameras x n_frames scores).
+    If n_bins > 0, the channels are orientation bins instead and every segment is looked up in the channel of its
+    direction (n_cameras x 1 scores).
+    Cameras without any visible segment are culled: they score 0 and are flagged.
+    """
+    n_cameras = dna_stack.shape[0]
+    image_height, image_width, n_frames = fitness_map.shape
+    scores = np.zeros((n_cameras, n_frames))
+    culled = np.zeros(n_cameras, dtype=np.bool_)
+    camera_points = np.empty((world_points.shape[0], 3))
+    projected = np.empty((world_points.shape[0], 2))
+
+    for c in range(n_cameras):
+        d = dna_stack[c]
+        r = rotations[c]
+        for m in range(world_points.shape[0]):
+            x, y, z = world_points[m, 0], world_points[m, 1], world_points[m, 2]
+            # The same operations as in _project_point
+            for i in range(3):
+                camera_points[m, i] = r[3 * i] * x + r[3 * i + 1] * y + r[3 * i + 2] * z + d[4 + i]
+            if camera_points[m, 2] >= near_plane:
+                projected[m, 0], projected[m, 1] = _project_camera_point_compiled(
+                    camera_points[m, 0], camera_points[m, 1], camera_points[m, 2], d[0], d[1], d[2], d[3], d[10],
+                    d[11], d[12], d[13], d[14])
+
+        stamp = first_stamp + c
+        score = 0.0
+        culled[c] = True
+        for s in range(segments.shape[0]):
+            a, b = segments[s, 0], segments[s, 1]
+            a_behind, b_behind = camera_points[a, 2] < near_plane, camera_points[b, 2] < near_plane
+            if a_behind and b_behind:
+                continue
+            u0, v0, u1, v1 = projected[a, 0], projected[a, 1], projected[b, 0], projected[b, 1]
+            if a_behind or b_behind:
+                # Cut at the near plane
+                alpha = (near_plane - camera_points[a, 2]) / (camera_points[b, 2] - camera_points[a, 2])
+                xn = camera_points[a, 0] + alpha * (camera_points[b, 0] - camera_points[a, 0])
+                yn = camera_points[a, 1] + alpha * (camera_points[b, 1] - camera_points[a, 1])
+                zn = camera_points[a, 2] + alpha * (camera_points[b, 2] - camera_points[a, 2])
+                un, vn = _project_camera_point_compiled(xn, yn, zn, d[0], d[1], d[2], d[3], d[10], d[11], d[12], d[13],
+                                                        d[14])
+                if a_behind:
+                    u0, v0 = un, vn
+                else:
+                    u1, v1 = un, vn
+            t_enter, t_exit = _clip_segment_compiled(u0, v0, u1, v1, image_width, image_height)
+            if t_enter > t_exit:
+                continue
+            culled[c] = False
+
+            du, dv = u1 - u0, v1 - v0
+            x0, y0 = np.int64(u0 + t_enter * du), np.int64(v0 + t_enter * dv)
+            dx, dy = np.int64(u0 + t_exit * du) - x0, np.int64(v0 + t_exit * dv) - y0
+            steps = max(abs(dx), abs(dy))
+            safe_steps = max(steps, 1)
+            channel = 0
+            if n_bins > 0:
+                angle = math.atan2(dy, dx)
+                if angle < 0:
+                    angle += math.pi
+                channel = np.int64(angle * n_bins / math.pi + 0.5) % n_bins
+            for i in range(steps + 1):
+                x = np.int64(np.floor(x0 + (i * dx) / safe_steps + 0.5))
+                y = np.int64(np.floor(y0 + (i * dy) / safe_steps + 0.5))
+                if stamps[y, x] != stamp:
+                    stamps[y, x] = stamp
+                    if n_frames == 1 or n_bins > 0:
+                        # float() accumulates in double precision without numba as well (NumPy 2 keeps float32)
+                        score += float(fitness_map[y, x, channel])
+                    else:
+                        for f in range(n_frames):
+                            scores[c, f] += fitness_map[y, x, f]
+        if n_frames == 1 or n_bins > 0:
+            scores[c, 0] = score
+    return scores, culled
+
+
+# Replaced by the compiled functions in _compiled_score_population, the numba loop resolves them on compilation
+_project_camera_point_compiled = _project_camera_point
+_clip_segment_compiled = _clip_segment
+_score_population_compiled = None
+_compile_lock = threading.Lock()
+
+
+def _compiled_score_population() -> Callable:
+    global _project_camera_point_compiled, _clip_segment_compiled, _score_population_compiled
+    with _compile_lock:
+        if _score_population_compiled is None:
+            import numba
+            _project_camera_point_compiled = numba.njit(cache=True)(_project_camera_point)
+            _clip_segment_compiled = numba.njit(cache=True)(_clip_segment)
+            # Without the GIL, scorers of different fitness maps run in parallel threads
+            _score_population_compiled = numba.njit(cache=True, nogil=True)(_score_population_loop)
+        return _score_population_compiled
+
+
+class PopulationScorer:
+    """
+    Scores a whole population of camera dna in one call.
+
+    In contrast to CameraScorer, the geometry is not rasterized with OpenCV. Instead, every projected segment is
+    sampled once per pixel step (1 pixel wide lines) and every covered pixel's fitness is added once per camera.
+
+    Like CameraScorer (see project_segments), segments are cut at the near plane in camera space and clipped exactly
+    to the image. Cameras without any visible segment are not scored and get the culled_fitness, which is the lowest
+    possible fitness by default.
+
+    Two backends compute the same scores:
+    (A) "numba": a compiled loop over all cameras, available if numba is installed
+    (B) "numpy": a vectorized implementation for the whole population
+    The default "auto" uses numba if available and falls back to NumPy otherwise.
+
+    Stacked fitness maps (height x width x n_frames, see MultiFrameFitness) are supported: every camera is projected
+    once and the per frame scores are combined by the aggregate function. Oriented fitness maps (height x width x
+    n_bins, see OrientedDistanceMap) are supported as well: every segment is looked up in the channel of its direction.
+    """
+    BACKENDS = ("auto", "numba", "numpy")
+
+    def __init__(self, fitness_map: np.array, geometry: BaseGeometry, backend: str = "auto",
+                 aggregate: Optional[Callable[[np.array], np.array]] = None,
+                 n_orientation_bins: Optional[int] = None, culled_fitness: float = -np.inf,
+                 near_plane: float = 1e-3) -> None:
+        """
+        :param fitness_map: The fitness map, as created by a FitnessStrategy
+        :param geometry: The geometry which is projected for every camera
+        :param backend: One of PopulationScorer.BACKENDS
+        :param aggregate: Combines n x n_frames scores of a stacked fitness map to n scores, e.g.
+            FitnessStrategy.aggregate_frame_scores. Defaults to the mean
+        :param n_orientation_bins: If set, the channels of the fitness map are orientation bins, see
+            FitnessStrategy.orientation_bins
+        :param culled_fitness: The fitness of cameras, which do not see any segment of the geometry
+        :param near_plane: The distance of the near plane in front of the camera
+        """
+        super().__init__()
+        if backend not in PopulationScorer.BACKENDS:
+            raise ValueError("Unknown backend '{}', use one of {}".format(backend, PopulationScorer.BACKENDS))
+        if backend == "numba" and not NUMBA_AVAILABLE:
+            raise ValueError("The numba backend was requested, but numba is not installed")
+        if backend == "auto":
+            backend = "numba" if NUMBA_AVAILABLE else "numpy"
+
+        self._backend = backend
+        self._n_bins = n_orientation_bins or 0
+        self._is_stacked = np.ndim(fitness_map) == 3 and self._n_bins == 0
+        self._fitness_map = np.ascontiguousarray(fitness_map, dtype=np.float32).reshape(
+            np.shape(fitness_map)[:2] + (-1,))
+        self._aggregate = aggregate
+        self._culled_fitness = culled_fitness
+        self._near_plane = float(near_plane)
+        # Only points of the segments are projected
+        used_points, segments = np.unique(geometry.segments, return_inverse=True)
+        self._world_points = np.ascontiguousarray(np.asarray(geometry.world_points, dtype=np.float64)[used_points])
+        self._segments = np.ascontiguousarray(segments.reshape(-1, 2), dtype=np.int64)
+        self._stamps = np.zeros(np.shape(fitness_map)[:2], dtype=np.int64)
+        self._next_stamp = 1
+        self.n_culled = 0
+
+    @property
+    def backend(self):
+        return self._backend
+
+    def score(self, dna_stack: np.array) -> np.array:
+        """
+        :param dna_stack: n x 15 camera dna, see CameraTranslator
+        :return: n scores
+        """
+        dna_stack = np.ascontiguousarray(dna_stack, dtype=np.float64).reshape(-1, 15)
+        if self._backend == "numpy":
+            frame_scores, culled = _score_population_numpy(dna_stack, self._world_points, self._segments,
+                                                           self._fitness_map, self._n_bins, self._near_plane)
+        else:
+            rotations = np.ascontiguousarray(rotation_matrices(dna_stack[:, 7:10]).reshape(-1, 9))
+            score_compiled = _score_population_compiled or _compiled_score_population()
+            frame_scores, culled = score_compiled(dna_stack, rotations, self._world_points, self._segments,
+                                                  self._fitness_map, self._stamps, self._next_stamp, self._n_bins,
+                                                  self._near_plane)
+            self._next_stamp += len(dna_stack)
+        if not self._is_stacked:
+            scores = frame_scores[:, 0]
+        elif self._aggregate is None:
+            scores = frame_scores.mean(axis=1)
+        else:
+            scores = np.array(self._aggregate(frame_scores), dtype=np.float64)
+        scores[culled] = self._culled_fitness
+        self.n_culled += int(np.count_nonzero(culled))
+        return scores
@@ -0,0 +1,346 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import cv2 as cv
+
+from evolution.base.base_genome_factory import BaseGenomeFactory
+from evolution.base.base_genome_parameters import BaseGenomeParameters
+from evolution.base.base_geometry import BaseGeometry
+from evolution.base.base_result import BaseResult
+from evolution.base.base_strategies import PopulateStrategy, array_digest
+from evolution.strategies.populate import ValueUniformPopulation
+from evolution.strategies.strategy_bundle import StrategyBundle
+
+# Edge descriptors are downsampled distance maps of this size (width, height), independent of the image size
+DESCRIPTOR_SIZE = (32, 24)
+
+
+def image_hash(edge_image: np.array) -> str:
+    """
+    :return: A hash of the edge image's pixels and shape
+    """
+    edge_image = np.ascontiguousarray(edge_image)
+    digest = hashlib.sha1(str(edge_image.shape).encode())
+    digest.update(edge_image.tobytes())
+    return digest.hexdigest()
+
+
+def geometry_hash(geometry: BaseGeometry) -> str:
+    """
+    :return: A hash of the geometry's world points and connections
+    """
+    digest = hashlib.sha1(np.ascontiguousarray(geometry.world_points, dtype=np.float64).tobytes())
+    digest.update(json.dumps([list(map(int, connection)) for connection in geometry.connections]).encode())
+    return digest.hexdigest()
+
+
+def bundle_hash(strategy_bundle: StrategyBundle, genome_parameters: Optional[BaseGenomeParameters] = None,
+                start_dna: Optional[np.array] = None) -> str:
+    """
+    A hash of everything besides image and geometry, which determines the result of a run: the strategies (see
+    StrategyBundle.identifier), the genome parameters and the start dna. Parameters which only change the speed of a
+    run (e.g. the threads of a tiled DistanceMap) do not change the hash.
+    """
+    description = {"strategies": strategy_bundle.identifier}
+    if genome_parameters is not None:
+        description["parameters"] = genome_parameters.to_json()
+    if start_dna is not None:
+        description["start_dna"] = [float(value) for value in start_dna]
+    return hashlib.sha1(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def edge_descriptor(edge_image: np.array, size: Tuple[int, int] = DESCRIPTOR_SIZE) -> np.array:
+    """
+    A compact descriptor of an edge image: its distance map, downsampled to size and normalized by the image
+    diagonal. Similar views of the same venue have close descriptors (euclidean distance).
+    :param edge_image: The binary edge image
+    :param size: The descriptor size (width, height)
+    :return: The flattened descriptor (float32)
+    """
+    height, width = edge_image.shape
+    distances = cv.distanceTransform(~edge_image, cv.DIST_L2, maskSize=3)
+    descriptor = cv.resize(distances, size, interpolation=cv.INTER_AREA).ravel()
+    return descriptor / np.float32(np.hypot(height, width))
+
+
+def rescale_intrinsics(dna: np.array, image_shape: Tuple[int, int], target_shape: Tuple[int, int]) -> np.array:
+    """
+    Transfers a camera to another image size: focal lengths and principal point (fu, fv, cx, cy) are scaled with the
+    image, distortion and pose are kept.
+    :return: The rescaled (full) dna
+    """
+    (height, width), (target_height, target_width) = image_shape, target_shape
+    dna = np.array(dna, dtype=np.float64)
+    dna[[0, 2]] *= target_width / width
+    dna[[1, 3]] *= target_height / height
+    return dna
+
+
+class LibraryEntry(NamedTuple):
+    entry_id: int
+    dna: np.array
+    fitness: float
+    image_shape: Tuple[int, int]
+    image_hash: str
+    geometry_hash: str
+    bundle_hash: str
+    name: Optional[str]
+    # Descriptor distance to the query, 0 for exact hits
+    distance: float = 0.0
+
+
+class CameraLibrary:
+    """
+    A persistent library of solved cameras (an sqlite file). Every entry stores the best (full) dna of a run together
+    with the hashes of its edge image, geometry and strategy bundle, the image size and an edge descriptor (see
+    edge_descriptor).
+
+    (A) nearest: the prior cameras, whose edge images are most similar to a new edge image. Used to seed the
+        population of a new run (see LibraryPopulation)
+    (B) exact: a prior result of exactly the same run (image, geometry and bundle hash), which does not need to be
+        optimized again (see run_with_library)
+
+    Descriptors are kept in memory after the first lookup, lookups are a single vectorized distance computation.
+    The library is thread safe.
+    """
+    _SCHEMA = """CREATE TABLE IF NOT EXISTS cameras (
+                     id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     image_hash TEXT NOT NULL,
+                     geometry_hash TEXT NOT NULL,
+                     bundle_hash TEXT NOT NULL,
+                     height INTEGER NOT NULL,
+                     width INTEGER NOT NULL,
+                     dna TEXT NOT NULL,
+                     fitness REAL NOT NULL,
+                     descriptor BLOB NOT NULL,
+                     name TEXT,
+                     created REAL NOT NULL);
+                 CREATE INDEX IF NOT EXISTS exact_lookup ON cameras (image_hash, geometry_hash, bundle_hash);"""
+
+    def __init__(self, file_name: str) -> None:
+        """
+        :param file_name: The library file, created if it does not exist. ":memory:" creates a temporary library
+        """
+        super().__init__()
+        self._connection = sqlite3.connect(file_name, check_same_thread=False)
+        self._connection.executescript(self._SCHEMA)
+        self._lock = threading.Lock()
+        self._index = None
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM cameras").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def add(self, dna: np.array, fitness: float, edge_image: np.array, geometry: BaseGeometry,
+            run_hash: str = "", name: Optional[str] = None) -> int:
+        """
+        Stores a solved camera.
+        :param dna: The full dna of the camera
+        :param fitness: The fitness of the camera
+        :param edge_image: The edge image the camera was fitted to
+        :param geometry: The fitted geometry
+        :param run_hash: The bundle hash of the run (see bundle_hash). Entries without it are never exact hits
+        :param name: An optional display name, e.g. venue and camera mount
+        :return: The id of the new entry
+        """
+        height, width = edge_image.shape
+        descriptor = edge_descriptor(edge_image)
+        row = (image_hash(edge_image), geometry_hash(geometry), run_hash, height, width,
+               json.dumps([float(value) for value in dna]), float(fitness), descriptor.tobytes(), name, time.time())
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO cameras (image_hash, geometry_hash, bundle_hash, height, width, dna, fitness, descriptor, "
+                "name, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+            # The in-memory index is rebuilt by the next lookup
+            self._index = None
+            return cursor.lastrowid
+
+    def exact(self, edge_image: np.array, geometry: BaseGeometry, run_hash: str) -> Optional[LibraryEntry]:
+        """
+        :return: The best stored result of the same edge image, geometry and bundle hash, or None
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT id, dna, fitness, height, width, image_hash, geometry_hash, bundle_hash, name FROM cameras "
+                "WHERE image_hash = ? AND geometry_hash = ? AND bundle_hash = ? ORDER BY fitness DESC LIMIT 1",
+                (image_hash(edge_image), geometry_hash(geometry), run_hash)).fetchone()
+        if row is None:
+            return None
+        entry_id, dna, fitness, height, width, *hashes, name = row
+        return LibraryEntry(entry_id, np.array(json.loads(dna)), fitness, (height, width), *hashes, name)
+
+    def nearest(self, edge_image: np.array, geometry: Optional[BaseGeometry] = None, k: int = 4,
+                same_image_size: bool = False) -> List[LibraryEntry]:
+        """
+        Finds the prior cameras with the most similar edge images.
+        :param edge_image: The new edge image
+        :param geometry: If set, only cameras fitted to the same geometry are returned
+        :param k: The maximum number of cameras
+        :param same_image_size: If True, only cameras of the same image size are returned. Otherwise, cameras of
+            other image sizes are rescaled (see rescale_intrinsics)
+        :return: The cameras, most similar first
+        """
+        index = self._load_index()
+        if len(index["ids"]) == 0:
+            return []
+
+        image_shape = edge_image.shape
+        mask = np.ones(len(index["ids"]), dtype=bool)
+        if geometry is not None:
+            mask &= index["geometry_hashes"] == geometry_hash(geometry)
+        if same_image_size:
+            mask &= np.all(index["image_shapes"] == image_shape, axis=1)
+        candidates = np.flatnonzero(mask)
+        if len(candidates) == 0:
+            return []
+
+        differences = index["descriptors"][candidates] - edge_descriptor(edge_image)
+        distances = np.einsum("ij,ij->i", differences, differences)
+        if len(candidates) > k:
+            nearest = np.argpartition(distances, k - 1)[:k]
+        else:
+            nearest = np.arange(len(candidates))
+        nearest = nearest[np.argsort(distances[nearest])]
+
+        entries = []
+        for i in nearest:
+            j = candidates[i]
+            entry_shape = tuple(int(n) for n in index["image_shapes"][j])
+            dna = index["dnas"][j]
+            if entry_shape != image_shape:
+                dna = rescale_intrinsics(dna, entry_shape, image_shape)
+            entries.append(LibraryEntry(int(index["ids"][j]), dna, float(index["fitnesses"][j]), entry_shape,
+                                        index["image_hashes"][j], index["geometry_hashes"][j],
+                                        index["bundle_hashes"][j], index["names"][j], float(np.sqrt(distances[i]))))
+        return entries
+
+    def _load_index(self) -> dict:
+        with self._lock:
+            if self._index is not None:
+                return self._index
+            rows = self._connection.execute(
+                "SELECT id, dna, fitness, height, width, image_hash, geometry_hash, bundle_hash, name, descriptor "
+                "FROM cameras ORDER BY id").fetchall()
+            n_values = DESCRIPTOR_SIZE[0] * DESCRIPTOR_SIZE[1]
+            self._index = {
+                "ids": np.array([row[0] for row in rows], dtype=np.int64),
+                "dnas": [np.array(json.loads(row[1])) for row in rows],
+                "fitnesses": np.array([row[2] for row in rows]),
+                "image_shapes": np.array([(row[3], row[4]) for row in rows], dtype=np.int64).reshape(-1, 2),
+                "image_hashes": [row[5] for row in rows],
+                "geometry_hashes": np.array([row[6] for row in rows], dtype=object),
+                "bundle_hashes": [row[7] for row in rows],
+                "names": [row[8] for row in rows],
+                "descriptors": np.frombuffer(b"".join(row[9] for row in rows),
+                                             dtype=np.float32).reshape(-1, n_values),
+            }
+            return self._index
+
+
+class LibraryPopulation(PopulateStrategy):
+    # Half widths of the uniform noise around every prior camera
+    _prior_range = np.array([50, 50, 5, 5, 0.05, 0.05, 0.25, np.deg2rad(0.5), np.deg2rad(0.5), np.deg2rad(0.5),
+                             0, 0, 0, 0, 0])
+
+    def __init__(self, library: CameraLibrary, edge_image: np.array, geometry: BaseGeometry,
+                 population_size: int = 16, k: int = 4, spread: Optional[np.array] = None) -> None:
+        """
+        Seeds the population around the prior cameras of the library, whose edge images are most similar to the edge
+        image (see CameraLibrary.nearest). Every prior gets an equal share of the population, the first genome of
+        every share is the prior itself. Falls back to ValueUniformPopulation around the start dna, if the library
+        has no camera of the geometry.
+
+        Frozen genes keep the value of the start dna.
+
+        :param library: The camera library
+        :param edge_image: The binary edge image the geometry is fitted to
+        :param geometry: The geometry
+        :param population_size: The population size
+        :param k: The maximum number of prior cameras
+        :param spread: Optional half widths of the uniform noise around the priors (full dna)
+        """
+        super().__init__()
+        self.library = library
+        self.edge_image = edge_image
+        self.geometry = geometry
+        self.population_size = population_size
+        self.k = k
+        self.spread = self._prior_range if spread is None else np.asarray(spread, dtype=np.float64)
+
+    def populate(self, genome_factory: BaseGenomeFactory, start_dna: np.array):
+        priors = self.library.nearest(self.edge_image, self.geometry, self.k)
+        if len(priors) == 0:
+            return ValueUniformPopulation(self.population_size).populate(genome_factory, start_dna)
+
+        lower_bounds, upper_bounds = genome_factory.genome_bounds
+        spread = genome_factory.reduce_dna(self.spread)
+        population = []
+        for i in range(self.population_size):
+            dna = genome_factory.reduce_dna(priors[i % len(priors)].dna)
+            if i >= len(priors):
+                dna = dna + np.random.uniform(-spread, spread)
+            population.append(genome_factory.create(np.clip(dna, lower_bounds, upper_bounds)))
+        return population
+
+    def printable_identifier(self):
+        return "LibraryPopulation(n={}, k={})".format(self.population_size, self.k)
+
+    def result_identifier(self) -> str:
+        return "LibraryPopulation(n={}, k={}, spread={}, image={}, geometry={})".format(
+            self.population_size, self.k, array_digest(self.spread), array_digest(self.edge_image),
+            array_digest(self.geometry.world_points))
+
+
+class CachedResult(BaseResult):
+    """
+    The result of a run, which was not optimized again because the library contained an exact hit
+    """
+    def __init__(self, entry: LibraryEntry, genome_factory: BaseGenomeFactory) -> None:
+        super().__init__()
+        self._entry = entry
+        self._best_genome = genome_factory.create(entry.dna)
+        self._best_fitness = entry.fitness
+
+    @property
+    def entry(self) -> LibraryEntry:
+        return self._entry
+
+
+def run_with_library(library: CameraLibrary, camera_algorithm, edge_image: np.array, geometry: BaseGeometry,
+                     strategy_bundle: StrategyBundle, start_dna: np.array, exact_hits: bool = True,
+                     store: bool = True, name: Optional[str] = None) -> BaseResult:
+    """
+    Runs a camera algorithm unless the library already contains its result.
+    :param library: The camera library
+    :param camera_algorithm: The GeneticCameraAlgorithm, created with edge_image, geometry and strategy_bundle. Use a
+        LibraryPopulation in the bundle to seed the run with prior cameras
+    :param edge_image: The binary edge image
+    :param geometry: The geometry
+    :param strategy_bundle: The strategy bundle of the algorithm
+    :param start_dna: The start dna
+    :param exact_hits: If True, a stored result of the same image, geometry, bundle, genome parameters and start dna
+        is returned as CachedResult without optimizing
+    :param store: If True, the best camera of a new run is added to the library
+    :param name: Optional display name of the stored entry
+    :return: The result of the run or a CachedResult
+    """
+    run_hash = bundle_hash(strategy_bundle, camera_algorithm.genome_factory.genome_parameters, start_dna)
+    if exact_hits:
+        entry = library.exact(edge_image, geometry, run_hash)
+        if entry is not None:
+            return CachedResult(entry, camera_algorithm.genome_factory)
+
+    result = camera_algorithm.run(start_dna)
+    best_genome, best_fitness = result.best_genome
+    if store and best_genome is not None:
+        library.add(best_genome.dna, best_fitness, edge_image, geometry, run_hash, name)
+    return result
@@ -41,6 +41,82 @@ def project_geometry(geometry: BaseGeometry, camera_matrix: np.array, t_vector:
     return project_points(geometry.world_points, camera_matrix, t_vector, r_vector, d_vector)
 
 
+def clip_segments(start_points: np.array, end_points: np.array, image_width: int, image_height: int):
+    """ Clips 2d segments exactly to the image box [0, width - 1] x [0, height - 1] (Liang-Barsky).
+
+    :param start_points: k x 2 segment start points
+    :param end_points: k x 2 segment end points
+    :param image_width: The image width
+    :param image_height: The image height
+    :return: A tuple of the clipped k x 2 start and end points and a boolean mask of the visible segments.
+        Clipped points of invisible segments are undefined.
+    """
+    delta = end_points - start_points
+    t_enter = np.zeros(len(start_points))
+    t_exit = np.ones(len(start_points))
+    visible = np.all(np.isfinite(start_points) & np.isfinite(end_points), axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for p, q in ((-delta[:, 0], start_points[:, 0]),
+                     (delta[:, 0], image_width - 1 - start_points[:, 0]),
+                     (-delta[:, 1], start_points[:, 1]),
+                     (delta[:, 1], image_height - 1 - start_points[:, 1])):
+            visible &= ~((p == 0) & (q < 0))
+            r = q / p
+            t_enter = np.where(p < 0, np.maximum(t_enter, r), t_enter)
+            t_exit = np.where(p > 0, np.minimum(t_exit, r), t_exit)
+
+    visible &= t_enter <= t_exit
+    return start_points + t_enter[:, None] * delta, start_points + t_exit[:, None] * delta, visible
+
+
+def project_segments(geometry: BaseGeometry, camera_matrix: np.array, t_vector: np.array, r_vector: np.array,
+                     d_vector: np.array, image_width: int, image_height: int, near_plane: float = 1e-3):
+    """ Projects the geometry's segments and keeps only their visible parts.
+
+    (A) The world points are transformed to camera space. Segments completely behind the near plane are culled,
+        segments crossing it are cut at the near plane.
+    (B) The remaining segment end points are projected (including distortion).
+    (C) The projected segments are clipped exactly to the image box, segments outside the image are dropped.
+
+    :param geometry: The geometry
+    :param camera_matrix: 3x3 Intrinsic camera matrix
+    :param t_vector: 3 component extrinsic translation vector
+    :param r_vector: 3 component extrinsic rotation vector
+    :param d_vector: 5 component distortion coefficients
+    :param image_width: The image width
+    :param image_height: The image height
+    :param near_plane: The distance of the near plane in front of the camera
+    :return: A tuple of a k x 2 x 2 int32 array with the visible segments' pixel end points and an array with the
+        index of the connection every visible segment belongs to
+    """
+    rotation_matrix, _ = cv.Rodrigues(np.asarray(r_vector, dtype=np.float64))
+    camera_points = geometry.world_points @ rotation_matrix.T + np.asarray(t_vector, dtype=np.float64).reshape(1, 3)
+
+    start, end = camera_points[geometry.segments[:, 0]], camera_points[geometry.segments[:, 1]]
+    in_front = (start[:, 2] >= near_plane) | (end[:, 2] >= near_plane)
+    start, end = start[in_front], end[in_front]
+    connection_indices = geometry.segment_connections[in_front]
+
+    # Cut segments crossing the near plane
+    with np.errstate(divide='ignore', invalid='ignore'):
+        alpha = ((near_plane - start[:, 2]) / (end[:, 2] - start[:, 2]))[:, None]
+        near_points = start + alpha * (end - start)
+    start = np.where(start[:, 2:] < near_plane, near_points, start)
+    end = np.where(end[:, 2:] < near_plane, near_points, end)
+
+    if len(start) == 0:
+        return np.zeros((0, 2, 2), dtype=np.int32), connection_indices
+
+    zero = np.zeros(3)
+    projected, _ = cv.projectPoints(np.concatenate((start, end)), zero, zero, camera_matrix, d_vector)
+    projected = projected.reshape(2, -1, 2)
+
+    start, end, visible = clip_segments(projected[0], projected[1], image_width, image_height)
+    pixel_segments = np.stack((start[visible], end[visible]), axis=1).astype(np.int32)
+    return pixel_segments, connection_indices[visible]
+
+
 def render_geometry_with_camera(image: np.array,
                                 geometry: BaseGeometry,
                                 camera_matrix: np.array,
@@ -51,16 +127,15 @@ def render_geometry_with_camera(image: np.array,
                                 line_thickness: int = 2,
                                 marker_type=None,
                                 marker_size=16,
-                                line_type=cv.LINE_8):
+                                line_type=cv.LINE_8) -> bool:
     """ Renders a geometry to an image using a pinhole camera model specified by the intrinsic and extrinsic camera
     parameters.
 
-    Uses project_geometry to project the geometry's world points and connects them  by using
-    geometry's connections attribute.
+    Uses project_segments to project the geometry's segments, which are culled at the camera's near plane and
+    clipped to the image. Nothing is drawn if no segment is visible.
 
     Uses OpenCV internally, so you may provide the line_color as BGR
 
-    :param with_points:
     :param image: The image to draw on
     :param geometry: The geometry
     :param camera_matrix: 3x3 Intrinsic camera matrix
@@ -69,14 +144,18 @@ def render_geometry_with_camera(image: np.array,
     :param d_vector: 5 component distortion coefficients
     :param line_color: The line color
     :param line_thickness: The line's thickness
+    :return: True, if any part of the geometry is visible
     """
-    projected_points = project_geometry(geometry, camera_matrix, t_vector, r_vector, d_vector)
     image_height, image_width = image.shape[:2]
-    for p_idx in geometry.connections:
-        poly_line_points = [[int(projected_points[idx][0][0]), int(projected_points[idx][0][1])] for idx in p_idx]
-        poly_line_points = np.clip(poly_line_points, (0, 0), (image_width, image_height))
-        cv.polylines(image, np.array([poly_line_points], dtype=np.int64), False, line_color, line_thickness, line_type)
+    segments, _ = project_segments(geometry, camera_matrix, t_vector, r_vector, d_vector, image_width, image_height)
+    if len(segments) > 0:
+        cv.polylines(image, segments, False, line_color, line_thickness, line_type)
 
     if marker_type:
-        for (x, y) in projected_points.reshape(-1, 2):
+        rotation_matrix, _ = cv.Rodrigues(np.asarray(r_vector, dtype=np.float64))
+        depth = geometry.world_points @ rotation_matrix[2] + t_vector[2]
+        projected_points = project_geometry(geometry, camera_matrix, t_vector, r_vector, d_vector)
+        for (x, y) in projected_points.reshape(-1, 2)[depth > 0]:
             cv.drawMarker(image, (int(x), int(y)), line_color, marker_type, marker_size, line_thickness, line_type)
+
+    return len(segments) > 0
@@ -0,0 +1,53 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from evolution.camera.camera_kernels import project_points_batch
+
+
+class ReprojectionErrors(NamedTuple):
+    """
+    Per camera reprojection errors in pixels
+    """
+    mean: np.array
+    rms: np.array
+    max: np.array
+
+
+def reprojection_errors(reference_dna: np.array, dna_stack: np.array, world_points: np.array,
+                        chunk_size: int = 1024) -> ReprojectionErrors:
+    """ Compares many estimated cameras against a reference camera.
+
+    Every world point is projected with the reference camera and with every estimated camera. The pixel distances
+    between both projections are reduced to mean, RMS and max errors per estimated camera.
+
+    The world points are processed in chunks of chunk_size points, all cameras at once. Memory usage is therefore
+    bounded by n_cameras x chunk_size, independent of the number of world points (e.g. a dense DenseGeometry).
+
+    :param reference_dna: The reference (ground truth) camera dna, see CameraTranslator
+    :param dna_stack: n x 15 estimated camera dna
+    :param world_points: m x 3 world points, e.g. DenseGeometry(geometry, n_samples).world_points
+    :param chunk_size: The number of world points projected at once
+    :return: The reprojection errors, every field has one entry per estimated camera
+    """
+    dna_stack = np.atleast_2d(dna_stack)
+    reference_dna = np.asarray(reference_dna).reshape(1, -1)
+    n_cameras, n_points = len(dna_stack), len(world_points)
+
+    error_sum = np.zeros(n_cameras)
+    squared_error_sum = np.zeros(n_cameras)
+    error_max = np.zeros(n_cameras)
+    for chunk_start in range(0, n_points, chunk_size):
+        chunk = world_points[chunk_start:chunk_start + chunk_size]
+        reference_points = project_points_batch(reference_dna, chunk)
+        points = project_points_batch(dna_stack, chunk)
+        squared_errors = np.sum((points - reference_points) ** 2, axis=-1)
+        errors = np.sqrt(squared_errors)
+
+        error_sum += errors.sum(axis=1)
+        squared_error_sum += squared_errors.sum(axis=1)
+        np.maximum(error_max, errors.max(axis=1), out=error_max)
+
+    return ReprojectionErrors(mean=error_sum / n_points,
+                              rms=np.sqrt(squared_error_sum / n_points),
+                              max=error_max)
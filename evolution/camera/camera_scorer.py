@@ -0,0 +1,288 @@
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+import cv2 as cv
+
+from evolution.base.base_genome import BaseGenome
+from evolution.base.base_geometry import BaseGeometry
+from evolution.base.base_translator import BaseTranslator
+from evolution.camera.camera_kernels import orientation_bins
+from evolution.camera.camera_rendering import project_segments
+
+
+class CameraScorer:
+    """
+    Scores camera genomes by rendering a geometry with the decoded camera and summing up the fitness map
+    underneath the rendered pixels.
+
+    Cameras which do not see any part of the geometry (everything behind the camera or outside of the image) are not
+    rendered at all and get the culled_fitness, which is the lowest possible fitness by default.
+
+    For stacked fitness maps (height x width x n_frames, see MultiFrameFitness), the geometry is rendered once and
+    the fitness is summed up in every frame. The per frame sums are combined by the aggregate function.
+    For oriented fitness maps (height x width x n_bins, see OrientedDistanceMap), the segments are rendered bin by bin
+    and summed up in the channel of their direction.
+    """
+    def __init__(self,
+                 fitness_map: np.array,
+                 geometry: BaseGeometry,
+                 translator: BaseTranslator,
+                 line_thickness: int = 2,
+                 culled_fitness: float = -np.inf,
+                 aggregate: Optional[Callable[[np.array], np.array]] = None,
+                 n_orientation_bins: Optional[int] = None,
+                 connections_per_batch: int = 8) -> None:
+        """
+        :param fitness_map: The fitness map, as created by a FitnessStrategy
+        :param geometry: The geometry which is rendered for every genome
+        :param translator: The translator for transforming dna to camera parameters
+        :param line_thickness: The thickness of the rendered lines
+        :param culled_fitness: The fitness of cameras, which do not see the geometry
+        :param aggregate: Combines the n_frames sums of a stacked fitness map to one score, e.g.
+            FitnessStrategy.aggregate_frame_scores. Defaults to the mean. Must not decrease if a frame sum increases
+        :param n_orientation_bins: If set, the channels of the fitness map are orientation bins, see
+            FitnessStrategy.orientation_bins
+        :param connections_per_batch: The number of connections score_bounded renders between two checks of the bound
+        """
+        super().__init__()
+        self._fitness_map = fitness_map
+        self._geometry = geometry
+        self._translator = translator
+        self._line_thickness = line_thickness
+        self._culled_fitness = culled_fitness
+        self._aggregate = np.mean if aggregate is None else aggregate
+        # Scratch images, which are only written inside the region of interest and zeroed again after every call
+        self._render_image = np.zeros(fitness_map.shape[:2], dtype=np.uint8)
+        self._previous_render_image = np.zeros(fitness_map.shape[:2], dtype=np.uint8)
+        self._n_bins = n_orientation_bins
+        self._channels = None
+        if n_orientation_bins is not None:
+            self._channels = [np.ascontiguousarray(fitness_map[:, :, b]) for b in range(n_orientation_bins)]
+        self._lookup_image = np.zeros(fitness_map.shape[:2] if self._channels else fitness_map.shape,
+                                      dtype=fitness_map.dtype)
+        self._connections_per_batch = connections_per_batch
+        # OpenCV renders odd thicknesses one pixel wider, pixel centers are up to half a pixel diagonal further away
+        self._render_radius = (line_thickness + 1) // 2 + 0.75
+        self._block_size = max(16, int(np.ceil(4 * self._render_radius)))
+        self._block_maxima = self._dilated_block_maxima(fitness_map, self._block_size)
+        # Every pixel of the image is counted at most once
+        pixel_bound = float(np.prod(fitness_map.shape[:2]) * np.abs(fitness_map).max())
+        n_frames = 1 if self._channels is not None or fitness_map.ndim == 2 else fitness_map.shape[2]
+        self._score_bound = max(abs(self._total(np.full(n_frames, pixel_bound).squeeze())),
+                                abs(self._total(np.full(n_frames, -pixel_bound).squeeze())))
+        self.n_partial_scores = 0
+        self.n_culled = 0
+
+    @property
+    def fitness_map(self):
+        return self._fitness_map
+
+    @property
+    def geometry(self):
+        return self._geometry
+
+    @property
+    def score_bound(self) -> float:
+        """
+        The largest absolute value of a complete, finite score
+        """
+        return self._score_bound
+
+    def score(self, genome: BaseGenome) -> float:
+        """
+        Renders the whole geometry and sums up the fitness map below all rendered pixels.
+
+        Only the bounding box of the rendered geometry is drawn, masked and summed up. All scratch images are
+        preallocated, so no image sized memory is allocated per call.
+
+        :param genome: The camera genome
+        :return: The fitness
+        """
+        if self._channels is not None:
+            # Oriented maps are rendered connection by connection, so pixels covered by segments of different bins
+            # are looked up in the same channel as by score_bounded
+            return self.score_bounded(genome, -np.inf)[0]
+
+        segments, _ = self._project_segments(genome)
+        if len(segments) == 0:
+            self.n_culled += 1
+            return self._culled_fitness
+
+        x0, y0, x1, y1 = self._roi(segments)
+        cv.polylines(self._render_image, segments, False, (255,), self._line_thickness)
+        score = self._masked_sum(x0, y0, x1, y1)
+        self._render_image[y0:y1, x0:x1] = 0
+        return self._total(score)
+
+    def score_bounded(self, genome: BaseGenome, threshold: float) -> Tuple[float, bool]:
+        """
+        Scores the geometry in batches of connections and stops as soon as the genome can not reach the threshold.
+
+        Before every batch, the score collected so far is combined with an upper bound for the remaining
+        connections: Every remaining segment covers a bounded number of pixels, each contributing at most the largest
+        fitness near the segment (see _local_bounds). If even this optimistic total stays below the threshold,
+        the remaining connections are skipped and the partial score is returned. A partial score is always below the
+        threshold, but it depends on the rendering order and is not comparable to complete scores (see score_bound).
+
+        If the genome is not cut off, the returned score equals the score returned by score.
+
+        :param genome: The camera genome
+        :param threshold: The score the genome has to beat, e.g. the worst surviving genome's fitness
+        :return: A tuple of the (partial) score and a flag, which is True if the score is partial
+        """
+        if threshold == -np.inf and self._channels is None:
+            return self.score(genome), False
+
+        segments, connection_indices = self._project_segments(genome)
+        if len(segments) == 0:
+            self.n_culled += 1
+            return self._culled_fitness, False
+
+        # Batches of connections_per_batch consecutive connections of the geometry
+        batch_starts = np.flatnonzero(np.diff(connection_indices // self._connections_per_batch, prepend=-1))
+        if threshold == -np.inf:
+            remaining_bounds = np.zeros(len(batch_starts))
+        else:
+            remaining_bounds = np.cumsum(self._local_bounds(segments)[::-1])[::-1][batch_starts]
+        batch_ends = np.append(batch_starts[1:], len(segments))
+
+        score, is_partial, rendered_roi = 0.0, False, None
+        for start, end, remaining_bound in zip(batch_starts, batch_ends, remaining_bounds):
+            if self._total(score + remaining_bound) < threshold:
+                self.n_partial_scores += 1
+                is_partial = True
+                break
+            batch_roi = self._roi(segments[start:end])
+            score += self._sum_new_pixels(segments[start:end], batch_roi, rendered_roi is None)
+            rendered_roi = batch_roi if rendered_roi is None else (min(rendered_roi[0], batch_roi[0]),
+                                                                  min(rendered_roi[1], batch_roi[1]),
+                                                                  max(rendered_roi[2], batch_roi[2]),
+                                                                  max(rendered_roi[3], batch_roi[3]))
+
+        if rendered_roi is not None:
+            x0, y0, x1, y1 = rendered_roi
+            self._render_image[y0:y1, x0:x1] = 0
+            self._lookup_image[y0:y1, x0:x1] = 0
+        return self._total(score), is_partial
+
+    def _project_segments(self, genome: BaseGenome):
+        """
+        Projects the geometry's visible segments to pixel coordinates, see project_segments.
+        """
+        camera_matrix, t_vec, r_vec, d_vec = self._translator.translate_genome(genome)
+        image_height, image_width = self._render_image.shape[:2]
+        return project_segments(self._geometry, camera_matrix, t_vec, r_vec, d_vec, image_width, image_height)
+
+    def _roi(self, segments: np.array) -> Tuple[int, int, int, int]:
+        """
+        The bounding box of the rendered segments, including the line thickness, clipped to the image.
+        """
+        image_height, image_width = self._render_image.shape[:2]
+        margin = self._line_thickness + 2
+        points = segments.reshape(-1, 2)
+        x0, y0 = np.maximum(points.min(axis=0) - margin, 0)
+        x1, y1 = np.minimum(points.max(axis=0) + margin + 1, (image_width, image_height))
+        return int(x0), int(y0), int(x1), int(y1)
+
+    def _sum_new_pixels(self, segments: np.array, roi: Tuple[int, int, int, int], is_first: bool):
+        """
+        Renders the segments and sums up the fitness below the pixels, which were not rendered before.
+
+        The fitness below all rendered pixels is collected in the lookup image, the new pixels' fitness is the
+        difference of its sums before and after rendering. Segments of an oriented map are rendered bin by bin,
+        their pixels are looked up in the channel of the bin.
+        """
+        if self._channels is not None:
+            directions = segments[:, 1] - segments[:, 0]
+            bins = orientation_bins(directions[:, 0], directions[:, 1], self._n_bins)
+            return sum(self._render_new_pixels(segments[bins == b], self._channels[b]) for b in np.unique(bins))
+
+        x0, y0, x1, y1 = roi
+        lookup_roi = self._lookup_image[y0:y1, x0:x1]
+        previous_score = 0.0 if is_first else self._lookup_sum(lookup_roi)
+        cv.polylines(self._render_image, segments, False, (255,), self._line_thickness)
+        cv.copyTo(self._fitness_map[y0:y1, x0:x1], self._render_image[y0:y1, x0:x1], lookup_roi)
+        return self._lookup_sum(lookup_roi) - previous_score
+
+    def _render_new_pixels(self, segments: np.array, fitness_map: np.array):
+        x0, y0, x1, y1 = self._roi(segments)
+        # Only pixels which are not covered by previously rendered segments contribute to the score
+        previous_roi = self._previous_render_image[y0:y1, x0:x1]
+        np.copyto(previous_roi, self._render_image[y0:y1, x0:x1])
+        cv.polylines(self._render_image, segments, False, (255,), self._line_thickness)
+        cv.subtract(self._render_image[y0:y1, x0:x1], previous_roi, dst=previous_roi)
+        score = self._masked_sum(x0, y0, x1, y1, previous_roi, fitness_map)
+        previous_roi[:] = 0
+        return score
+
+    def _masked_sum(self, x0: int, y0: int, x1: int, y1: int, mask: Optional[np.array] = None,
+                    fitness_map: Optional[np.array] = None) -> float:
+        """
+        Sums up the fitness map (the scorer's map by default) inside the region of interest where mask (the render
+        image by default) is set.
+        """
+        if mask is None:
+            mask = self._render_image[y0:y1, x0:x1]
+        if fitness_map is None:
+            fitness_map = self._fitness_map
+        fitness_roi = fitness_map[y0:y1, x0:x1]
+        lookup_roi = self._lookup_image[y0:y1, x0:x1]
+        # A masked copy is considerably faster than a masked bitwise_and of float images
+        cv.copyTo(fitness_roi, mask, lookup_roi)
+        score = self._lookup_sum(lookup_roi)
+        lookup_roi[:] = 0
+        return score
+
+    @staticmethod
+    def _lookup_sum(lookup_roi: np.array):
+        """
+        The sum of a single fitness map region, or the frame sums of a stacked map region
+        """
+        if lookup_roi.ndim == 2:
+            return cv.sumElems(lookup_roi)[0]
+        n_frames = lookup_roi.shape[2]
+        # OpenCV sums up at most 4 channels
+        return np.array(cv.sumElems(lookup_roi)[:n_frames]) if n_frames <= 4 else lookup_roi.sum(axis=(0, 1))
+
+    def _total(self, score) -> float:
+        """
+        The score of a single fitness map, or the aggregate of the frame sums of a stacked map
+        """
+        return float(score) if np.ndim(score) == 0 else float(self._aggregate(score))
+
+    def _local_bounds(self, segments: np.array) -> np.array:
+        """
+        Upper bound for the score of every rendered segment. Every pixel OpenCV renders is at most _render_radius
+        away from the segment, so a segment covers at most the lattice points of a stadium around it:
+        area + perimeter / 2 + 1. Every covered pixel contributes at most the block maximum of the fitness map,
+        sampled along the segment.
+
+        Samples are at most block_size apart, so with block_size > 2 * _render_radius every covered pixel is closer
+        than one block to a sample, and the block maxima are dilated by one block.
+        """
+        start = segments[:, 0].astype(np.float64)
+        delta = segments[:, 1] - start
+        lengths = np.sqrt(np.sum(delta * delta, axis=1))
+        radius = self._render_radius
+
+        counts = np.ceil(lengths / self._block_size).astype(np.int64) + 1
+        offsets = np.cumsum(counts) - counts
+        owner = np.repeat(np.arange(len(segments)), counts)
+        steps = (np.arange(counts.sum()) - np.repeat(offsets, counts)) / np.maximum(counts - 1, 1)[owner]
+        # The clipped segments are inside of the image, truncating the non-negative coordinates is the floor division
+        blocks = ((start[owner] + steps[:, None] * delta[owner]) * (1 / self._block_size)).astype(np.int64)
+        local_maxima = np.maximum.reduceat(self._block_maxima[blocks[:, 1], blocks[:, 0]], offsets)
+        return ((2 * radius + 1) * lengths + np.pi * radius * (radius + 1) + 1) * local_maxima
+
+    @staticmethod
+    def _dilated_block_maxima(fitness_map: np.array, block_size: int) -> np.array:
+        """
+        The maximum of every block_size x block_size block of the fitness map (over all channels, at least 0), dilated
+        by one block
+        """
+        height, width = fitness_map.shape[:2]
+        n_rows, n_columns = -(-height // block_size), -(-width // block_size)
+        padded = np.full((n_rows * block_size, n_columns * block_size), -np.inf)
+        padded[:height, :width] = fitness_map.reshape(height, width, -1).max(axis=2)
+        block_maxima = np.maximum(padded.reshape(n_rows, block_size, n_columns, block_size).max(axis=(1, 3)), 0.0)
+        return cv.dilate(block_maxima, np.ones((3, 3), dtype=np.uint8), borderType=cv.BORDER_REPLICATE)
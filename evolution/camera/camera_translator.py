@@ -1,10 +1,20 @@
+from typing import Optional
+
 import numpy as np
 
 from evolution.base.base_genome import BaseGenome
+from evolution.base.base_genome_factory import BaseGenomeFactory
 from evolution.base.base_translator import BaseTranslator
 
 
 class CameraTranslator(BaseTranslator):
+    def __init__(self, genome_factory: Optional[BaseGenomeFactory] = None) -> None:
+        """
+        :param genome_factory: Optional factory, which expands genomes with frozen or tied genes to the full dna
+        """
+        super().__init__()
+        self._genome_factory = genome_factory
+
     def translate_genome(self, genome: BaseGenome, *args, **kwargs):
         """
         Splits the camera genome into essential pinhole camera parts
@@ -16,13 +26,14 @@ class CameraTranslator(BaseTranslator):
         :param genome: The camera genome with 14 dna elements
         :return: A tuple with camera_matrix, translation vector, rotation vector, distortion coefficients
         """
+        dna = genome.dna if self._genome_factory is None else self._genome_factory.expand_dna(genome.dna)
         camera_matrix = np.array([
-            [genome.dna[0], 0, genome.dna[2]],
-            [0, genome.dna[1], genome.dna[3]],
+            [dna[0], 0, dna[2]],
+            [0, dna[1], dna[3]],
             [0, 0, 1]], dtype=np.float32)
 
-        t_vec = genome.dna[4:7]
-        r_vec = genome.dna[7:10]
-        d_vec = genome.dna[10:]
+        t_vec = dna[4:7]
+        r_vec = dna[7:10]
+        d_vec = dna[10:]
 
         return camera_matrix, t_vec, r_vec, d_vec
@@ -0,0 +1,134 @@
+import json
+import multiprocessing
+import multiprocessing.forkserver
+import os
+import threading
+from multiprocessing.context import BaseContext
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from evolution.base.base_geometry import BaseGeometry
+from evolution.camera.camera_genome_parameters import CameraGenomeParameters
+from evolution.camera.object_geometry import ObjGeometry
+
+# The files to preload, passed on to the forkserver process through its environment only (see worker_context)
+PRELOAD_ENVIRONMENT = "EVOLUTION_WORKER_PRELOAD"
+# Modules imported once by the forkserver process, every worker is forked from it with these modules loaded
+PRELOAD_MODULES = ["numpy", "cv2", "evolution.camera.camera_algorithm", "evolution.camera.camera_workers"]
+
+# Geometries and genome parameters of this process, by file (see load_geometry, load_genome_parameters)
+_shared = {}
+_shared_lock = threading.Lock()
+# Guards the temporary preload variable while the forkserver is started
+_environment_lock = threading.Lock()
+
+
+def load_geometry(geometry_file: str) -> ObjGeometry:
+    """
+    Loads an .obj geometry once per process, later calls return the same (shared) geometry.
+    :param geometry_file: The .obj geometry file
+    :return: The geometry, which must not be modified
+    """
+    key = ("geometry", os.path.abspath(geometry_file))
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = ObjGeometry(geometry_file)
+        return _shared[key]
+
+
+def load_genome_parameters(parameters_file: str, image_shape: Tuple[int, int]) -> CameraGenomeParameters:
+    """
+    Loads camera genome parameters once per process and image shape, later calls return the same (shared) parameters.
+    :param parameters_file: The camera genome parameters file
+    :param image_shape: The image shape (height, width)
+    :return: The genome parameters, which must not be modified
+    """
+    key = ("parameters", os.path.abspath(parameters_file), tuple(image_shape))
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = CameraGenomeParameters(parameters_file, tuple(image_shape))
+        return _shared[key]
+
+
+class _WarmUpGeometry(BaseGeometry):
+    def provide_world_points(self):
+        return [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]]
+
+    def provide_connection_list(self):
+        return [[0, 1]]
+
+
+def warm_up() -> None:
+    """
+    Loads the compiled population scoring loop (from numba's cache, or compiles it), so that the first scoring of a
+    worker is not slower than the others. Does nothing, if numba is not installed.
+    """
+    from evolution.camera.camera_kernels import PopulationScorer, NUMBA_AVAILABLE
+    if NUMBA_AVAILABLE:
+        dna = np.array([[100, 100, 2, 2, 0, 0, 5, 0, 0, 0, 0, 0, 0, 0, 0]], dtype=np.float64)
+        PopulationScorer(np.zeros((4, 4), dtype=np.float32), _WarmUpGeometry(), "numba").score(dna)
+
+
+def _preload(geometry_files: Sequence[str], parameters: Sequence[Tuple[str, Tuple[int, int]]],
+             compile_kernels: bool) -> None:
+    for geometry_file in geometry_files:
+        load_geometry(geometry_file)
+    for parameters_file, image_shape in parameters:
+        load_genome_parameters(parameters_file, image_shape)
+    if compile_kernels:
+        warm_up()
+
+
+def worker_context(method: Optional[str] = None, geometry_files: Sequence[str] = (),
+                   parameters: Sequence[Tuple[str, Tuple[int, int]]] = (), compile_kernels: bool = True) -> BaseContext:
+    """
+    A multiprocessing context, whose worker processes start with the heavy modules imported, the geometries and
+    genome parameters loaded (see load_geometry, load_genome_parameters) and the scoring loop compiled. Pass it as
+    mp_context, e.g. to SweepRunner or ProcessPoolEvaluation.
+
+    (A) "forkserver": the forkserver process preloads everything once, workers are forked from it. The forkserver is
+        started by this call and shared by all pools of this process: only the call, which starts it, configures
+        preloading
+    (B) "fork": preloads everything in this process, workers inherit it
+    (C) "spawn": every worker loads the files on first use (no preloading)
+
+    :param method: The start method, defaults to "forkserver" if available and "spawn" otherwise
+    :param geometry_files: The .obj geometry files to preload
+    :param parameters: The (parameters file, image shape) pairs to preload
+    :param compile_kernels: If True, the compiled scoring loop is loaded as well (see warm_up)
+    :return: The multiprocessing context
+    """
+    if method is None:
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(method)
+
+    geometry_files = [os.path.abspath(geometry_file) for geometry_file in geometry_files]
+    parameters = [(os.path.abspath(parameters_file), tuple(image_shape)) for parameters_file, image_shape in parameters]
+    if method == "fork":
+        _preload(geometry_files, parameters, compile_kernels)
+    elif method == "forkserver":
+        context.set_forkserver_preload(PRELOAD_MODULES)
+        _start_forkserver(json.dumps({"geometry_files": geometry_files, "parameters": parameters,
+                                      "compile_kernels": compile_kernels}))
+    return context
+
+
+def _start_forkserver(preload: str) -> None:
+    # Only the forkserver process inherits the variable, other children of this process never preload
+    with _environment_lock:
+        previous = os.environ.get(PRELOAD_ENVIRONMENT)
+        os.environ[PRELOAD_ENVIRONMENT] = preload
+        try:
+            multiprocessing.forkserver.ensure_running()
+        finally:
+            if previous is None:
+                del os.environ[PRELOAD_ENVIRONMENT]
+            else:
+                os.environ[PRELOAD_ENVIRONMENT] = previous
+
+
+# The forkserver process imports this module (see PRELOAD_MODULES) and preloads the files of worker_context. The
+# variable is removed, so that the workers and their children do not inherit it
+if PRELOAD_ENVIRONMENT in os.environ:
+    _preload(**json.loads(os.environ.pop(PRELOAD_ENVIRONMENT)))
@@ -0,0 +1,289 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from evolution.base.base_algorithm import BaseAlgorithm
+from evolution.base.base_evaluation import EvaluationBackend
+from evolution.base.base_genome import BaseGenome
+from evolution.base.base_geometry import BaseGeometry
+from evolution.base.base_strategies import Population, RestartStrategy
+from evolution.base.base_translator import BaseTranslator
+from evolution.camera.camera_genome_factory import CameraGenomeFactory
+from evolution.camera.camera_genome_parameters import CameraGenomeParameters
+from evolution.camera.camera_kernels import PopulationScorer
+from evolution.camera.camera_translator import CameraTranslator
+from evolution.strategies.populate import ValueUniformPopulation
+from evolution.strategies.strategy_bundle import StrategyBundle
+
+# Indices of the shared (fu, fv, cx, cy, d0 - d4) and the per view (tx, ty, tz, rx, ry, rz) genes of a camera dna
+INTRINSIC_GENES = np.array([0, 1, 2, 3, 10, 11, 12, 13, 14])
+EXTRINSIC_GENES = np.array([4, 5, 6, 7, 8, 9])
+
+
+class MultiViewGenomeParameters(CameraGenomeParameters):
+    """
+    Genome parameters of n identical cameras, which share their intrinsics but have their own poses.
+
+    The dna consists of one intrinsic block (fu, fv, cx, cy, d0 - d4) followed by one extrinsic block
+    (tx_i, ty_i, tz_i, rx_i, ry_i, rz_i) per view i, all described by the genes of a single camera parameters file.
+    Frozen and tied extrinsic genes are frozen and tied in every view.
+    """
+    def __init__(self,
+                 parameters_file: str,
+                 image_shape: Tuple[int, int],
+                 n_views: int,
+                 default_display_name: Optional[str] = None) -> None:
+        """
+        :param parameters_file: A camera parameters file (15 genes)
+        :param image_shape: The image shape of all views
+        :param n_views: The number of views
+        """
+        super().__init__(parameters_file, image_shape, default_display_name)
+        self._n_views = n_views
+        camera_genes = self._parameters["dna"]
+        camera_names = [g["name"] for g in camera_genes]
+        extrinsic_names = {camera_names[i] for i in EXTRINSIC_GENES}
+
+        def view_name(name, view):
+            return "{}_{}".format(name, view) if name in extrinsic_names else name
+
+        genes = [camera_genes[i] for i in INTRINSIC_GENES]
+        for view in range(n_views):
+            genes += [dict(camera_genes[i], name=view_name(camera_names[i], view)) for i in EXTRINSIC_GENES]
+        self._parameters["dna"] = genes
+
+        frozen = self._parameters.get("frozen")
+        if isinstance(frozen, dict):
+            self._parameters["frozen"] = {view_name(name, view): value for name, value in frozen.items()
+                                          for view in range(n_views if name in extrinsic_names else 1)}
+        elif frozen is not None:
+            self._parameters["frozen"] = [view_name(name, view) for name in frozen
+                                          for view in range(n_views if name in extrinsic_names else 1)]
+
+        tied = []
+        for group in self._parameters.get("tied", []):
+            n_extrinsic = sum(name in extrinsic_names for name in group)
+            if n_extrinsic == 0:
+                tied.append(group)
+            elif n_extrinsic == len(group):
+                tied += [[view_name(name, view) for name in group] for view in range(n_views)]
+            else:
+                raise ValueError("Tied genes {} mix shared and per view genes".format(group))
+        if tied:
+            self._parameters["tied"] = tied
+
+    @property
+    def n_views(self) -> int:
+        return self._n_views
+
+    @property
+    def blocks(self) -> List[np.array]:
+        """
+        The indices of the intrinsic block and of every view's extrinsic block in the full dna, e.g. for BlockUniform
+        """
+        n_intrinsic, n_extrinsic = len(INTRINSIC_GENES), len(EXTRINSIC_GENES)
+        return [np.arange(n_intrinsic)] + [n_intrinsic + n_extrinsic * view + np.arange(n_extrinsic)
+                                           for view in range(self._n_views)]
+
+    def split_dna(self, dna: np.array) -> np.array:
+        """
+        :param dna: Full multi view dna (..., 9 + 6 * n_views)
+        :return: The camera dna of every view (..., n_views, 15)
+        """
+        dna = np.asarray(dna, dtype=np.float64)
+        n_intrinsic = len(INTRINSIC_GENES)
+        camera_dna = np.empty(dna.shape[:-1] + (self._n_views, 15))
+        camera_dna[..., INTRINSIC_GENES] = dna[..., np.newaxis, :n_intrinsic]
+        camera_dna[..., EXTRINSIC_GENES] = dna[..., n_intrinsic:].reshape(dna.shape[:-1] + (self._n_views, 6))
+        return camera_dna
+
+    def combine_dna(self, camera_dna: np.array) -> np.array:
+        """
+        :param camera_dna: The camera dna of every view (..., n_views, 15). The shared intrinsics are averaged
+        :return: Full multi view dna (..., 9 + 6 * n_views)
+        """
+        camera_dna = np.asarray(camera_dna, dtype=np.float64)
+        intrinsics = camera_dna[..., INTRINSIC_GENES].mean(axis=-2)
+        extrinsics = camera_dna[..., EXTRINSIC_GENES].reshape(camera_dna.shape[:-2] + (6 * self._n_views,))
+        return np.concatenate([intrinsics, extrinsics], axis=-1)
+
+    def random_range(self, camera_range: Optional[np.array] = None) -> np.array:
+        """
+        :param camera_range: 2 x 15 noise range of a single camera. Defaults to the range of ValueUniformPopulation
+        :return: The range for every view, to be passed to ValueUniformPopulation(random_range=...)
+        """
+        camera_range = ValueUniformPopulation._random_range if camera_range is None else np.asarray(camera_range)
+        return self.combine_dna(np.repeat(camera_range[:, np.newaxis], self._n_views, axis=1))
+
+
+class MultiViewTranslator(BaseTranslator):
+    def __init__(self, genome_factory: CameraGenomeFactory) -> None:
+        """
+        :param genome_factory: The factory of the multi view genomes
+        """
+        super().__init__()
+        self._genome_factory = genome_factory
+
+    def translate_genome(self, genome: BaseGenome, *args, **kwargs):
+        """
+        :return: One tuple of camera_matrix, translation vector, rotation vector, distortion coefficients per view,
+            see CameraTranslator
+        """
+        genome_parameters = self._genome_factory.genome_parameters
+        camera_translator = CameraTranslator()
+        return [camera_translator.translate_genome(BaseGenome(dna))
+                for dna in genome_parameters.split_dna(self._genome_factory.expand_dna(genome.dna))]
+
+
+class MultiViewCameraAlgorithm(BaseAlgorithm):
+    """
+    Calibrates n identical cameras at once: one genome contains the shared intrinsics and the pose of every view.
+    The fitness is the sum of every view's fitness on its own edge image.
+
+    Populations are scored view by view with one PopulationScorer per view, the views are scored in parallel threads
+    (the compiled scoring loop releases the GIL). Since every pose only affects its own view, genomes with equal
+    intrinsics exchange their best poses for free (view recombination). Crossing over whole blocks
+    (BlockUniform(genome_parameters.blocks)) keeps the intrinsics of one parent, so offspring can be recombined.
+    """
+    def __init__(self,
+                 genome_parameters: MultiViewGenomeParameters,
+                 strategy_bundle: StrategyBundle,
+                 edge_images: List[np.array],
+                 geometry: BaseGeometry,
+                 fitness_maps: Optional[List[np.array]] = None,
+                 scoring_backend: str = "auto",
+                 n_workers: Optional[int] = None,
+                 view_recombination: bool = True,
+                 restart_strategy: Optional[RestartStrategy] = None,
+                 evaluation_backend: Optional[EvaluationBackend] = None,
+                 evaluation_chunk_size: Optional[int] = None) -> None:
+        """
+        :param genome_parameters: The multi view genome parameters
+        :param strategy_bundle: The strategies used by the algorithm. Populate strategies need a range for every
+            view, e.g. ValueUniformPopulation(n, genome_parameters.random_range()), the crossover strategy should
+            exchange whole blocks, e.g. BlockUniform(genome_parameters.blocks)
+        :param edge_images: The binary edge image of every view
+        :param geometry: The geometry seen by all views
+        :param fitness_maps: Optional precomputed fitness maps of every view. If None, the maps are created from the
+            edge images with the bundle's fitness strategy
+        :param scoring_backend: The backend of the PopulationScorers ("auto", "numba" or "numpy")
+        :param n_workers: The number of threads scoring views in parallel. Defaults to min(n_views, number of CPUs).
+            The threads are shut down at the end of every run
+        :param view_recombination: If True, genomes with equal intrinsics exchange their best poses after every
+            evaluation (see evaluate_population)
+        :param restart_strategy: Optional strategy, which replaces a stagnating population with a new one
+        :param evaluation_backend: Optional backend for evaluating genomes in parallel instead of the views. Genomes
+            are scored one by one and never recombined
+        :param evaluation_chunk_size: If set, populations are evaluated in chunks of this size, see BaseAlgorithm
+        """
+        if len(edge_images) != genome_parameters.n_views:
+            raise ValueError("Expected {} edge images, got {}".format(genome_parameters.n_views, len(edge_images)))
+        genome_factory = CameraGenomeFactory(genome_parameters)
+        super().__init__(MultiViewTranslator(genome_factory),
+                         genome_factory,
+                         strategy_bundle.populate_strategy,
+                         strategy_bundle.selection_strategy,
+                         strategy_bundle.crossover_strategy,
+                         strategy_bundle.mutation_strategy,
+                         strategy_bundle.termination_strategy,
+                         restart_strategy=restart_strategy,
+                         evaluation_backend=evaluation_backend,
+                         evaluation_chunk_size=evaluation_chunk_size)
+        if fitness_maps is None:
+            fitness_maps = [strategy_bundle.fitness_strategy.create_fitness(edge_image) for edge_image in edge_images]
+        self._genome_parameters = genome_parameters
+        self._fitness_maps = list(fitness_maps)
+        self._geometry = geometry
+        self._scoring_backend = scoring_backend
+        self._n_workers = n_workers or min(genome_parameters.n_views, os.cpu_count() or 1)
+        self._view_recombination = view_recombination
+        self._executor = None
+        self._thread_local = threading.local()
+
+    def run(self, start_dna: np.array):
+        try:
+            return super().run(start_dna)
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    @property
+    def _scorers(self) -> List[PopulationScorer]:
+        # PopulationScorers keep per call state, therefore every thread gets its own scorer per view
+        scorers = getattr(self._thread_local, "scorers", None)
+        if scorers is None:
+            scorers = self._thread_local.scorers = [PopulationScorer(fitness_map, self._geometry,
+                                                                     self._scoring_backend)
+                                                    for fitness_map in self._fitness_maps]
+        return scorers
+
+    def fitness(self, genome: BaseGenome) -> float:
+        camera_dna = self._genome_parameters.split_dna(self.genome_factory.expand_dna(genome.dna))
+        return float(sum(scorer.score(dna)[0] for scorer, dna in zip(self._scorers, camera_dna)))
+
+    def evaluate_population(self, population: Population) -> List[float]:
+        """
+        Scores all views of the population, the views are scored in parallel.
+
+        With view recombination, genomes are grouped by their intrinsics. Within a group, the fitness of every view
+        only depends on the view's own pose, so the best pose of every view can be combined without scoring again.
+        If the combination beats the best genome of a group, it replaces the worst genome of the group (in place).
+        """
+        if self.evaluation_backend is not None:
+            return super().evaluate_population(population)
+        dna_stack = self.genome_factory.expand_dna(np.array([genome.dna for genome in population]))
+        camera_dna = self._genome_parameters.split_dna(dna_stack)
+        scorers = self._scorers
+        if self._n_workers <= 1:
+            view_scores = [scorers[view].score(camera_dna[:, view]) for view in range(len(scorers))]
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self._n_workers)
+            view_scores = list(self._executor.map(lambda view: scorers[view].score(camera_dna[:, view]),
+                                                  range(len(scorers))))
+        view_scores = np.array(view_scores).T
+        if self._view_recombination:
+            self._recombine_views(population, camera_dna, view_scores)
+        return list(view_scores.sum(axis=1))
+
+    def _recombine_views(self, population: Population, camera_dna: np.array, view_scores: np.array):
+        groups = {}
+        for i, dna in enumerate(camera_dna[:, 0, INTRINSIC_GENES]):
+            groups.setdefault(dna.tobytes(), []).append(i)
+
+        views = np.arange(self._genome_parameters.n_views)
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            members = np.array(members)
+            best_members = members[np.argmax(view_scores[members], axis=0)]
+            fitness = view_scores[members].sum(axis=1)
+            if view_scores[best_members, views].sum() <= fitness.max():
+                continue
+            worst = members[np.argmin(fitness)]
+            combined_dna = camera_dna[best_members, views]
+            population[worst].dna = self.genome_factory.reduce_dna(self._genome_parameters.combine_dna(combined_dna))
+            view_scores[worst] = view_scores[best_members, views]
+
+    def view_fitness(self, dna: np.array) -> np.array:
+        """
+        :param dna: Full multi view dna
+        :return: The fitness of every view
+        """
+        camera_dna = self._genome_parameters.split_dna(dna)
+        return np.array([scorer.score(view_dna)[0] for scorer, view_dna in zip(self._scorers, camera_dna)])
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        for key in ("_executor", "_thread_local"):
+            del state[key]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._executor = None
+        self._thread_local = threading.local()
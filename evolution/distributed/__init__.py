@@ -0,0 +1,4 @@
+from .coordinator import DistributedEvaluation
+from .worker import EvaluationWorker, run_worker
+
+__all__ = ["DistributedEvaluation", "EvaluationWorker", "run_worker"]
@@ -0,0 +1,278 @@
+import itertools
+import pickle
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+from typing import Optional, Dict, List, Tuple
+
+import numpy as np
+
+from evolution.base.base_evaluation import EvaluationBackend
+from evolution.base.base_genome import BaseGenome
+from evolution.distributed.protocol import MessageType, ConnectionClosed, send_message, receive_message, \
+    encode_batch, decode_fitness
+
+# A submitted evaluation: the future and the dna to evaluate
+_Task = Tuple[Future, np.array]
+
+
+def _resolve(future: Future, setter, value):
+    # A re-dispatched batch may be answered twice, the first answer wins
+    try:
+        setter(value)
+    except InvalidStateError:
+        pass
+
+
+class _WorkerConnection:
+    def __init__(self, worker_id: int, connection: socket.socket, address) -> None:
+        self.worker_id = worker_id
+        self.connection = connection
+        self.address = address
+        self.send_lock = threading.Lock()
+        self.last_seen = time.monotonic()
+        self.job_id = 0
+        self.batches: Dict[int, List[_Task]] = {}
+        self.alive = True
+
+    def send(self, message_type: MessageType, batch_id: int = 0, payload: bytes = b""):
+        with self.send_lock:
+            send_message(self.connection, message_type, batch_id, payload)
+
+
+class DistributedEvaluation(EvaluationBackend):
+    """
+    Evaluates genomes on EvaluationWorker processes, which connect over TCP (see evolution.distributed.worker).
+
+    On start, the algorithm is pickled once and sent to every worker as a job. Workers connecting later receive the
+    current job on connect. Submitted genomes are grouped into batches of up to batch_size dna rows and dispatched
+    to workers with free capacity.
+
+    Workers send heartbeats. A worker which closes its connection or stays silent for heartbeat_timeout seconds is
+    dropped and all of its unfinished batches are re-dispatched to the remaining workers.
+
+    The backend stays open across several runs (e.g. a sweep), call close (or use it as a context manager) to shut
+    down all workers.
+
+    Warning: jobs are pickled. Only use this backend in a trusted network.
+    """
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 batch_size: int = 8,
+                 batches_per_worker: int = 2,
+                 heartbeat_timeout: float = 5.0) -> None:
+        """
+        :param host: The interface to listen on, e.g. "0.0.0.0" to accept workers from other machines
+        :param port: The port to listen on, 0 picks a free port (see address)
+        :param batch_size: The maximum number of dna rows per batch
+        :param batches_per_worker: The maximum number of unfinished batches per worker
+        :param heartbeat_timeout: Seconds without any message after which a worker is considered lost
+        """
+        super().__init__()
+        self._batch_size = batch_size
+        self._batches_per_worker = batches_per_worker
+        self._heartbeat_timeout = heartbeat_timeout
+
+        self._condition = threading.Condition()
+        self._queue: deque = deque()
+        self._workers: Dict[int, _WorkerConnection] = {}
+        self._worker_ids = itertools.count()
+        self._batch_ids = itertools.count(1)
+        self._job_id = 0
+        self._job = None
+        self._n_redispatched = 0
+        self._closed = False
+
+        self._server = socket.create_server((host, port))
+        self._threads = [threading.Thread(target=self._accept, daemon=True),
+                         threading.Thread(target=self._dispatch, daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """
+        The (host, port) workers have to connect to
+        """
+        return self._server.getsockname()[:2]
+
+    @property
+    def n_workers(self):
+        with self._condition:
+            return len(self._workers)
+
+    @property
+    def n_redispatched(self):
+        """
+        The number of batches which were re-dispatched after their worker was lost
+        """
+        return self._n_redispatched
+
+    def wait_for_workers(self, n_workers: int, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until at least n_workers workers are connected.
+        :return: False if the timeout expired before
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: len(self._workers) >= n_workers, timeout)
+
+    def start(self, algorithm) -> None:
+        super().start(algorithm)
+        with self._condition:
+            self._job_id += 1
+            self._job = pickle.dumps(algorithm)
+            self._condition.notify_all()
+
+    def submit(self, genome: BaseGenome) -> Future:
+        future = Future()
+        with self._condition:
+            self._queue.append((future, np.asarray(genome.dna, dtype=np.float64)))
+            self._condition.notify_all()
+        return future
+
+    def shutdown(self) -> None:
+        # Queued evaluations of the finished run are dropped, the workers stay connected for the next run
+        with self._condition:
+            for future, _ in self._queue:
+                future.cancel()
+            self._queue.clear()
+
+    def close(self) -> None:
+        """
+        Sends SHUTDOWN to all workers and stops listening.
+        """
+        self.shutdown()
+        with self._condition:
+            self._closed = True
+            workers = list(self._workers.values())
+            self._condition.notify_all()
+        for worker in workers:
+            try:
+                worker.send(MessageType.SHUTDOWN)
+            except OSError:
+                pass
+            self._drop_worker(worker)
+        self._server.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _accept(self):
+        while True:
+            try:
+                connection, address = self._server.accept()
+            except OSError:
+                return
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._condition:
+                if self._closed:
+                    connection.close()
+                    return
+                worker = _WorkerConnection(next(self._worker_ids), connection, address)
+                self._workers[worker.worker_id] = worker
+                self._condition.notify_all()
+            threading.Thread(target=self._receive, args=(worker,), daemon=True).start()
+
+    def _receive(self, worker: _WorkerConnection):
+        try:
+            while True:
+                message_type, batch_id, payload = receive_message(worker.connection)
+                with self._condition:
+                    worker.last_seen = time.monotonic()
+                    if message_type in (MessageType.RESULT, MessageType.ERROR):
+                        batch = worker.batches.pop(batch_id, None)
+                        self._condition.notify_all()
+                    else:
+                        batch = None
+                if batch is None:
+                    continue
+                if message_type == MessageType.RESULT:
+                    for (future, _), fitness in zip(batch, decode_fitness(payload)):
+                        _resolve(future, future.set_result, float(fitness))
+                else:
+                    error = RuntimeError("Worker {} failed: {}".format(worker.worker_id, payload.decode("utf-8")))
+                    for future, _ in batch:
+                        _resolve(future, future.set_exception, error)
+        except (ConnectionClosed, OSError):
+            self._drop_worker(worker)
+
+    def _drop_worker(self, worker: _WorkerConnection):
+        with self._condition:
+            if not worker.alive:
+                return
+            worker.alive = False
+            del self._workers[worker.worker_id]
+            for batch in worker.batches.values():
+                self._queue.extendleft(reversed(batch))
+                self._n_redispatched += 1
+            worker.batches.clear()
+            self._condition.notify_all()
+        try:
+            worker.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        worker.connection.close()
+
+    def _dispatch(self):
+        while True:
+            with self._condition:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                lost = [worker for worker in self._workers.values()
+                        if now - worker.last_seen > self._heartbeat_timeout]
+                assignment = self._next_assignment() if not lost else None
+                if assignment is None and not lost:
+                    self._condition.wait(self._heartbeat_timeout / 4)
+                    continue
+
+            for worker in lost:
+                self._drop_worker(worker)
+            if assignment is None:
+                continue
+
+            worker, job, batch_id, batch = assignment
+            try:
+                if job is not None:
+                    worker.send(MessageType.JOB, payload=job)
+                worker.send(MessageType.BATCH, batch_id, encode_batch(np.array([dna for _, dna in batch])))
+            except OSError:
+                self._drop_worker(worker)
+
+    def _next_assignment(self):
+        if self._job is None:
+            return None
+        # Skip evaluations which were cancelled while waiting in the queue
+        while self._queue and self._queue[0][0].cancelled():
+            self._queue.popleft()
+        if not self._queue:
+            return None
+        free_workers = [worker for worker in self._workers.values() if len(worker.batches) < self._batches_per_worker]
+        if not free_workers:
+            return None
+        worker = min(free_workers, key=lambda w: len(w.batches))
+
+        batch = []
+        while self._queue and len(batch) < self._batch_size:
+            future, dna = self._queue.popleft()
+            if future.done():
+                continue
+            # Re-dispatched evaluations are already running
+            if not future.running() and not future.set_running_or_notify_cancel():
+                continue
+            batch.append((future, dna))
+        if not batch:
+            return None
+
+        job = None
+        if worker.job_id != self._job_id:
+            job, worker.job_id = self._job, self._job_id
+        batch_id = next(self._batch_ids)
+        worker.batches[batch_id] = batch
+        return worker, job, batch_id, batch
@@ -0,0 +1,76 @@
+import socket
+import struct
+from enum import IntEnum
+from typing import Tuple
+
+import numpy as np
+
+# message type, batch id, payload size
+HEADER = struct.Struct("!BQQ")
+# rows, columns of a dna batch
+BATCH_SHAPE = struct.Struct("!II")
+
+
+class MessageType(IntEnum):
+    """
+    All messages are framed as HEADER followed by payload size many bytes.
+
+    coordinator -> worker:
+        JOB: pickled algorithm, replaces the worker's current job
+        BATCH: BATCH_SHAPE followed by float64 dna rows
+        SHUTDOWN: the worker exits
+    worker -> coordinator:
+        RESULT: float64 fitness values, one per dna row of the batch with the same batch id
+        ERROR: utf-8 error message for the batch with the same batch id
+        HEARTBEAT: empty, sent periodically, even while evaluating
+    """
+    JOB = 1
+    BATCH = 2
+    SHUTDOWN = 3
+    RESULT = 4
+    ERROR = 5
+    HEARTBEAT = 6
+
+
+class ConnectionClosed(ConnectionError):
+    pass
+
+
+def send_message(connection: socket.socket, message_type: MessageType, batch_id: int = 0,
+                 payload: bytes = b"") -> None:
+    connection.sendall(HEADER.pack(message_type, batch_id, len(payload)) + payload)
+
+
+def receive_message(connection: socket.socket) -> Tuple[MessageType, int, bytes]:
+    message_type, batch_id, payload_size = HEADER.unpack(_receive_exactly(connection, HEADER.size))
+    return MessageType(message_type), batch_id, _receive_exactly(connection, payload_size)
+
+
+def _receive_exactly(connection: socket.socket, n_bytes: int) -> bytes:
+    buffer = bytearray(n_bytes)
+    view = memoryview(buffer)
+    received = 0
+    while received < n_bytes:
+        n_received = connection.recv_into(view[received:], n_bytes - received)
+        if n_received == 0:
+            raise ConnectionClosed("Connection closed by peer")
+        received += n_received
+    return bytes(buffer)
+
+
+def encode_batch(dna_batch: np.array) -> bytes:
+    dna_batch = np.ascontiguousarray(dna_batch, dtype=">f8")
+    return BATCH_SHAPE.pack(*dna_batch.shape) + dna_batch.tobytes()
+
+
+def decode_batch(payload: bytes) -> np.array:
+    shape = BATCH_SHAPE.unpack_from(payload)
+    return np.frombuffer(payload, dtype=">f8", offset=BATCH_SHAPE.size).reshape(shape).astype(np.float64)
+
+
+def encode_fitness(fitness_values: np.array) -> bytes:
+    return np.ascontiguousarray(fitness_values, dtype=">f8").tobytes()
+
+
+def decode_fitness(payload: bytes) -> np.array:
+    return np.frombuffer(payload, dtype=">f8").astype(np.float64)
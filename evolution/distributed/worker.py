@@ -0,0 +1,109 @@
+import argparse
+import pickle
+import socket
+import threading
+import time
+
+import numpy as np
+
+from evolution.distributed.protocol import MessageType, ConnectionClosed, send_message, receive_message, \
+    decode_batch, encode_fitness
+
+
+class EvaluationWorker:
+    """
+    Connects to a DistributedEvaluation coordinator and evaluates dna batches until the coordinator shuts it down.
+
+    The algorithm of the current job (including its geometry and fitness map) is received once per job. Batches only
+    carry dna arrays, answers only carry fitness values. A background thread sends heartbeats, also while a batch
+    is evaluated.
+
+    Warning: jobs are pickled algorithms. Only connect workers to coordinators you trust.
+    """
+    def __init__(self, host: str, port: int, heartbeat_interval: float = 1.0, connect_timeout: float = 30.0) -> None:
+        """
+        :param host: The coordinator's host
+        :param port: The coordinator's port
+        :param heartbeat_interval: Seconds between two heartbeats
+        :param connect_timeout: Seconds to retry connecting, e.g. if the coordinator is not up yet
+        """
+        super().__init__()
+        self._address = (host, port)
+        self._heartbeat_interval = heartbeat_interval
+        self._connect_timeout = connect_timeout
+        self._send_lock = threading.Lock()
+        self._algorithm = None
+        self._n_evaluations = 0
+
+    @property
+    def n_evaluations(self):
+        return self._n_evaluations
+
+    def serve(self) -> None:
+        """
+        Connects and serves until the coordinator sends SHUTDOWN or closes the connection.
+        """
+        connection = self._connect()
+        stopped = threading.Event()
+        heartbeat = threading.Thread(target=self._send_heartbeats, args=(connection, stopped), daemon=True)
+        heartbeat.start()
+        try:
+            while True:
+                message_type, batch_id, payload = receive_message(connection)
+                if message_type == MessageType.JOB:
+                    self._algorithm = pickle.loads(payload)
+                elif message_type == MessageType.BATCH:
+                    self._evaluate(connection, batch_id, decode_batch(payload))
+                elif message_type == MessageType.SHUTDOWN:
+                    break
+        except (ConnectionClosed, OSError):
+            pass
+        finally:
+            stopped.set()
+            connection.close()
+
+    def _connect(self) -> socket.socket:
+        deadline = time.monotonic() + self._connect_timeout
+        while True:
+            try:
+                connection = socket.create_connection(self._address)
+                connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                return connection
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+
+    def _evaluate(self, connection: socket.socket, batch_id: int, dna_batch: np.array):
+        try:
+            genome_factory = self._algorithm.genome_factory
+            fitness_values = [self._algorithm.fitness(genome_factory.create(dna)) for dna in dna_batch]
+        except Exception as exception:
+            self._send(connection, MessageType.ERROR, batch_id, repr(exception).encode("utf-8"))
+            return
+        self._n_evaluations += len(dna_batch)
+        self._send(connection, MessageType.RESULT, batch_id, encode_fitness(fitness_values))
+
+    def _send_heartbeats(self, connection: socket.socket, stopped: threading.Event):
+        while not stopped.wait(self._heartbeat_interval):
+            try:
+                self._send(connection, MessageType.HEARTBEAT)
+            except OSError:
+                return
+
+    def _send(self, connection: socket.socket, message_type: MessageType, batch_id: int = 0, payload: bytes = b""):
+        with self._send_lock:
+            send_message(connection, message_type, batch_id, payload)
+
+
+def run_worker(host: str, port: int, heartbeat_interval: float = 1.0) -> None:
+    EvaluationWorker(host, port, heartbeat_interval).serve()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Evaluates fitness batches for a DistributedEvaluation coordinator")
+    parser.add_argument("host")
+    parser.add_argument("port", type=int)
+    parser.add_argument("--heartbeat-interval", type=float, default=1.0)
+    arguments = parser.parse_args()
+    run_worker(arguments.host, arguments.port, arguments.heartbeat_interval)
@@ -0,0 +1,3 @@
+from .landscape_probe import LandscapeProbe, LandscapeReport, write_parameters
+
+__all__ = ["LandscapeProbe", "LandscapeReport", "write_parameters"]
@@ -0,0 +1,234 @@
+import argparse
+import json
+from itertools import combinations
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import cv2 as cv
+
+from evolution.base.base_genome_factory import BaseGenomeFactory
+from evolution.base.base_genome_parameters import BaseGenomeParameters
+
+
+class LandscapeReport(NamedTuple):
+    """
+    Basins of the fitness landscape around a reference genome, one entry per free gene
+    """
+    gene_names: List[str]
+    reference_fitness: float
+    # The gene values of the slice maxima
+    centers: np.array
+    # The distance from the maximum to the nearest edge of its basin
+    half_widths: np.array
+    # True, if the basin reached the edge of the probed window, i.e. the half width is a lower bound
+    truncated: np.array
+    # Correlation of the genes within the 2-D basins, nan for pairs which were not probed
+    couplings: np.array
+
+    def __str__(self):
+        lines = ["{:>6} {:>12} {:>12}".format("gene", "center", "half width")]
+        for name, center, half_width, truncated in zip(self.gene_names, self.centers, self.half_widths,
+                                                       self.truncated):
+            lines.append("{:>6} {:12.5g} {:12.5g}{}".format(name, center, half_width, " (window)" if truncated else ""))
+        coupled = [(abs(self.couplings[a, b]), a, b) for a, b in combinations(range(len(self.gene_names)), 2)
+                   if np.isfinite(self.couplings[a, b])]
+        for strength, a, b in sorted(coupled, reverse=True)[:5]:
+            lines.append("coupling {:>4}/{:<4} {:+.2f}".format(self.gene_names[a], self.gene_names[b],
+                                                             self.couplings[a, b]))
+        return "\n".join(lines)
+
+
+class LandscapeProbe:
+    """
+    Evaluates slices of the fitness landscape around a reference genome: along every free gene (1-D) and along
+    pairs of genes (2-D). All cameras of all slices are scored in large batches, e.g. with PopulationScorer.score.
+
+    The basin of a slice is the connected region around its maximum, where the fitness stays above
+    basin_level between the slice's minimum and maximum. Basin widths suggest mutation ranges (see
+    write_parameters), 2-D basins reveal coupled genes.
+    """
+    def __init__(self,
+                 score_batch: Callable[[np.array], np.array],
+                 genome_parameters: BaseGenomeParameters,
+                 reference_dna: np.array,
+                 window_fraction: float = 0.25,
+                 basin_level: float = 0.5,
+                 batch_size: int = 4096) -> None:
+        """
+        :param score_batch: Scores an n x n_genes stack of full dna
+        :param genome_parameters: The genome parameters, slices cover the free genes within their bounds
+        :param reference_dna: The full reference dna, e.g. a known good solution
+        :param window_fraction: Every slice covers +- this fraction of the gene's bounds around the reference
+        :param basin_level: The basin threshold between the slice's minimum (0) and maximum (1)
+        :param batch_size: The maximum number of cameras per score_batch call
+        """
+        super().__init__()
+        self._score_batch = score_batch
+        self._genome_factory = BaseGenomeFactory(genome_parameters)
+        self._reference = self._genome_factory.bind_frozen_genes(reference_dna)
+        self._gene_names = [genome_parameters.gene_names[i] for i in genome_parameters.gene_mask.free_genes]
+        lower, upper = genome_parameters.genome_bounds
+        half_window = window_fraction * (upper - lower)
+        self._lower = np.maximum(self._reference - half_window, lower)
+        self._upper = np.minimum(self._reference + half_window, upper)
+        self._basin_level = basin_level
+        self._batch_size = batch_size
+
+    @property
+    def gene_names(self) -> List[str]:
+        return self._gene_names
+
+    def score(self, dna_stack: np.array) -> np.array:
+        """
+        :param dna_stack: n x n_free_genes stack
+        :return: n fitness values
+        """
+        dna_stack = self._genome_factory.expand_dna(np.atleast_2d(dna_stack))
+        return np.concatenate([np.asarray(self._score_batch(dna_stack[start:start + self._batch_size]))
+                               for start in range(0, len(dna_stack), self._batch_size)])
+
+    def gene_values(self, gene: int, n_steps: int) -> np.array:
+        return np.linspace(self._lower[gene], self._upper[gene], n_steps)
+
+    def slice_1d(self, gene: int, n_steps: int = 41) -> Tuple[np.array, np.array]:
+        """
+        :return: The gene values and their fitness
+        """
+        return self._slices_1d([gene], n_steps)[0]
+
+    def slice_2d(self, gene_a: int, gene_b: int, n_steps: int = 21) -> Tuple[np.array, np.array, np.array]:
+        """
+        :return: The values of both genes and the n_steps x n_steps fitness (rows follow gene_a)
+        """
+        return self._slices_2d([(gene_a, gene_b)], n_steps)[0]
+
+    def probe(self, n_steps: int = 41, pairs: Optional[List[Tuple[int, int]]] = None,
+              n_steps_2d: int = 21) -> LandscapeReport:
+        """
+        Probes all 1-D slices and the 2-D slices of the given pairs of free genes.
+        :param n_steps: The number of samples of every 1-D slice
+        :param pairs: Pairs of free gene indices, all pairs if None. Pass [] to skip the 2-D slices
+        :param n_steps_2d: The number of samples per axis of every 2-D slice
+        """
+        n_genes = len(self._reference)
+        basins = [self._basin_1d(values, scores) for values, scores in self._slices_1d(range(n_genes), n_steps)]
+        centers, half_widths, truncated = (np.array(t) for t in zip(*basins))
+
+        couplings = np.full((n_genes, n_genes), np.nan)
+        np.fill_diagonal(couplings, 1.0)
+        pairs = list(combinations(range(n_genes), 2)) if pairs is None else pairs
+        for (gene_a, gene_b), (values_a, values_b, scores) in zip(pairs, self._slices_2d(pairs, n_steps_2d)):
+            couplings[gene_a, gene_b] = couplings[gene_b, gene_a] = self._coupling_2d(values_a, values_b, scores)
+
+        reference_fitness = float(self.score(self._reference)[0])
+        return LandscapeReport(self._gene_names, reference_fitness, centers, half_widths, truncated, couplings)
+
+    def _slices_1d(self, genes, n_steps: int):
+        genes = list(genes)
+        values = [self.gene_values(gene, n_steps) for gene in genes]
+        dna_stack = np.repeat(self._reference[None], len(genes) * n_steps, axis=0)
+        for i, gene in enumerate(genes):
+            dna_stack[i * n_steps:(i + 1) * n_steps, gene] = values[i]
+        scores = self.score(dna_stack).reshape(len(genes), n_steps)
+        return list(zip(values, scores))
+
+    def _slices_2d(self, pairs, n_steps: int):
+        if len(pairs) == 0:
+            return []
+        dna_stack = np.repeat(self._reference[None], len(pairs) * n_steps * n_steps, axis=0)
+        grids = []
+        for i, (gene_a, gene_b) in enumerate(pairs):
+            values_a, values_b = self.gene_values(gene_a, n_steps), self.gene_values(gene_b, n_steps)
+            grid_a, grid_b = np.meshgrid(values_a, values_b, indexing="ij")
+            block = dna_stack[i * n_steps * n_steps:(i + 1) * n_steps * n_steps]
+            block[:, gene_a], block[:, gene_b] = grid_a.ravel(), grid_b.ravel()
+            grids.append((values_a, values_b))
+        scores = self.score(dna_stack).reshape(len(pairs), n_steps, n_steps)
+        return [(values_a, values_b, pair_scores) for (values_a, values_b), pair_scores in zip(grids, scores)]
+
+    def _threshold(self, scores: np.array) -> float:
+        finite = scores[np.isfinite(scores)]
+        if len(finite) == 0:
+            return np.inf
+        return finite.min() + self._basin_level * (finite.max() - finite.min())
+
+    def _basin_1d(self, values: np.array, scores: np.array):
+        inside = scores >= self._threshold(scores)
+        peak = int(np.argmax(scores))
+        left, right = peak, peak
+        while left > 0 and inside[left - 1]:
+            left -= 1
+        while right < len(scores) - 1 and inside[right + 1]:
+            right += 1
+
+        step = values[1] - values[0]
+        sides = [side for side, at_edge in ((values[peak] - values[left], left == 0),
+                                            (values[right] - values[peak], right == len(values) - 1))
+                 if side > 0 and not at_edge]
+        truncated = len(sides) == 0
+        if truncated:
+            # The basin covers the window on both sides of the maximum (or it is a single sample)
+            sides = [max(values[peak] - values[left], values[right] - values[peak])]
+        return values[peak], max(min(sides), step), truncated
+
+    def _coupling_2d(self, values_a: np.array, values_b: np.array, scores: np.array) -> float:
+        inside = (scores >= self._threshold(scores)).astype(np.uint8)
+        _, labels = cv.connectedComponents(inside, connectivity=8)
+        peak = np.unravel_index(np.argmax(scores), scores.shape)
+        rows, columns = np.nonzero(labels == labels[peak])
+        if len(rows) < 3:
+            return 0.0
+        return float(np.nan_to_num(np.corrcoef(values_a[rows], values_b[columns])[0, 1]))
+
+
+def write_parameters(genome_parameters: BaseGenomeParameters, report: LandscapeReport, parameters_file: str,
+                     mutation_fraction: float = 0.5) -> dict:
+    """
+    Writes a parameters file with mutation ranges of +- mutation_fraction times the basin half widths. Normal
+    distributions get sigma = range / 2. Everything else is copied from the given parameters.
+    :return: The written parameters
+    """
+    parameters = genome_parameters.to_json()
+    for gene_index, half_width in zip(genome_parameters.gene_mask.free_genes, report.half_widths):
+        mutation = parameters["dna"][gene_index]["mutation"]
+        mutation_range = float("{:.4g}".format(mutation_fraction * half_width))
+        mutation["low"], mutation["high"] = -mutation_range, mutation_range
+        if mutation["distribution"] == "normal" and "sigma" in mutation.get("distribution_parameters", {}):
+            mutation["distribution_parameters"]["sigma"] = float("{:.4g}".format(mutation_range / 2))
+
+    with open(parameters_file, "w") as file:
+        json.dump(parameters, file, indent=2)
+    return parameters
+
+
+if __name__ == '__main__':
+    from evolution.camera.camera_genome_parameters import CameraGenomeParameters
+    from evolution.camera.camera_kernels import PopulationScorer
+    from evolution.camera.object_geometry import ObjGeometry
+    from evolution.strategies.fitness import DistanceMap, DistanceMapWithPunishment
+
+    parser = argparse.ArgumentParser(description="Probe the fitness landscape around a reference camera and "
+                                                 "propose mutation ranges")
+    parser.add_argument("parameters_file")
+    parser.add_argument("geometry_file")
+    parser.add_argument("edge_image_file")
+    parser.add_argument("--dna", type=float, nargs="+", required=True, help="The full reference camera dna")
+    parser.add_argument("--output", required=True, help="The proposed parameters file")
+    parser.add_argument("--log-div", type=float, default=0.3)
+    parser.add_argument("--window", type=float, default=0.25, help="Fraction of the bounds probed around the dna")
+    parser.add_argument("--mutation-fraction", type=float, default=0.5)
+    parser.add_argument("--no-pairs", action="store_true", help="Skip the 2-D slices")
+    arguments = parser.parse_args()
+
+    edge_image = cv.imread(arguments.edge_image_file, cv.IMREAD_GRAYSCALE)
+    if edge_image is None:
+        parser.error("Could not read edge image '{}'".format(arguments.edge_image_file))
+    genome_parameters = CameraGenomeParameters(arguments.parameters_file, edge_image.shape)
+    fitness_map = DistanceMapWithPunishment(DistanceMap.DistanceType.L2, arguments.log_div).create_fitness(edge_image)
+    population_scorer = PopulationScorer(fitness_map, ObjGeometry(arguments.geometry_file))
+
+    probe = LandscapeProbe(population_scorer.score, genome_parameters, np.array(arguments.dna),
+                           window_fraction=arguments.window)
+    landscape_report = probe.probe(pairs=[] if arguments.no_pairs else None)
+    print(landscape_report)
+    write_parameters(genome_parameters, landscape_report, arguments.output, arguments.mutation_fraction)
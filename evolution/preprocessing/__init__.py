@@ -0,0 +1,4 @@
+from .incremental_distance_map import IncrementalDistanceMap
+from .preprocessing_pipeline import PreprocessingPipeline, PreprocessedImage, video_frames
+
+__all__ = ["PreprocessingPipeline", "PreprocessedImage", "video_frames", "IncrementalDistanceMap"]
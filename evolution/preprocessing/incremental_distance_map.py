@@ -0,0 +1,117 @@
+import math
+from typing import Optional
+
+import numpy as np
+import cv2 as cv
+
+from evolution.strategies.fitness import DistanceMap
+
+
+class IncrementalDistanceMap:
+    """
+    Keeps the fitness map of a stream of edge images (e.g. consecutive video frames) up to date.
+
+    Every new edge image is compared tile by tile to the previous one. Only the changed tiles and their
+    neighbourhood are transformed again: beyond the strategy's cutoff distance (see DistanceMap.cutoff_distance) the
+    fitness saturates, so a changed pixel can not affect the fitness of pixels further away.
+
+    Distances are normalized by a reference max_distance (by default the one of the first edge image) instead of
+    the maximum of every single image. The map is therefore equal to fitness_from_distances(distances, max_distance)
+    of the full image, and fitness values of all frames are comparable.
+    """
+    def __init__(self,
+                 fitness_strategy: DistanceMap,
+                 tile_size: int = 64,
+                 max_distance: Optional[float] = None,
+                 full_update_fraction: float = 0.5) -> None:
+        """
+        :param fitness_strategy: The distance map strategy, which defines distance type and fitness transform
+        :param tile_size: The edge length of the compared tiles in pixels
+        :param max_distance: Optional reference distance for the normalization. Defaults to the maximum distance of
+            the first edge image
+        :param full_update_fraction: If more than this fraction of the image has to be recomputed, the whole map is
+            recomputed at once
+        """
+        super().__init__()
+        self._fitness_strategy = fitness_strategy
+        self._tile_size = tile_size
+        self._max_distance = max_distance
+        self._full_update_fraction = full_update_fraction
+        self._edge_image = None
+        self._fitness_map = None
+        self.recomputed_fraction = 0.0
+
+    @property
+    def fitness_map(self) -> Optional[np.array]:
+        return self._fitness_map
+
+    @property
+    def max_distance(self) -> Optional[float]:
+        return self._max_distance
+
+    def reset(self):
+        """
+        Forgets the previous edge image, the next update recomputes the whole map.
+        """
+        self._edge_image = None
+        self._fitness_map = None
+
+    def update(self, edge_image: np.array) -> np.array:
+        """
+        :param edge_image: The next binary edge image
+        :return: The fitness map of the edge image. The array is updated in place by the next call, copy it if it is
+            used while the next image is processed
+        """
+        if self._edge_image is None or self._edge_image.shape != edge_image.shape:
+            return self._update_full(edge_image)
+
+        height, width = edge_image.shape
+        margin = self._fitness_strategy.influence_radius(self._max_distance)
+        dirty_tiles = self._changed_tiles(edge_image)
+        if not np.any(dirty_tiles):
+            self.recomputed_fraction = 0.0
+            return self._fitness_map
+
+        # Every pixel within the margin of a changed pixel may change
+        margin_tiles = int(math.ceil(margin / self._tile_size))
+        kernel = np.ones((2 * margin_tiles + 1, 2 * margin_tiles + 1), dtype=np.uint8)
+        dirty_tiles = cv.dilate(dirty_tiles.astype(np.uint8), kernel)
+
+        _, _, regions, _ = cv.connectedComponentsWithStats(dirty_tiles, connectivity=8)
+        windows = []
+        for x, y, w, h, _ in regions[1:]:
+            x0, y0 = x * self._tile_size, y * self._tile_size
+            x1, y1 = min((x + w) * self._tile_size, width), min((y + h) * self._tile_size, height)
+            # The transformed window contains all edges within the margin of the updated region
+            windows.append(((x0, y0, x1, y1), (max(x0 - margin, 0), max(y0 - margin, 0),
+                                               min(x1 + margin, width), min(y1 + margin, height))))
+
+        recomputed_pixels = sum((wx1 - wx0) * (wy1 - wy0) for _, (wx0, wy0, wx1, wy1) in windows)
+        if recomputed_pixels > self._full_update_fraction * height * width:
+            return self._update_full(edge_image)
+
+        for (x0, y0, x1, y1), (wx0, wy0, wx1, wy1) in windows:
+            distances = self._fitness_strategy.create_distances(edge_image[wy0:wy1, wx0:wx1])
+            region_map = self._fitness_map[y0:y1, x0:x1]
+            region_map[:] = distances[y0 - wy0:y1 - wy0, x0 - wx0:x1 - wx0]
+            self._fitness_strategy._fitness_from_distances_inplace(region_map, self._max_distance)
+
+        self._edge_image = edge_image.copy()
+        self.recomputed_fraction = recomputed_pixels / (height * width)
+        return self._fitness_map
+
+    def _update_full(self, edge_image: np.array) -> np.array:
+        distances = self._fitness_strategy.create_distances(edge_image)
+        if self._max_distance is None:
+            self._max_distance = float(distances.max())
+        self._fitness_map = self._fitness_strategy._fitness_from_distances_inplace(distances, self._max_distance)
+        self._edge_image = edge_image.copy()
+        self.recomputed_fraction = 1.0
+        return self._fitness_map
+
+    def _changed_tiles(self, edge_image: np.array) -> np.array:
+        height, width = edge_image.shape
+        n_rows, n_columns = -(-height // self._tile_size), -(-width // self._tile_size)
+        changed = np.zeros((n_rows * self._tile_size, n_columns * self._tile_size), dtype=bool)
+        np.not_equal(edge_image, self._edge_image, out=changed[:height, :width])
+        return changed.reshape(n_rows, self._tile_size, n_columns, self._tile_size).any(axis=(1, 3))
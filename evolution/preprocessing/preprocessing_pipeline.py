@@ -0,0 +1,142 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Iterable, Iterator, NamedTuple, Union, Optional
+
+import numpy as np
+import cv2 as cv
+
+from evolution.base.base_strategies import EdgeExtractionStrategy, FitnessStrategy
+
+# An image source: a file name, which is decoded by the pipeline, or an already decoded BGR image
+ImageSource = Union[str, np.array]
+
+
+class PreprocessedImage(NamedTuple):
+    index: int
+    image: np.array
+    edge_image: np.array
+    fitness_map: np.array
+
+
+def video_frames(file_name: str, step: int = 1) -> Iterator[np.array]:
+    """
+    Decodes every step-th frame of a video file.
+    :param file_name: The video file
+    :param step: Yield every step-th frame
+    """
+    capture = cv.VideoCapture(file_name)
+    try:
+        frame_index = 0
+        while True:
+            success, frame = capture.read()
+            if not success:
+                return
+            if frame_index % step == 0:
+                yield frame
+            frame_index += 1
+    finally:
+        capture.release()
+
+
+class PreprocessingPipeline:
+    """
+    Turns a stream of images (or video frames) into edge images and fitness maps in the background.
+
+    A feeder thread pulls sources (e.g. decoding video frames) and submits them to a bounded thread pool, which
+    decodes image files, extracts the edges and creates the fitness maps. About prefetch images are in flight,
+    so memory stays bounded while the next images are ready before the optimizer asks for them.
+    Results are yielded in source order. OpenCV releases the GIL, therefore threads run in parallel.
+
+    The fitness maps can be passed to GeneticCameraAlgorithm(fitness_map=...).
+    """
+    def __init__(self,
+                 edge_extraction_strategy: EdgeExtractionStrategy,
+                 fitness_strategy: FitnessStrategy,
+                 n_workers: int = 2,
+                 prefetch: int = 4) -> None:
+        """
+        :param edge_extraction_strategy: Extracts the binary edge image of every image
+        :param fitness_strategy: Creates the fitness map of every edge image
+        :param n_workers: The number of preprocessing threads
+        :param prefetch: The maximum number of images preprocessed ahead of the consumer
+        """
+        super().__init__()
+        self._edge_extraction_strategy = edge_extraction_strategy
+        self._fitness_strategy = fitness_strategy
+        self._n_workers = n_workers
+        self._prefetch = max(prefetch, 1)
+
+    def preprocess(self, index: int, source: ImageSource) -> PreprocessedImage:
+        """
+        Preprocesses a single image in the calling thread.
+        :param index: The index reported in the result
+        :param source: A file name or a BGR image
+        """
+        image = cv.imread(source) if isinstance(source, str) else source
+        if image is None:
+            raise IOError("Could not read image '{}'".format(source))
+        edge_image = self._edge_extraction_strategy.extract_edges(image)
+        fitness_map = self._fitness_strategy.create_fitness(edge_image)
+        return PreprocessedImage(index, image, edge_image, fitness_map)
+
+    def process(self, sources: Iterable[ImageSource]) -> Iterator[PreprocessedImage]:
+        """
+        Preprocesses all sources in the background.
+        :param sources: File names and / or BGR images, e.g. video_frames(file_name)
+        :return: Iterator over the preprocessed images, in source order
+        """
+        futures = queue.Queue(self._prefetch)
+        stopped = threading.Event()
+        executor = ThreadPoolExecutor(self._n_workers)
+        feeder = threading.Thread(target=self._feed, args=(sources, executor, futures, stopped), daemon=True)
+        feeder.start()
+        try:
+            while True:
+                future = futures.get()
+                if future is None:
+                    return
+                yield future.result()
+        finally:
+            # The consumer stopped early or failed, unblock the feeder and drop all prefetched work
+            stopped.set()
+            while feeder.is_alive():
+                self._drain(futures)
+                feeder.join(0.01)
+            self._drain(futures)
+            executor.shutdown(cancel_futures=True)
+
+    def _feed(self, sources: Iterable[ImageSource], executor: ThreadPoolExecutor, futures: queue.Queue,
+              stopped: threading.Event):
+        try:
+            for index, source in enumerate(sources):
+                if stopped.is_set():
+                    return
+                future = executor.submit(self.preprocess, index, source)
+                if not self._put(futures, future, stopped):
+                    return
+        except Exception as exception:
+            failed = Future()
+            failed.set_exception(exception)
+            self._put(futures, failed, stopped)
+        self._put(futures, None, stopped)
+
+    @staticmethod
+    def _put(futures: queue.Queue, item: Optional[Future], stopped: threading.Event) -> bool:
+        while not stopped.is_set():
+            try:
+                futures.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    @staticmethod
+    def _drain(futures: queue.Queue):
+        while True:
+            try:
+                future = futures.get_nowait()
+            except queue.Empty:
+                return
+            if future is not None:
+                future.cancel()
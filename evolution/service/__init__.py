@@ -0,0 +1,7 @@
+from .calibration_service import CalibrationService, CalibrationRequest
+from .fitness_batcher import FitnessBatcher, BatchedEvaluation
+from .http_server import start_server, run_server
+from .lru_cache import LruCache
+
+__all__ = ["CalibrationService", "CalibrationRequest", "FitnessBatcher", "BatchedEvaluation", "start_server",
+           "run_server", "LruCache"]
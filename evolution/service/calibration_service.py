@@ -0,0 +1,221 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Tuple, Optional
+
+import numpy as np
+import cv2 as cv
+
+from evolution.camera.camera_algorithm import GeneticCameraAlgorithm
+from evolution.camera.camera_genome_parameters import CameraGenomeParameters
+from evolution.camera.camera_kernels import PopulationScorer
+from evolution.camera.object_geometry import ObjGeometry
+from evolution.service.fitness_batcher import FitnessBatcher, BatchedEvaluation
+from evolution.service.lru_cache import LruCache
+from evolution.strategies.crossover import TwoPoint
+from evolution.strategies.fitness import DistanceMap, DistanceMapWithPunishment
+from evolution.strategies.mutation import BoundedUniformMutation
+from evolution.strategies.populate import ValueUniformPopulation
+from evolution.strategies.selection import Tournament
+from evolution.strategies.strategy_bundle import StrategyBundle
+from evolution.strategies.termination import MaxIteration, NoImprovement, Or, WallClockDeadline
+
+FITNESS_STRATEGIES = {"DistanceMap": DistanceMap, "DistanceMapWithPunishment": DistanceMapWithPunishment}
+DISTANCE_TYPES = {"L1": DistanceMap.DistanceType.L1, "L2": DistanceMap.DistanceType.L2}
+
+
+class CalibrationRequest(NamedTuple):
+    parameters_file: str
+    image_shape: Tuple[int, int]
+    geometry_file: str
+    edge_image_file: str
+    start_dna: np.array
+    population_size: int = 32
+    max_iterations: int = 200
+    no_improvement: Optional[int] = None
+    fitness: str = "DistanceMapWithPunishment"
+    distance_type: str = "L2"
+    log_div: float = 0.3
+    # Seconds the optimization may take (queueing excluded), afterwards the best camera so far is returned
+    deadline: Optional[float] = None
+
+    @classmethod
+    def from_json(cls, request: dict) -> "CalibrationRequest":
+        """
+        :param request: Decoded json, keys are the field names. image_shape is [height, width]
+        """
+        unknown = set(request) - set(cls._fields)
+        if unknown:
+            raise ValueError("Unknown request fields {}".format(sorted(unknown)))
+        if request.get("fitness", cls._field_defaults["fitness"]) not in FITNESS_STRATEGIES:
+            raise ValueError("Unknown fitness, use one of {}".format(list(FITNESS_STRATEGIES)))
+        if request.get("distance_type", cls._field_defaults["distance_type"]) not in DISTANCE_TYPES:
+            raise ValueError("Unknown distance_type, use one of {}".format(list(DISTANCE_TYPES)))
+        fields = dict(request)
+        fields["image_shape"] = tuple(int(n) for n in request["image_shape"])
+        fields["start_dna"] = np.array(request["start_dna"], dtype=np.float64)
+        return cls(**fields)
+
+
+def _file_key(file_name: str):
+    # The modification time invalidates cache entries of changed files
+    return os.path.abspath(file_name), os.path.getmtime(file_name)
+
+
+def _summary(values) -> dict:
+    if len(values) == 0:
+        return {"count": 0}
+    values = np.array(values)
+    return {"count": len(values), "mean": float(np.mean(values)), "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)), "max": float(np.max(values))}
+
+
+class CalibrationService:
+    """
+    Runs calibration jobs on a pool of worker threads and keeps everything, which can be shared between jobs,
+    in bounded LRU caches: parsed genome parameters, geometries and fitness maps (with their PopulationScorer).
+
+    Jobs with the same fitness map and geometry are scored together: their population evaluations are collected
+    by a FitnessBatcher and scored in one call.
+
+    The fitness is therefore the PopulationScorer's (1 pixel wide lines, cameras which do not see any segment of the
+    geometry are culled), not the CameraScorer's. A job returns the same optimum and fitness as
+    GeneticCameraAlgorithm(..., scoring_backend="auto") with the same strategies, start dna and random state.
+    """
+    def __init__(self,
+                 n_workers: int = 4,
+                 max_parameters: int = 16,
+                 max_geometries: int = 16,
+                 max_fitness_maps: int = 8,
+                 batch_window: float = 0.002,
+                 latency_history: int = 1000) -> None:
+        """
+        :param n_workers: The number of jobs running at the same time, further jobs are queued
+        :param max_parameters: The number of cached genome parameters
+        :param max_geometries: The number of cached geometries
+        :param max_fitness_maps: The number of cached fitness maps
+        :param batch_window: Seconds the batcher waits for evaluations of other jobs, see FitnessBatcher
+        :param latency_history: The number of recent jobs the latency statistics are computed from
+        """
+        super().__init__()
+        self._executor = ThreadPoolExecutor(n_workers)
+        self._n_workers = n_workers
+        self._parameters = LruCache(max_parameters)
+        self._geometries = LruCache(max_geometries)
+        self._fitness_maps = LruCache(max_fitness_maps)
+        self._batcher = FitnessBatcher(batch_window)
+
+        self._lock = threading.Lock()
+        self._n_queued = 0
+        self._n_running = 0
+        self._n_finished = 0
+        self._n_failed = 0
+        self._queue_times = deque(maxlen=latency_history)
+        self._run_times = deque(maxlen=latency_history)
+        self._start_time = time.monotonic()
+
+    async def calibrate_async(self, request: CalibrationRequest) -> dict:
+        """
+        Queues the job on the worker pool and waits for it without blocking the event loop.
+        """
+        with self._lock:
+            self._n_queued += 1
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._run_job, request,
+                                                                time.monotonic())
+
+    def calibrate(self, request: CalibrationRequest) -> dict:
+        """
+        Runs the job in the calling thread.
+        """
+        with self._lock:
+            self._n_queued += 1
+        return self._run_job(request, time.monotonic())
+
+    def _run_job(self, request: CalibrationRequest, queued_time: float) -> dict:
+        start_time = time.monotonic()
+        with self._lock:
+            self._n_queued -= 1
+            self._n_running += 1
+            self._queue_times.append(start_time - queued_time)
+        try:
+            result = self._run(request)
+        except Exception:
+            with self._lock:
+                self._n_failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._n_running -= 1
+        run_time = time.monotonic() - start_time
+        with self._lock:
+            self._n_finished += 1
+            self._run_times.append(run_time)
+        result.update(queue_time=start_time - queued_time, run_time=run_time)
+        return result
+
+    def _run(self, request: CalibrationRequest) -> dict:
+        parameters_key = _file_key(request.parameters_file) + request.image_shape
+        genome_parameters = self._parameters.get(parameters_key, lambda: CameraGenomeParameters(
+            request.parameters_file, request.image_shape))
+
+        geometry_key = _file_key(request.geometry_file)
+        geometry = self._geometries.get(geometry_key, lambda: ObjGeometry(request.geometry_file))
+
+        fitness_strategy = FITNESS_STRATEGIES[request.fitness](DISTANCE_TYPES[request.distance_type], request.log_div)
+        fitness_key = (_file_key(request.edge_image_file), geometry_key, request.fitness, request.distance_type,
+                       request.log_div)
+        edge_image, fitness_map, population_scorer = self._fitness_maps.get(
+            fitness_key, lambda: self._create_fitness_map(request, fitness_strategy, geometry))
+
+        termination_strategy = MaxIteration(request.max_iterations)
+        if request.no_improvement is not None:
+            termination_strategy = Or(termination_strategy, NoImprovement(request.no_improvement))
+        if request.deadline is not None:
+            termination_strategy = Or(termination_strategy, WallClockDeadline(request.deadline))
+        strategy_bundle = StrategyBundle(ValueUniformPopulation(request.population_size),
+                                         fitness_strategy,
+                                         Tournament(4),
+                                         TwoPoint(),
+                                         BoundedUniformMutation(genome_parameters),
+                                         termination_strategy)
+
+        camera_algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, edge_image, geometry,
+                                                  fitness_map=fitness_map,
+                                                  evaluation_chunk_size=None if request.deadline is None else 8,
+                                                  evaluation_backend=BatchedEvaluation(self._batcher,
+                                                                                       population_scorer))
+        result = camera_algorithm.run(request.start_dna)
+        best_genome, best_fitness = result.best_genome
+        return {"best_dna": best_genome.dna.tolist(),
+                "best_fitness": float(best_fitness),
+                "n_generations": result.n_generations,
+                "n_evaluations": camera_algorithm.n_evaluations}
+
+    @staticmethod
+    def _create_fitness_map(request: CalibrationRequest, fitness_strategy, geometry):
+        edge_image = cv.imread(request.edge_image_file, cv.IMREAD_GRAYSCALE)
+        if edge_image is None:
+            raise IOError("Could not read edge image '{}'".format(request.edge_image_file))
+        if edge_image.shape != request.image_shape:
+            raise ValueError("The edge image has shape {}, expected {}".format(edge_image.shape, request.image_shape))
+        fitness_map = fitness_strategy.create_fitness(edge_image)
+        return edge_image, fitness_map, PopulationScorer(fitness_map, geometry)
+
+    def stats(self) -> dict:
+        with self._lock:
+            jobs = {"queued": self._n_queued, "running": self._n_running, "finished": self._n_finished,
+                    "failed": self._n_failed, "workers": self._n_workers}
+            latency = {"queue_time": _summary(self._queue_times), "run_time": _summary(self._run_times)}
+        return {"uptime": time.monotonic() - self._start_time,
+                "jobs": jobs,
+                "latency": latency,
+                "batching": self._batcher.stats(),
+                "caches": {"parameters": self._parameters.stats(),
+                           "geometries": self._geometries.stats(),
+                           "fitness_maps": self._fitness_maps.stats()}}
+
+    def shutdown(self):
+        self._executor.shutdown(cancel_futures=True)
@@ -0,0 +1,103 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List
+
+import numpy as np
+
+from evolution.base.base_evaluation import EvaluationBackend
+from evolution.base.base_genome import BaseGenome
+from evolution.camera.camera_kernels import PopulationScorer
+
+
+class FitnessBatcher:
+    """
+    Collects population evaluations of concurrently running jobs and scores all evaluations, which share a
+    PopulationScorer (i.e. fitness map and geometry), in one call.
+
+    A single background thread owns all scorers, so they are never used concurrently.
+    """
+    def __init__(self, batch_window: float = 0.002) -> None:
+        """
+        :param batch_window: Seconds to wait for further evaluations after the first one of a batch arrived
+        """
+        super().__init__()
+        self._batch_window = batch_window
+        self._requests = queue.Queue()
+        self._lock = threading.Lock()
+        self._n_batches = 0
+        self._n_requests = 0
+        self._n_cameras = 0
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def score(self, population_scorer: PopulationScorer, dna_stack: np.array) -> np.array:
+        """
+        Scores full camera dna with the given scorer, blocks until the batch containing it is scored.
+        """
+        future = Future()
+        self._requests.put((population_scorer, np.atleast_2d(dna_stack), future))
+        return future.result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            n_batches = max(self._n_batches, 1)
+            return {"batches": self._n_batches,
+                    "mean_requests_per_batch": self._n_requests / n_batches,
+                    "mean_cameras_per_batch": self._n_cameras / n_batches}
+
+    def _run(self):
+        while True:
+            requests = [self._requests.get()]
+            deadline = time.monotonic() + self._batch_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    requests.append(self._requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            by_scorer = {}
+            for request in requests:
+                by_scorer.setdefault(id(request[0]), []).append(request)
+            for batch in by_scorer.values():
+                self._score_batch(batch)
+
+    def _score_batch(self, batch):
+        population_scorer = batch[0][0]
+        dna_stacks = [dna_stack for _, dna_stack, _ in batch]
+        try:
+            scores = population_scorer.score(np.concatenate(dna_stacks))
+        except Exception as exception:
+            for _, _, future in batch:
+                future.set_exception(exception)
+            return
+
+        offsets = np.cumsum([0] + [len(dna_stack) for dna_stack in dna_stacks])
+        for (_, _, future), start, end in zip(batch, offsets[:-1], offsets[1:]):
+            future.set_result(scores[start:end])
+        with self._lock:
+            self._n_batches += 1
+            self._n_requests += len(batch)
+            self._n_cameras += int(offsets[-1])
+
+
+class BatchedEvaluation(EvaluationBackend):
+    """
+    Evaluates populations through a FitnessBatcher, so concurrent jobs with the same fitness map are scored together.
+    """
+    def __init__(self, batcher: FitnessBatcher, population_scorer: PopulationScorer) -> None:
+        super().__init__()
+        self._batcher = batcher
+        self._population_scorer = population_scorer
+
+    def submit(self, genome: BaseGenome) -> Future:
+        future = Future()
+        future.set_result(self.evaluate([genome])[0])
+        return future
+
+    def evaluate(self, population: List[BaseGenome]) -> List[float]:
+        dna_stack = self._algorithm.genome_factory.expand_dna(np.array([genome.dna for genome in population]))
+        return list(self._batcher.score(self._population_scorer, dna_stack))
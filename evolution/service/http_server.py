@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+import json
+from typing import Optional
+
+from evolution.service.calibration_service import CalibrationService, CalibrationRequest
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    if not request_line:
+        raise ValueError("Empty request")
+    method, path, _ = request_line.split(" ", 2)
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, value = line.split(":", 1)
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return method, path, body
+
+
+async def _write_response(writer: asyncio.StreamWriter, status: int, content: dict):
+    body = json.dumps(content).encode("utf-8")
+    head = "HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\nConnection: close\r\n\r\n"
+    writer.write(head.format(status, _REASONS[status], len(body)).encode("latin-1") + body)
+    await writer.drain()
+    writer.close()
+
+
+def create_handler(service: CalibrationService):
+    """
+    Routes:
+        POST /calibrate: json CalibrationRequest, answers with the best camera once the job is finished
+        GET /stats: job counts, queue and run time percentiles, batching and cache statistics
+    """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            method, path, body = await _read_request(reader)
+        except (ValueError, asyncio.IncompleteReadError) as exception:
+            await _write_response(writer, 400, {"error": str(exception)})
+            return
+
+        if path == "/stats":
+            await _write_response(writer, 200, service.stats())
+        elif path == "/calibrate" and method == "POST":
+            try:
+                request = CalibrationRequest.from_json(json.loads(body))
+            except (ValueError, KeyError, TypeError) as exception:
+                await _write_response(writer, 400, {"error": "Invalid request: {}".format(exception)})
+                return
+            try:
+                await _write_response(writer, 200, await service.calibrate_async(request))
+            except (IOError, ValueError) as exception:
+                await _write_response(writer, 400, {"error": str(exception)})
+            except Exception as exception:
+                await _write_response(writer, 500, {"error": repr(exception)})
+        elif path == "/calibrate":
+            await _write_response(writer, 405, {"error": "Use POST"})
+        else:
+            await _write_response(writer, 404, {"error": "Unknown path {}".format(path)})
+
+    return handle
+
+
+async def start_server(service: CalibrationService, host: str = "127.0.0.1", port: int = 8080,
+                       unix_path: Optional[str] = None) -> asyncio.AbstractServer:
+    """
+    Starts serving on a TCP port, or on a unix socket if unix_path is given.
+    """
+    handler = create_handler(service)
+    if unix_path is not None:
+        return await asyncio.start_unix_server(handler, unix_path)
+    return await asyncio.start_server(handler, host, port)
+
+
+def run_server(service: CalibrationService, host: str = "127.0.0.1", port: int = 8080,
+               unix_path: Optional[str] = None) -> None:
+    async def serve():
+        server = await start_server(service, host, port, unix_path)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local calibration service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix-path", default=None, help="Serve on this unix socket instead of a TCP port")
+    parser.add_argument("--workers", type=int, default=4)
+    arguments = parser.parse_args()
+    run_server(CalibrationService(arguments.workers), arguments.host, arguments.port, arguments.unix_path)
@@ -0,0 +1,53 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Any
+
+
+class LruCache:
+    """
+    A thread safe, bounded least recently used cache.
+    Values are created at most once per key, concurrent requests for the same key wait for the first one.
+    """
+    def __init__(self, max_size: int) -> None:
+        """
+        :param max_size: The maximum number of cached values, the least recently used value is evicted first
+        """
+        super().__init__()
+        self._max_size = max_size
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable, create: Callable[[], Any]) -> Any:
+        """
+        :param key: The cache key
+        :param create: Creates the value on a cache miss
+        :return: The cached or newly created value
+        """
+        with self._lock:
+            if key in self._values:
+                self._values.move_to_end(key)
+                self._hits += 1
+                return self._values[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._values:
+                    self._values.move_to_end(key)
+                    self._hits += 1
+                    return self._values[key]
+            value = create()
+            with self._lock:
+                self._misses += 1
+                self._values[key] = value
+                while len(self._values) > self._max_size:
+                    self._values.popitem(last=False)
+                self._key_locks.pop(key, None)
+            return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._values), "max_size": self._max_size, "hits": self._hits, "misses": self._misses}
@@ -1,12 +1,39 @@
-from .crossover import Uniform, TwoPoint, SinglePoint
-from .fitness import DistanceMap, DistanceMapWithPunishment
-from .mutation import BoundedUniformMutation, BoundedDistributionBasedMutation
-from .populate import ValueUniformPopulation, BoundedUniformPopulation
-from .selection import Random, RouletteWheel, Tournament
-from .strategy_bundle import StrategyBundle
-from .termination import NoImprovement, FitnessReached, MaxIteration, Or, And
+import importlib
+
+# Submodules are imported on first access of one of their names (PEP 562), see evolution.camera
+_submodules = {
+    "crossover": ["Uniform", "TwoPoint", "SinglePoint", "BlockUniform"],
+    "detail": ["GenerationDetail", "DiversityDetail"],
+    "diversity": ["gene_spread", "population_diversity"],
+    "edges": ["HsvRange", "Canny"],
+    "fitness": ["DistanceMap", "DistanceMapWithPunishment", "MultiFrameFitness", "OrientedDistanceMap"],
+    "mutation": ["BoundedUniformMutation", "BoundedDistributionBasedMutation"],
+    "populate": ["ValueUniformPopulation", "BoundedUniformPopulation"],
+    "restart": ["IPOPRestart"],
+    "selection": ["Random", "RouletteWheel", "Tournament"],
+    "strategy_bundle": ["StrategyBundle"],
+    "surrogate": ["KNearestNeighbours", "RadialBasis"],
+    "termination": ["NoImprovement", "FitnessReached", "MaxIteration", "Or", "And", "DiversityCollapse",
+                    "WallClockDeadline", "MaxEvaluations"],
+}
+_modules = {name: module for module, names in _submodules.items() for name in names}
 
 __all__ = ["Uniform", "TwoPoint", "SinglePoint", "DistanceMap", "DistanceMapWithPunishment", "BoundedUniformMutation",
            "BoundedDistributionBasedMutation", "ValueUniformPopulation", "BoundedUniformPopulation", "Random",
            "RouletteWheel", "Tournament", "StrategyBundle", "NoImprovement", "FitnessReached", "MaxIteration", "Or",
-           "And"]
+           "And", "DiversityCollapse", "IPOPRestart", "gene_spread", "population_diversity",
+           "HsvRange", "Canny", "KNearestNeighbours", "RadialBasis",
+           "GenerationDetail", "DiversityDetail", "WallClockDeadline", "MaxEvaluations",
+           "MultiFrameFitness", "OrientedDistanceMap", "BlockUniform"]
+
+
+def __getattr__(name):
+    if name not in _modules:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module("." + _modules[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,10 +1,10 @@
-from typing import Tuple
+from typing import List, Tuple
 
 import numpy as np
 
 from evolution.base.base_genome import BaseGenome
 from evolution.base.base_genome_factory import BaseGenomeFactory
-from evolution.base.base_strategies import CrossoverStrategy
+from evolution.base.base_strategies import CrossoverStrategy, array_digest
 
 
 class Uniform(CrossoverStrategy):
@@ -37,6 +37,12 @@ class Uniform(CrossoverStrategy):
     def printable_identifier(self):
         return f"Uniform{self.identifier_suffix}"
 
+    def result_identifier(self) -> str:
+        probabilities = self._crossover_probabilties
+        if np.ndim(probabilities) > 0:
+            probabilities = array_digest(np.asarray(probabilities, dtype=np.float64))
+        return "Uniform(p={})".format(probabilities)
+
 
 class SinglePoint(CrossoverStrategy):
 
@@ -87,3 +93,43 @@ class TwoPoint(CrossoverStrategy):
 
     def printable_identifier(self):
         return "TwoPoint"
+
+
+class BlockUniform(CrossoverStrategy):
+    def __init__(self, blocks: List[np.array], crossover_probability: float = .5) -> None:
+        """
+        :param blocks: Disjoint index arrays into the full dna, e.g. MultiViewGenomeParameters.blocks. Genes outside
+            of every block are never exchanged
+        :param crossover_probability: The probability of exchanging a block
+        """
+        super().__init__()
+        self._blocks = [np.asarray(block, dtype=np.int64) for block in blocks]
+        self._crossover_probability = crossover_probability
+
+    def crossover(self,
+                  genome_factory: BaseGenomeFactory,
+                  genome_a: BaseGenome,
+                  genome_b: BaseGenome) -> Tuple[BaseGenome, BaseGenome]:
+        """
+        Parent A    : XXX|XX|XXX
+        Parent B    : ---|--|---
+        Offspring0  : XXX|--|XXX
+        Offspring1  : ---|XX|---
+        Based on probabilities, whole blocks are exchanged
+        """
+        dna_a, dna_b = genome_factory.expand_dna(genome_a.dna), genome_factory.expand_dna(genome_b.dna)
+        dna_child_a, dna_child_b = dna_a.copy(), dna_b.copy()
+        for block in self._blocks:
+            if np.random.random_sample() < self._crossover_probability:
+                dna_child_a[block], dna_child_b[block] = dna_b[block], dna_a[block]
+
+        child_a = genome_factory.create(genome_factory.reduce_dna(dna_child_a))
+        child_b = genome_factory.create(genome_factory.reduce_dna(dna_child_b))
+        return child_a, child_b
+
+    def printable_identifier(self):
+        return "BlockUniform"
+
+    def result_identifier(self) -> str:
+        block_sizes = "/".join(str(len(block)) for block in self._blocks)
+        return "BlockUniform(blocks={}, p={})".format(block_sizes, self._crossover_probability)
@@ -0,0 +1,59 @@
+from typing import List
+
+import numpy as np
+
+from evolution.base.base_strategies import DetailSchedule, Population
+from evolution.strategies.diversity import population_diversity
+
+
+class GenerationDetail(DetailSchedule):
+    def __init__(self, switch_generations: List[int]) -> None:
+        """
+        Switches to the next level of detail after fixed numbers of generations.
+        :param switch_generations: Increasing generations, at which the next level is used
+        """
+        super().__init__()
+        self._switch_generations = list(switch_generations)
+
+    def level(self, current_generation: int, n_levels: int) -> int:
+        passed = sum(current_generation + 1 >= generation for generation in self._switch_generations)
+        return min(passed, n_levels - 1)
+
+    def printable_identifier(self):
+        return "GenerationDetail(at={})".format(self._switch_generations)
+
+
+class DiversityDetail(DetailSchedule):
+    def __init__(self, thresholds: List[float], min_generations: int = 5) -> None:
+        """
+        Switches to the next level of detail as the population converges, i.e. once the population diversity
+        (see population_diversity) drops below the level's threshold.
+        :param thresholds: Decreasing diversity thresholds, one per switch
+        :param min_generations: The minimum number of generations on every level
+        """
+        super().__init__()
+        self._thresholds = list(thresholds)
+        self._min_generations = min_generations
+        self._level = 0
+        self._generations_on_level = 0
+        self.diversity = np.inf
+
+    def observe_population(self, population: Population, population_fitness: List[float],
+                           genome_bounds: np.array) -> None:
+        self.diversity = population_diversity(population, genome_bounds)
+        self._generations_on_level += 1
+        if self._level < len(self._thresholds) and self._generations_on_level >= self._min_generations \
+                and self.diversity < self._thresholds[self._level]:
+            self._level += 1
+            self._generations_on_level = 0
+
+    def level(self, current_generation: int, n_levels: int) -> int:
+        return min(self._level, n_levels - 1)
+
+    def reset(self) -> None:
+        self._level = 0
+        self._generations_on_level = 0
+        self.diversity = np.inf
+
+    def printable_identifier(self):
+        return "DiversityDetail(thresholds={})".format(self._thresholds)
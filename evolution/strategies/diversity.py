@@ -0,0 +1,33 @@
+import numpy as np
+
+from evolution.base.base_strategies import Population
+
+
+def gene_spread(population: Population, genome_bounds: np.array) -> np.array:
+    """
+    Per gene standard deviation of the population, normalized by the width of the gene's bounds.
+    Genes with empty bounds (lower == upper) have a spread of 0.
+    :param population: The population
+    :param genome_bounds: 2 x n_genes bounds array
+    :return: n_genes normalized spreads
+    """
+    dna_stack = np.array([genome.dna for genome in population])
+    lower, upper = genome_bounds
+    width = upper - lower
+    spread = np.std(dna_stack, axis=0)
+    return np.divide(spread, width, out=np.zeros_like(spread, dtype=float), where=width > 0)
+
+
+def population_diversity(population: Population, genome_bounds: np.array) -> float:
+    """
+    The mean normalized gene spread over all genes with non-empty bounds.
+    A value close to 0 means that the population collapsed onto a single point.
+    :param population: The population
+    :param genome_bounds: 2 x n_genes bounds array
+    :return: The diversity
+    """
+    lower, upper = genome_bounds
+    free_genes = (upper - lower) > 0
+    if not free_genes.any():
+        return 0.0
+    return float(np.mean(gene_spread(population, genome_bounds)[free_genes]))
@@ -0,0 +1,49 @@
+from typing import Tuple
+
+import numpy as np
+import cv2 as cv
+
+from evolution.base.base_strategies import EdgeExtractionStrategy
+
+
+class HsvRange(EdgeExtractionStrategy):
+    def __init__(self, lower: Tuple[int, int, int] = (120, 0, 0),
+                 upper: Tuple[int, int, int] = (180, 255, 255)) -> None:
+        """
+        Keeps all pixels whose HSV color lies within [lower, upper], e.g. colored court lines.
+        The defaults select the hue range 120 to 180 (OpenCV hue scale 0 to 180), like the real squash example.
+        :param lower: Inclusive lower (h, s, v) bound
+        :param upper: Inclusive upper (h, s, v) bound
+        """
+        super().__init__()
+        self._lower = np.array(lower, dtype=np.uint8)
+        self._upper = np.array(upper, dtype=np.uint8)
+
+    def extract_edges(self, image: np.array) -> np.array:
+        return cv.inRange(cv.cvtColor(image, cv.COLOR_BGR2HSV), self._lower, self._upper)
+
+    def printable_identifier(self):
+        return "HsvRange(lower={}, upper={})".format(tuple(self._lower), tuple(self._upper))
+
+
+class Canny(EdgeExtractionStrategy):
+    def __init__(self, threshold_low: float = 50, threshold_high: float = 150, blur_size: int = 5) -> None:
+        """
+        Canny edges of the gray image.
+        :param threshold_low: Lower hysteresis threshold
+        :param threshold_high: Upper hysteresis threshold
+        :param blur_size: Size of the gaussian blur applied before, 0 disables blurring
+        """
+        super().__init__()
+        self._threshold_low = threshold_low
+        self._threshold_high = threshold_high
+        self._blur_size = blur_size
+
+    def extract_edges(self, image: np.array) -> np.array:
+        gray_image = cv.cvtColor(image, cv.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        if self._blur_size > 0:
+            gray_image = cv.GaussianBlur(gray_image, (self._blur_size, self._blur_size), 0)
+        return cv.Canny(gray_image, self._threshold_low, self._threshold_high)
+
+    def printable_identifier(self):
+        return "Canny(low={}, high={})".format(self._threshold_low, self._threshold_high)
@@ -1,3 +1,7 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 import numpy as np
 import cv2 as cv
 
@@ -10,29 +14,322 @@ class DistanceMap(FitnessStrategy):
         L1 = cv.DIST_L1
         L2 = cv.DIST_L2
 
-    def __init__(self, distance_type: DistanceType = DistanceType.L2, log_div: float = 0.1) -> None:
+    # The 3x3 distance transforms never underestimate the maximum norm by more than this factor
+    _MASK_SLACK = 1.05
+
+    def __init__(self,
+                 distance_type: DistanceType = DistanceType.L2,
+                 log_div: float = 0.1,
+                 tile_size: Optional[int] = None,
+                 n_workers: Optional[int] = None,
+                 coarse_factor: int = 8) -> None:
+        """
+        :param distance_type: The distance type of the distance transform
+        :param log_div: Divisor of the logarithmic distances. Smaller values saturate the fitness closer to the edges
+        :param tile_size: If set, large images are transformed tile by tile in a thread pool (see create_fitness)
+        :param n_workers: The number of threads for tiled transforms. Defaults to the number of CPUs
+        :param coarse_factor: Downsampling factor of the coarse pass, which finds the maximum distance of tiled
+            transforms
+        """
         super().__init__()
         self._distance_type = distance_type
         self._log_div = log_div
+        self._tile_size = tile_size
+        self._n_workers = n_workers
+        self._coarse_factor = coarse_factor
 
     def create_fitness(self, edge_image: np.array) -> np.array:
-        fitness_map = cv.distanceTransform(~edge_image, self._distance_type, maskSize=3)
-        cv.normalize(fitness_map, fitness_map, 0.0, 1.0, cv.NORM_MINMAX)
+        """
+        Transforms the distances to the nearest edge pixel to fitness values (see fitness_from_distances).
+
+        In tiled mode, every tile is transformed with an overlap margin of the cutoff distance, so it contains all
+        edges, which affect its fitness. The maximum distance for the normalization is found by a coarse pass first.
+        Tiles are processed in a thread pool, OpenCV releases the GIL.
+        """
+        height, width = edge_image.shape
+        if self._tile_size is None or (height <= self._tile_size and width <= self._tile_size):
+            distances = self.create_distances(edge_image)
+            return self._fitness_from_distances_inplace(distances, float(distances.max()))
+        with ThreadPoolExecutor(self._n_workers) as executor:
+            return self._create_fitness_tiled(edge_image, executor)
+
+    def create_distances(self, edge_image: np.array) -> np.array:
+        """
+        :return: The distance of every pixel to the nearest edge pixel (float32)
+        """
+        return cv.distanceTransform(~edge_image, self._distance_type, maskSize=3)
+
+    def fitness_from_distances(self, distances: np.array, max_distance: float) -> np.array:
+        """
+        Transforms distances to fitness values. Distances are normalized by max_distance, which is the maximum
+        distance of the whole image for create_fitness, or a fixed reference when only parts of an image are
+        transformed (see IncrementalDistanceMap).
+        :return: The fitness map, the distances are not modified
+        """
+        return self._fitness_from_distances_inplace(np.array(distances, dtype=np.result_type(distances, np.float32)),
+                                                    max_distance)
+
+    def _fitness_from_distances_inplace(self, distances: np.array, max_distance: float) -> np.array:
+        """
+        Like fitness_from_distances, but transforms the (float) distances in place, no temporary images are allocated.
+        :return: The transformed distances
+        """
+        fitness_map = distances
+        # Images, which consist of edge pixels only, have a maximum distance of 0. Every pixel is on an edge then
+        np.divide(fitness_map, max_distance if max_distance > 0 else 1.0, out=fitness_map)
+        np.log1p(fitness_map, out=fitness_map)
+        np.divide(fitness_map, self._log_div, out=fitness_map)
+        np.minimum(fitness_map, 1.0, out=fitness_map)
+        np.subtract(1, fitness_map, out=fitness_map)
+        return fitness_map
+
+    def cutoff_distance(self, max_distance: float) -> float:
+        """
+        :return: The distance, at which the fitness saturates. Beyond it, the fitness does not depend on the distance
+        """
+        return max_distance * float(np.expm1(self._log_div))
+
+    def influence_radius(self, max_distance: float) -> int:
+        """
+        :return: The radius (per axis, in pixels) around an edge pixel, in which it can affect the fitness
+        """
+        return int(math.ceil(self.cutoff_distance(max_distance) * self._MASK_SLACK)) + 1
+
+    def max_distance(self, edge_image: np.array, executor: Optional[ThreadPoolExecutor] = None) -> float:
+        """
+        Finds the maximum distance of the edge image without transforming the whole image.
+
+        (A) A coarse edge image (blocks of coarse_factor^2 pixels) is transformed. It bounds the distance of every
+            pixel to +- 2 * (coarse_factor - 1) around the scaled distance of its block.
+        (B) Only blocks, which may contain the maximum, are transformed at full resolution, in windows large enough
+            to contain their nearest edges.
+
+        :param edge_image: The binary edge image
+        :param executor: Optional thread pool for the windows of (B)
+        :return: The maximum distance, as in create_distances(edge_image).max()
+        """
+        k = self._coarse_factor
+        height, width = edge_image.shape
+        n_rows, n_columns = -(-height // k), -(-width // k)
+        padded_edges = np.zeros((n_rows * k, n_columns * k), dtype=bool)
+        padded_edges[:height, :width] = edge_image > 0
+        coarse_edges = padded_edges.reshape(n_rows, k, n_columns, k).any(axis=(1, 3))
+        if not np.any(coarse_edges):
+            return float(self.create_distances(edge_image).max())
+
+        coarse_distances = self.create_distances(coarse_edges.astype(np.uint8) * 255)
+        block_error = 2 * (k - 1)
+        upper_bound = k * float(coarse_distances.max()) + block_error
+        candidates = (k * coarse_distances + block_error >= upper_bound - 2 * block_error).astype(np.uint8)
 
-        fitness_map = np.log1p(fitness_map) / self._log_div
-        fitness_map[fitness_map > 1.0] = 1.0
-        return 1-fitness_map
+        margin = int(math.ceil(upper_bound * self._MASK_SLACK)) + 1
+        _, _, regions, _ = cv.connectedComponentsWithStats(candidates, connectivity=8)
+        windows = [_window(x * k, y * k, min((x + w) * k, width), min((y + h) * k, height), margin, width, height)
+                   for x, y, w, h, _ in regions[1:]]
+        if sum((wx1 - wx0) * (wy1 - wy0) for _, (wx0, wy0, wx1, wy1) in windows) > height * width:
+            return float(self.create_distances(edge_image).max())
+
+        def window_max(window):
+            (x0, y0, x1, y1), (wx0, wy0, wx1, wy1) = window
+            distances = self.create_distances(edge_image[wy0:wy1, wx0:wx1])
+            return float(distances[y0 - wy0:y1 - wy0, x0 - wx0:x1 - wx0].max())
+
+        return max(map(window_max, windows) if executor is None else executor.map(window_max, windows))
+
+    def _create_fitness_tiled(self, edge_image: np.array, executor: ThreadPoolExecutor) -> np.array:
+        height, width = edge_image.shape
+        max_distance = self.max_distance(edge_image, executor)
+        margin = self.influence_radius(max_distance)
+        fitness_map = np.empty((height, width), dtype=np.float32)
+
+        def transform_tile(tile):
+            (x0, y0, x1, y1), (wx0, wy0, wx1, wy1) = tile
+            distances = self.create_distances(edge_image[wy0:wy1, wx0:wx1])
+            tile_map = fitness_map[y0:y1, x0:x1]
+            tile_map[:] = distances[y0 - wy0:y1 - wy0, x0 - wx0:x1 - wx0]
+            self._fitness_from_distances_inplace(tile_map, max_distance)
+
+        tiles = [_window(x0, y0, min(x0 + self._tile_size, width), min(y0 + self._tile_size, height), margin,
+                         width, height)
+                 for y0 in range(0, height, self._tile_size) for x0 in range(0, width, self._tile_size)]
+        for _ in executor.map(transform_tile, tiles):
+            pass
+        return fitness_map
 
     def printable_identifier(self):
         return "DistanceMap"
 
+    def result_identifier(self) -> str:
+        # Tiles and workers do not change the fitness map
+        distance_type = {cv.DIST_L1: "L1", cv.DIST_L2: "L2"}.get(self._distance_type, self._distance_type)
+        return "{}(type={}, log_div={})".format(self.printable_identifier(), distance_type, self._log_div)
+
+
+def _window(x0: int, y0: int, x1: int, y1: int, margin: int, width: int, height: int):
+    return (x0, y0, x1, y1), (max(x0 - margin, 0), max(y0 - margin, 0), min(x1 + margin, width),
+                              min(y1 + margin, height))
+
 
 class DistanceMapWithPunishment(DistanceMap):
 
-    def create_fitness(self, edge_image: np.array) -> np.array:
-        fitness_map = super().create_fitness(edge_image)
-        fitness_map = (2 * fitness_map) - 1
+    def _fitness_from_distances_inplace(self, distances: np.array, max_distance: float) -> np.array:
+        fitness_map = super()._fitness_from_distances_inplace(distances, max_distance)
+        np.multiply(fitness_map, 2, out=fitness_map)
+        np.subtract(fitness_map, 1, out=fitness_map)
         return fitness_map
 
     def printable_identifier(self):
         return "DistanceMapWithPunishment"
+
+
+class MultiFrameFitness(FitnessStrategy):
+    """
+    Creates one fitness map from a stack of edge images of a static camera, e.g. video frames in which players occlude
+    different parts of the lines. Every frame is transformed with the frame strategy, the maps are combined by
+
+    (A) "median": the per pixel median of all frame maps. Lines missing in a few frames are kept, clutter which is only
+        present in a few frames is removed
+    (B) "max": the per pixel maximum, i.e. the union of all edges
+    (C) "stack": no combination. The map is stacked (height x width x n_frames), scorers project a camera once, look up
+        every covered pixel in all frames and combine the per frame scores with aggregate_frame_scores, a trimmed mean
+    """
+    AGGREGATIONS = ("median", "max", "stack")
+
+    def __init__(self, frame_strategy: FitnessStrategy, aggregation: str = "median", trim: float = 0.25) -> None:
+        """
+        :param frame_strategy: The fitness strategy of a single frame, e.g. DistanceMap
+        :param aggregation: One of MultiFrameFitness.AGGREGATIONS
+        :param trim: The fraction of the lowest and of the highest frame scores, which are ignored by the trimmed
+            mean of stacked maps
+        """
+        super().__init__()
+        if aggregation not in MultiFrameFitness.AGGREGATIONS:
+            raise ValueError("Unknown aggregation '{}', use one of {}".format(aggregation,
+                                                                             MultiFrameFitness.AGGREGATIONS))
+        if not 0 <= trim < 0.5:
+            raise ValueError("The trim fraction must be in [0, 0.5)")
+        if aggregation == "stack" and frame_strategy.orientation_bins is not None:
+            raise ValueError("Oriented fitness maps can not be stacked, use the median or max aggregation")
+        self._frame_strategy = frame_strategy
+        self._aggregation = aggregation
+        self._trim = trim
+
+    def create_fitness(self, edge_image: np.array) -> np.array:
+        """
+        :param edge_image: A stack of binary edge images (n_frames x height x width) or a single edge image
+        :return: The combined fitness map (height x width) or the stacked map (height x width x n_frames)
+        """
+        edge_images = np.asarray(edge_image)
+        if edge_images.ndim == 2:
+            edge_images = edge_images[np.newaxis]
+        height, width = edge_images.shape[1:]
+        if self._aggregation == "stack":
+            fitness_map = np.empty((height, width, len(edge_images)), dtype=np.float32)
+            for i, frame in enumerate(edge_images):
+                fitness_map[:, :, i] = self._frame_strategy.create_fitness(frame)
+            return fitness_map
+
+        frame_maps = None
+        for i, frame in enumerate(edge_images):
+            frame_map = self._frame_strategy.create_fitness(frame)
+            if frame_maps is None:
+                frame_maps = np.empty((len(edge_images),) + frame_map.shape, dtype=np.float32)
+            frame_maps[i] = frame_map
+        if self._aggregation == "max":
+            return frame_maps.max(axis=0)
+        return np.median(frame_maps, axis=0).astype(np.float32)
+
+    def aggregate_frame_scores(self, frame_scores: np.array) -> np.array:
+        frame_scores = np.sort(frame_scores, axis=-1)
+        n_trimmed = int(self._trim * frame_scores.shape[-1])
+        return np.mean(frame_scores[..., n_trimmed:frame_scores.shape[-1] - n_trimmed], axis=-1)
+
+    @property
+    def orientation_bins(self) -> Optional[int]:
+        return self._frame_strategy.orientation_bins
+
+    def printable_identifier(self):
+        return "MultiFrameFitness({}, {})".format(self._frame_strategy.printable_identifier(), self._aggregation)
+
+    def result_identifier(self) -> str:
+        return "MultiFrameFitness({}, {}, trim={})".format(self._frame_strategy.result_identifier(), self._aggregation,
+                                                           self._trim)
+
+
+class OrientedDistanceMap(FitnessStrategy):
+    """
+    A distance map per line orientation: the edge pixels are split into orientation bins (by the structure tensor of
+    the edge image) and every bin gets its own fitness map, created with the distance map strategy. Every edge pixel
+    also belongs to the neighbouring bins it is close to, which tolerates small orientation errors.
+
+    Scorers look up every projected segment only in the channel of its own direction (see PopulationScorer). Lines
+    crossing a projected segment do not attract it, which removes false optima on courts with dense markings.
+
+    The fitness map is height x width x n_bins, all channels are normalized by the maximum distance of the whole edge
+    image. Bins without edges get the lowest fitness.
+    """
+    def __init__(self, distance_map: DistanceMap, n_bins: int = 4, overlap: float = 0.75, window: int = 7) -> None:
+        """
+        :param distance_map: The strategy creating the fitness of every bin, e.g. DistanceMapWithPunishment
+        :param n_bins: The number of orientation bins over 180 degrees
+        :param overlap: An edge pixel belongs to every bin, whose center is within overlap bin widths of its
+            orientation. Values above 0.5 assign pixels near bin borders to both bins
+        :param window: The size of the window, over which the orientation of edge pixels is estimated
+        """
+        super().__init__()
+        if n_bins < 2:
+            raise ValueError("At least two orientation bins are required")
+        self._distance_map = distance_map
+        self._n_bins = n_bins
+        self._overlap = overlap
+        self._window = window
+
+    @property
+    def orientation_bins(self) -> Optional[int]:
+        return self._n_bins
+
+    def edge_orientations(self, edge_image: np.array) -> np.array:
+        """
+        :return: The line angle at every pixel in [0, pi) (x to the right, y downwards), from the dominant gradient
+            direction of the structure tensor
+        """
+        edges = (edge_image > 0).astype(np.float32)
+        gx = cv.Sobel(edges, cv.CV_32F, 1, 0, ksize=3)
+        gy = cv.Sobel(edges, cv.CV_32F, 0, 1, ksize=3)
+        window = (self._window, self._window)
+        jxx = cv.GaussianBlur(gx * gx, window, 0)
+        jyy = cv.GaussianBlur(gy * gy, window, 0)
+        jxy = cv.GaussianBlur(gx * gy, window, 0)
+        # Lines are perpendicular to the gradient
+        return np.mod(0.5 * np.arctan2(2 * jxy, jxx - jyy) + np.pi / 2, np.pi)
+
+    def create_fitness(self, edge_image: np.array) -> np.array:
+        height, width = edge_image.shape
+        edges = edge_image > 0
+        max_distance = float(self._distance_map.create_distances(edge_image).max())
+        fitness_map = np.empty((height, width, self._n_bins), dtype=np.float32)
+        if not np.any(edges):
+            fitness_map[:] = self._distance_map.fitness_from_distances(np.float32([max_distance]), max_distance)
+            return fitness_map
+
+        orientations = self.edge_orientations(edge_image)[edges]
+        bin_width = np.pi / self._n_bins
+        bin_edges = np.zeros((height, width), dtype=np.uint8)
+        for b in range(self._n_bins):
+            # Circular distance of the orientations to the bin center
+            offsets = np.abs(np.mod(orientations - b * bin_width + np.pi / 2, np.pi) - np.pi / 2)
+            bin_edges[edges] = np.where(offsets <= self._overlap * bin_width, 255, 0)
+            if np.any(bin_edges):
+                distances = self._distance_map.create_distances(bin_edges)
+            else:
+                distances = np.full((height, width), max_distance, dtype=np.float32)
+            np.minimum(distances, max_distance, out=distances)
+            fitness_map[:, :, b] = self._distance_map.fitness_from_distances(distances, max_distance)
+        return fitness_map
+
+    def printable_identifier(self):
+        return "OrientedDistanceMap({}, n={})".format(self._distance_map.printable_identifier(), self._n_bins)
+
+    def result_identifier(self) -> str:
+        return "OrientedDistanceMap({}, n={}, overlap={}, window={})".format(
+            self._distance_map.result_identifier(), self._n_bins, self._overlap, self._window)
@@ -1,34 +1,48 @@
+from typing import Optional
+
 import numpy as np
 
 from evolution.base.base_genome_factory import BaseGenomeFactory
-from evolution.base.base_strategies import PopulateStrategy
+from evolution.base.base_strategies import PopulateStrategy, array_digest
 
 
 class BoundedUniformPopulation(PopulateStrategy):
-    def __init__(self, population_size: int = 16)  -> None:
+    def __init__(self, population_size: int = 16) -> None:
         super().__init__()
         self.population_size = population_size
 
     def populate(self, genome_factory: BaseGenomeFactory, start_dna: np.array):
         lower_bounds, upper_bounds = genome_factory.genome_bounds
-        return [genome_factory.create(np.random.uniform(lower_bounds, upper_bounds)) for _ in range(self.population_size)]
+        return [genome_factory.create(np.random.uniform(lower_bounds, upper_bounds))
+                for _ in range(self.population_size)]
 
     def printable_identifier(self):
         return "BoundedUniformPopulation(n={})".format(self.population_size)
 
 
 class ValueUniformPopulation(PopulateStrategy):
-    def __init__(self, population_size: int = 16) -> None:
+    # Lower and upper offsets of the uniform noise around the start dna (full camera dna)
+    _random_range = np.array(
+        [[-100, -100, -10, -10, -0.1, -0.1, -0.50, np.deg2rad(-1), np.deg2rad(-1), np.deg2rad(-1), -0, -0, -0, -0, -0],
+         [+100, +100, +10, +10, +0.1, +0.1, +0.50, np.deg2rad(+1), np.deg2rad(+1), np.deg2rad(+1), +0, +0, +0, +0, +0]])
+
+    def __init__(self, population_size: int = 16, random_range: Optional[np.array] = None) -> None:
+        """
+        :param population_size: The population size
+        :param random_range: Optional 2 x n lower and upper offsets of the uniform noise around the start dna (full
+            dna), e.g. +- the half widths of a LandscapeReport. Defaults to the range for the 15 camera genes
+        """
         super().__init__()
         self.population_size = population_size
+        self.random_range = self._random_range if random_range is None else np.asarray(random_range, dtype=np.float64)
 
     def populate(self, genome_factory: BaseGenomeFactory, start_dna: np.array):
-        _random_range = np.array(
-        [[-100, -100, -10, -10, -0.1, -0.1, -0.50, np.deg2rad(-1), np.deg2rad(-1), np.deg2rad(-1), -0, -0, -0, -0, -0],
-         [+100, +100, +10, +10, +0.1, +0.1, +0.50, np.deg2rad(+1), np.deg2rad(+1), np.deg2rad(+1), +0, +0, +0, +0, +0]])
-
-        return [genome_factory.create(start_dna + np.random.uniform(_random_range[0], _random_range[1]))
+        random_range = genome_factory.reduce_dna(self.random_range)
+        return [genome_factory.create(start_dna + np.random.uniform(random_range[0], random_range[1]))
                 for _ in range(self.population_size)]
 
     def printable_identifier(self):
         return "ValueUniformPopulation(n={})".format(self.population_size)
+
+    def result_identifier(self) -> str:
+        return "ValueUniformPopulation(n={}, range={})".format(self.population_size, array_digest(self.random_range))
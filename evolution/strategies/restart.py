@@ -0,0 +1,91 @@
+from typing import List, Optional
+
+import numpy as np
+
+from evolution.base.base_genome import BaseGenome
+from evolution.base.base_genome_factory import BaseGenomeFactory
+from evolution.base.base_strategies import RestartStrategy, TerminationStrategy, Population
+
+
+class IPOPRestart(RestartStrategy):
+    def __init__(self,
+                 trigger: TerminationStrategy,
+                 population_factor: float = 2.0,
+                 spread: Optional[float] = 0.05,
+                 evaluation_budget: Optional[int] = None,
+                 max_restarts: Optional[int] = None) -> None:
+        """
+        Restarts the evolution with an enlarged population whenever the trigger fires (IPOP style), e.g. if the
+        population collapsed (DiversityCollapse) or stagnates (NoImprovement with min_delta).
+
+        The new population contains the best genome so far. All other genomes are sampled uniformly around the best
+        genome within +- spread times the width of the genome bounds, or from the whole bounds if spread is None.
+
+        :param trigger: The termination strategy, which triggers a restart instead of terminating the run
+        :param population_factor: Factor by which the population grows with every restart
+        :param spread: The sampling range around the best genome as a fraction of the bounds, None for fresh samples
+        :param evaluation_budget: Optional number of fitness evaluations per run (all restarts included). The run
+            stops when it is spent and no restart is started which would exceed it
+        :param max_restarts: Optional maximum number of restarts
+        """
+        super().__init__()
+        self._trigger = trigger
+        self._population_factor = population_factor
+        self._spread = spread
+        self._evaluation_budget = evaluation_budget
+        self._max_restarts = max_restarts
+        self._population_size = None
+        self.n_restarts = 0
+
+    def observe_population(self, population: Population, population_fitness: List[float],
+                           genome_bounds: np.array) -> None:
+        self._population_size = len(population)
+        self._trigger.observe_population(population, population_fitness, genome_bounds)
+
+    def should_restart(self, current_generation: int, best_fitness: float, n_evaluations: int) -> bool:
+        if not self._trigger.should_terminate(current_generation, best_fitness):
+            return False
+        if self._max_restarts is not None and self.n_restarts >= self._max_restarts:
+            return False
+        if self._evaluation_budget is not None and \
+                n_evaluations + self._next_population_size() > self._evaluation_budget:
+            return False
+        return True
+
+    def restart(self, genome_factory: BaseGenomeFactory, best_genome: BaseGenome) -> Population:
+        self.n_restarts += 1
+        self._trigger.reset()
+
+        lower_bounds, upper_bounds = genome_factory.genome_bounds
+        if self._spread is None:
+            low, high = lower_bounds, upper_bounds
+        else:
+            half_range = self._spread * (upper_bounds - lower_bounds)
+            low, high = best_genome.dna - half_range, best_genome.dna + half_range
+
+        population = [genome_factory.create(best_genome.dna.copy())]
+        for _ in range(self._next_population_size() - 1):
+            genome = genome_factory.create(np.random.uniform(low, high))
+            genome_factory.validate_bounds(genome, genome_factory.genome_bounds)
+            population.append(genome)
+        return population
+
+    def budget_exhausted(self, n_evaluations: int) -> bool:
+        return self._evaluation_budget is not None and n_evaluations > self._evaluation_budget
+
+    def reset(self) -> None:
+        self._trigger.reset()
+
+    def start_run(self) -> None:
+        self._trigger.reset()
+        self._population_size = None
+        self.n_restarts = 0
+
+    def _next_population_size(self) -> int:
+        # Even population sizes keep the number of elites and offspring consistent
+        size = int(round(self._population_size * self._population_factor))
+        return max(size + size % 2, 4)
+
+    def printable_identifier(self):
+        return "IPOPRestart({},f={},s={})".format(self._trigger.printable_identifier(), self._population_factor,
+                                                   self._spread)
@@ -9,7 +9,11 @@ from evolution.base.base_strategies import SelectionStrategy, Population
 class RouletteWheel(SelectionStrategy):
     def select(self, population: Population, population_fitness: List[float]) -> Tuple[BaseGenome, BaseGenome]:
         pf = np.array(population_fitness)
-        pf = (pf - np.min(pf)) + 1e-3
+        finite = np.isfinite(pf)
+        if not finite.any():
+            return choices(population, k=2)
+        # Genomes with a non-finite fitness (e.g. culled cameras) are never selected
+        pf = np.where(finite, (pf - np.min(pf[finite])) + 1e-3, 0)
         return choices(population, weights=pf, k=2)
 
     def printable_identifier(self):
@@ -21,6 +25,7 @@ class Tournament(SelectionStrategy):
     def __init__(self, tournament_size, p=0.5) -> None:
         super().__init__()
         self._k = tournament_size
+        self._p = p
         a = np.arange(tournament_size)
         self.probabilities = p * ((1-p)**a)
 
@@ -32,6 +37,9 @@ class Tournament(SelectionStrategy):
     def printable_identifier(self):
         return "Tournament(k={})".format(self._k)
 
+    def result_identifier(self) -> str:
+        return "Tournament(k={}, p={})".format(self._k, self._p)
+
 
 class Random(Tournament):
     def __init__(self) -> None:
@@ -51,6 +51,19 @@ class StrategyBundle:
                          self._mutation_strategy.printable_identifier(),
                          self._termination_strategy.printable_identifier()])
 
+    @property
+    def identifier(self) -> str:
+        """
+        The result identifiers of all strategies (see Strategy.result_identifier). Bundles with equal identifiers
+        produce equal runs for equal inputs and seeds
+        """
+        return ",".join([self._populate_strategy.result_identifier(),
+                         self._fitness_strategy.result_identifier(),
+                         self._selection_strategy.result_identifier(),
+                         self._crossover_strategy.result_identifier(),
+                         self._mutation_strategy.result_identifier(),
+                         self._termination_strategy.result_identifier()])
+
     @property
     def name_identifier(self):
         return "{}_{}_{}_{}_{}_{}".format(self._populate_strategy.printable_identifier(),
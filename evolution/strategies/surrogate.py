@@ -0,0 +1,101 @@
+from typing import Optional
+
+import numpy as np
+
+from evolution.base.base_strategies import SurrogateModel
+
+
+class _SampleArchive(SurrogateModel):
+    def __init__(self, max_samples: Optional[int]) -> None:
+        super().__init__()
+        self._max_samples = max_samples
+        self._dna = None
+        self._fitness = None
+
+    def update(self, normalized_dna: np.array, fitness: np.array) -> None:
+        normalized_dna = np.atleast_2d(normalized_dna)
+        fitness = np.asarray(fitness, dtype=np.float64)
+        if self._dna is None:
+            self._dna, self._fitness = normalized_dna.copy(), fitness.copy()
+        else:
+            self._dna = np.vstack((self._dna, normalized_dna))
+            self._fitness = np.concatenate((self._fitness, fitness))
+        if self._max_samples is not None and len(self._fitness) > self._max_samples:
+            # Keep the most recent samples, they describe the region the population currently explores
+            self._dna, self._fitness = self._dna[-self._max_samples:], self._fitness[-self._max_samples:]
+
+    def reset(self) -> None:
+        self._dna = None
+        self._fitness = None
+
+    @property
+    def n_samples(self) -> int:
+        return 0 if self._fitness is None else len(self._fitness)
+
+
+def _squared_distances(a: np.array, b: np.array) -> np.array:
+    return np.maximum(np.sum(a ** 2, axis=1)[:, None] + np.sum(b ** 2, axis=1)[None, :] - 2 * a @ b.T, 0)
+
+
+class KNearestNeighbours(_SampleArchive):
+    def __init__(self, k: int = 5, max_samples: Optional[int] = 20000) -> None:
+        """
+        Predicts the inverse distance weighted mean fitness of the k nearest evaluated samples.
+        :param k: The number of neighbours
+        :param max_samples: Only the most recent max_samples samples are kept, None keeps all
+        """
+        super().__init__(max_samples)
+        self._k = k
+
+    def predict(self, normalized_dna: np.array) -> np.array:
+        normalized_dna = np.atleast_2d(normalized_dna)
+        k = min(self._k, self.n_samples)
+        distances = np.sqrt(_squared_distances(normalized_dna, self._dna))
+        neighbours = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        neighbour_distances = np.take_along_axis(distances, neighbours, axis=1)
+        weights = 1.0 / (neighbour_distances + 1e-12)
+        return np.sum(weights * self._fitness[neighbours], axis=1) / np.sum(weights, axis=1)
+
+    def printable_identifier(self):
+        return "KNearestNeighbours(k={})".format(self._k)
+
+
+class RadialBasis(_SampleArchive):
+    def __init__(self, max_samples: int = 500, regularization: float = 1e-6) -> None:
+        """
+        Gaussian radial basis function interpolation of the most recent samples. The kernel width is the median
+        distance between the samples. The interpolation is fitted lazily, by the first prediction after an update.
+        :param max_samples: The number of samples (rbf centers), the fit costs max_samples^3
+        :param regularization: Ridge regularization, keeps the fit stable for (nearly) duplicate samples
+        """
+        super().__init__(max_samples)
+        self._regularization = regularization
+        self._weights = None
+        self._mean = 0.0
+        self._width = 1.0
+
+    def update(self, normalized_dna: np.array, fitness: np.array) -> None:
+        super().update(normalized_dna, fitness)
+        self._weights = None
+
+    def reset(self) -> None:
+        super().reset()
+        self._weights = None
+
+    def _fit(self) -> None:
+        squared_distances = _squared_distances(self._dna, self._dna)
+        median = np.median(squared_distances[squared_distances > 0]) if np.any(squared_distances > 0) else 1.0
+        self._width = median
+        self._mean = np.mean(self._fitness)
+        kernel = np.exp(-squared_distances / self._width)
+        kernel[np.diag_indices_from(kernel)] += self._regularization
+        self._weights = np.linalg.lstsq(kernel, self._fitness - self._mean, rcond=None)[0]
+
+    def predict(self, normalized_dna: np.array) -> np.array:
+        if self._weights is None:
+            self._fit()
+        kernel = np.exp(-_squared_distances(np.atleast_2d(normalized_dna), self._dna) / self._width)
+        return self._mean + kernel @ self._weights
+
+    def printable_identifier(self):
+        return "RadialBasis(n={})".format(self._max_samples)
@@ -1,6 +1,9 @@
+from typing import List
+
 import numpy as np
 
-from evolution.base.base_strategies import TerminationStrategy
+from evolution.base.base_strategies import TerminationStrategy, Population
+from evolution.strategies.diversity import population_diversity
 
 
 class MaxIteration(TerminationStrategy):
@@ -28,6 +31,22 @@ class Or(TerminationStrategy):
                 return True
         return False
 
+    def observe_population(self, population: Population, population_fitness: List[float],
+                           genome_bounds: np.array) -> None:
+        for strategy in self._strategies:
+            strategy.observe_population(population, population_fitness, genome_bounds)
+
+    def observe_progress(self, n_evaluations: int, elapsed_time: float) -> None:
+        for strategy in self._strategies:
+            strategy.observe_progress(n_evaluations, elapsed_time)
+
+    def should_interrupt(self) -> bool:
+        return any(strategy.should_interrupt() for strategy in self._strategies)
+
+    def reset(self) -> None:
+        for strategy in self._strategies:
+            strategy.reset()
+
     def printable_identifier(self):
         pi = "|".join([s.printable_identifier() for s in self._strategies])
         return "[" + pi + "]"
@@ -44,20 +63,42 @@ class And(TerminationStrategy):
                 return False
         return True
 
+    def observe_population(self, population: Population, population_fitness: List[float],
+                           genome_bounds: np.array) -> None:
+        for strategy in self._strategies:
+            strategy.observe_population(population, population_fitness, genome_bounds)
+
+    def observe_progress(self, n_evaluations: int, elapsed_time: float) -> None:
+        for strategy in self._strategies:
+            strategy.observe_progress(n_evaluations, elapsed_time)
+
+    def should_interrupt(self) -> bool:
+        return all(strategy.should_interrupt() for strategy in self._strategies)
+
+    def reset(self) -> None:
+        for strategy in self._strategies:
+            strategy.reset()
+
     def printable_identifier(self):
         pi = "&".join([s.printable_identifier() for s in self._strategies])
         return "[" + pi + "]"
 
 
 class NoImprovement(TerminationStrategy):
-    def __init__(self, n_generations_without_improvement: int) -> None:
+    def __init__(self, n_generations_without_improvement: int, min_delta: float = 0.0) -> None:
+        """
+        Terminates after n generations without improvement of the best fitness.
+        :param n_generations_without_improvement: The number of generations
+        :param min_delta: Improvements up to min_delta are considered as no improvement
+        """
         super().__init__()
         self._best_fitness = -np.inf
         self._n_generations_without_improvement = n_generations_without_improvement
+        self._min_delta = min_delta
         self._counter = 0
 
     def should_terminate(self, current_generation: int, best_fitness: float) -> bool:
-        if best_fitness == self._best_fitness:
+        if best_fitness <= self._best_fitness + self._min_delta:
             self._counter += 1
         else:
             self._best_fitness = best_fitness
@@ -65,7 +106,13 @@ class NoImprovement(TerminationStrategy):
 
         return self._counter >= self._n_generations_without_improvement
 
+    def reset(self) -> None:
+        self._best_fitness = -np.inf
+        self._counter = 0
+
     def printable_identifier(self):
+        if self._min_delta:
+            return "NoImprovement(n={},d={})".format(self._n_generations_without_improvement, self._min_delta)
         return "NoImprovement(n={})".format(self._n_generations_without_improvement)
 
 
@@ -79,3 +126,81 @@ class FitnessReached(TerminationStrategy):
 
     def printable_identifier(self):
         return "FitnessReached(n={})".format(self._needed_fitness)
+
+
+class DiversityCollapse(TerminationStrategy):
+    def __init__(self, min_diversity: float, n_generations: int = 1) -> None:
+        """
+        Terminates if the population's diversity (see population_diversity) stays below min_diversity for
+        n_generations generations, i.e. if the population collapsed onto a single (local) optimum.
+        :param min_diversity: The diversity threshold, a fraction of the genome bounds
+        :param n_generations: The number of consecutive collapsed generations
+        """
+        super().__init__()
+        self._min_diversity = min_diversity
+        self._n_generations = n_generations
+        self._counter = 0
+        self.diversity = np.inf
+
+    def observe_population(self, population: Population, population_fitness: List[float],
+                           genome_bounds: np.array) -> None:
+        self.diversity = population_diversity(population, genome_bounds)
+        self._counter = self._counter + 1 if self.diversity < self._min_diversity else 0
+
+    def should_terminate(self, current_generation: int, best_fitness: float) -> bool:
+        return self._counter >= self._n_generations
+
+    def reset(self) -> None:
+        self._counter = 0
+        self.diversity = np.inf
+
+    def printable_identifier(self):
+        return "DiversityCollapse(d={},n={})".format(self._min_diversity, self._n_generations)
+
+
+class WallClockDeadline(TerminationStrategy):
+    def __init__(self, seconds: float) -> None:
+        """
+        Terminates once the run took longer than the given time. If the algorithm evaluates populations in chunks,
+        the current generation is interrupted as well, so the deadline is only exceeded by a single chunk.
+        :param seconds: The time budget of the run in seconds
+        """
+        super().__init__()
+        self._seconds = seconds
+        self._elapsed_time = 0.0
+
+    def observe_progress(self, n_evaluations: int, elapsed_time: float) -> None:
+        self._elapsed_time = elapsed_time
+
+    def should_terminate(self, current_generation: int, best_fitness: float) -> bool:
+        return self._elapsed_time >= self._seconds
+
+    def should_interrupt(self) -> bool:
+        return self._elapsed_time >= self._seconds
+
+    def printable_identifier(self):
+        return "WallClockDeadline(s={})".format(self._seconds)
+
+
+class MaxEvaluations(TerminationStrategy):
+    def __init__(self, max_evaluations: int) -> None:
+        """
+        Terminates once the run performed the given number of fitness evaluations. If the algorithm evaluates
+        populations in chunks, the current generation is interrupted as well.
+        :param max_evaluations: The evaluation budget of the run
+        """
+        super().__init__()
+        self._max_evaluations = max_evaluations
+        self._n_evaluations = 0
+
+    def observe_progress(self, n_evaluations: int, elapsed_time: float) -> None:
+        self._n_evaluations = n_evaluations
+
+    def should_terminate(self, current_generation: int, best_fitness: float) -> bool:
+        return self._n_evaluations >= self._max_evaluations
+
+    def should_interrupt(self) -> bool:
+        return self._n_evaluations >= self._max_evaluations
+
+    def printable_identifier(self):
+        return "MaxEvaluations(n={})".format(self._max_evaluations)
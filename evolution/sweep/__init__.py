@@ -0,0 +1,8 @@
+from .strategy_grid import StrategyGrid, BundleSpec
+from .strategy_spec import StrategySpec
+from .sweep_report import SweepReport, RunRecord
+from .sweep_runner import SweepRunner
+from .run_archive import RunArchive, run_dtype, hash_key
+
+__all__ = ["StrategyGrid", "BundleSpec", "StrategySpec", "SweepReport", "RunRecord", "SweepRunner", "RunArchive",
+           "run_dtype", "hash_key"]
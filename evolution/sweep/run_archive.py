@@ -0,0 +1,303 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import List, Optional, Dict, Tuple
+
+import numpy as np
+
+from evolution.base.base_result import BaseResult
+from evolution.strategies.strategy_bundle import StrategyBundle
+from evolution.sweep.sweep_report import RunRecord, SweepReport
+
+ARCHIVE_VERSION = 1
+
+
+def hash_key(value: str) -> int:
+    """
+    The 64 bit key of a string in the archive: the first 16 hex digits of a sha1 hash (see image_hash,
+    geometry_hash), or of the sha1 hash of other strings, e.g. bundle identifiers
+    """
+    if len(value) < 16 or any(c not in "0123456789abcdef" for c in value):
+        value = hashlib.sha1(value.encode()).hexdigest()
+    return int(value[:16], 16)
+
+
+def run_dtype(dna_length: int) -> np.dtype:
+    """
+    :return: The record layout of a single run in the runs file (packed, little endian)
+    """
+    return np.dtype([("bundle_key", "<u8"), ("seed", "<i8"), ("image_key", "<u8"), ("geometry_key", "<u8"),
+                     ("n_generations", "<i8"), ("converged_generation", "<i8"), ("n_evaluations", "<i8"),
+                     ("best_fitness", "<f8"), ("reprojection_error", "<f8"), ("wall_time", "<f8"),
+                     ("created", "<f8"), ("history_offset", "<i8"), ("history_length", "<i8"),
+                     ("best_dna", "<f8", (dna_length,))])
+
+
+class RunArchive:
+    """
+    An append-only, columnar archive of runs in a directory. Loading it does not parse anything, cross-run queries
+    are vectorized operations on memory-mapped arrays.
+
+    (A) runs.bin: one fixed size record per run (see run_dtype): the bundle, seed and input hash keys, the final
+        result and the position of its history in histories.bin
+    (B) histories.bin: the best fitness of every generation of every run (float64), run after run
+    (C) bundles.jsonl: the identifier of every distinct bundle (e.g. StrategyBundle.identifier) and its key
+    (D) archive.json: the format version and the dna length
+
+    Records are appended in bulk (one write per file and call), histories before runs. A run is only visible once
+    its record is complete, a partially written record (e.g. of a crashed process) is ignored. The archive supports
+    a single writing process, which may use it from several threads, and any number of reading processes.
+    """
+    def __init__(self, directory: str, dna_length: int = 15) -> None:
+        """
+        :param directory: The archive directory, created if it does not exist
+        :param dna_length: The length of the stored best dna. Ignored for existing archives
+        """
+        super().__init__()
+        self._directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        header_file = os.path.join(directory, "archive.json")
+        if os.path.exists(header_file):
+            with open(header_file) as file:
+                header = json.load(file)
+            if header["version"] != ARCHIVE_VERSION:
+                raise ValueError("Unsupported run archive version {}".format(header["version"]))
+            dna_length = header["dna_length"]
+        else:
+            with open(header_file, "w") as file:
+                json.dump({"version": ARCHIVE_VERSION, "dna_length": dna_length}, file)
+
+        self._dtype = run_dtype(dna_length)
+        self._runs_file = os.path.join(directory, "runs.bin")
+        self._histories_file = os.path.join(directory, "histories.bin")
+        self._bundles_file = os.path.join(directory, "bundles.jsonl")
+        for file_name in [self._runs_file, self._histories_file, self._bundles_file]:
+            open(file_name, "ab").close()
+
+        self._bundles = {}
+        with open(self._bundles_file) as file:
+            for line in file:
+                if line.endswith("\n"):
+                    key, identifier = json.loads(line)
+                    self._bundles[key] = identifier
+
+        self._runs = None
+        self._histories = None
+        self._index = None
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    def __len__(self):
+        return os.path.getsize(self._runs_file) // self._dtype.itemsize
+
+    @property
+    def runs(self) -> np.ndarray:
+        """
+        :return: All runs as a read only, memory-mapped structured array (columns see run_dtype)
+        """
+        with self._lock:
+            n_runs = len(self)
+            if self._runs is None or len(self._runs) != n_runs:
+                self._runs = self._map(self._runs_file, self._dtype, n_runs)
+                self._index = None
+            return self._runs
+
+    def _histories_map(self) -> np.ndarray:
+        with self._lock:
+            n_values = os.path.getsize(self._histories_file) // 8
+            if self._histories is None or len(self._histories) != n_values:
+                self._histories = self._map(self._histories_file, np.dtype("<f8"), n_values)
+            return self._histories
+
+    @staticmethod
+    def _map(file_name: str, dtype: np.dtype, length: int) -> np.ndarray:
+        # Empty files can not be mapped
+        if length == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(file_name, dtype=dtype, mode="r", shape=(length,))
+
+    def append(self, records: List[RunRecord], image_hash: str = "", geometry_hash: str = "") -> np.array:
+        """
+        Appends runs, e.g. the records of a SweepReport.
+        :param records: The run records. Their history is stored as well, if it is set
+        :param image_hash: The hash of the edge image of all runs (see image_hash), empty if unknown
+        :param geometry_hash: The hash of the geometry of all runs (see geometry_hash), empty if unknown
+        :return: The indices of the new runs
+        """
+        runs = np.zeros(len(records), dtype=self._dtype)
+        histories = [np.zeros(0) if record.history is None else np.asarray(record.history, dtype="<f8")
+                     for record in records]
+        image_key = hash_key(image_hash) if image_hash else 0
+        geometry_key = hash_key(geometry_hash) if geometry_hash else 0
+
+        new_bundles = {}
+        for run, record in zip(runs, records):
+            bundle_key = hash_key(record.bundle)
+            if bundle_key not in self._bundles:
+                new_bundles[bundle_key] = record.bundle
+            run["bundle_key"] = bundle_key
+            run["seed"] = record.seed
+            run["n_generations"] = record.n_generations
+            run["converged_generation"] = record.converged_generation
+            run["n_evaluations"] = record.n_evaluations
+            run["best_fitness"] = record.best_fitness
+            run["reprojection_error"] = record.reprojection_error
+            run["wall_time"] = record.wall_time
+            run["best_dna"] = record.best_dna
+        runs["image_key"] = image_key
+        runs["geometry_key"] = geometry_key
+        runs["created"] = time.time()
+        runs["history_length"] = [len(history) for history in histories]
+
+        # Partially written data of a crashed writer is dropped first, so that the new data is aligned
+        with self._lock:
+            if new_bundles:
+                with open(self._bundles_file, "rb+") as file:
+                    file.truncate(file.read().rfind(b"\n") + 1)
+                with open(self._bundles_file, "a") as file:
+                    file.write("".join(json.dumps([key, identifier]) + "\n"
+                                       for key, identifier in new_bundles.items()))
+                self._bundles.update(new_bundles)
+
+            # Histories first: a visible record always references a complete history
+            with open(self._histories_file, "ab") as file:
+                history_offset = file.tell() // 8
+                file.truncate(history_offset * 8)
+                if histories:
+                    np.concatenate(histories).tofile(file)
+            runs["history_offset"] = history_offset + np.concatenate([[0], np.cumsum(runs["history_length"])[:-1]])
+
+            with open(self._runs_file, "ab") as file:
+                first_run = file.tell() // self._dtype.itemsize
+                file.truncate(first_run * self._dtype.itemsize)
+                runs.tofile(file)
+        return np.arange(first_run, first_run + len(records))
+
+    def append_result(self, strategy_bundle: StrategyBundle, seed: int, result: BaseResult, n_evaluations: int = 0,
+                      wall_time: float = np.nan, reprojection_error: float = np.nan, image_hash: str = "",
+                      geometry_hash: str = "", bundle_identifier: Optional[str] = None) -> int:
+        """
+        Appends a single run of an algorithm.
+        :param bundle_identifier: The key of the bundle. Defaults to StrategyBundle.identifier, which contains all
+            strategy parameters. Pass BundleSpec.printable_identifier to share the keys of sweep runs
+        :return: The index of the new run
+        """
+        best_genome, best_fitness = result.best_genome
+        record = RunRecord(bundle=strategy_bundle.identifier if bundle_identifier is None else bundle_identifier,
+                           seed=seed,
+                           n_generations=result.n_generations,
+                           converged_generation=int(np.argmax(result.best_fitnesses)) if result.n_generations else 0,
+                           best_fitness=float(best_fitness),
+                           reprojection_error=reprojection_error,
+                           n_evaluations=n_evaluations,
+                           wall_time=wall_time,
+                           best_dna=best_genome.dna,
+                           history=np.asarray(result.best_fitnesses, dtype=np.float64))
+        return int(self.append([record], image_hash, geometry_hash)[0])
+
+    def bundle(self, run: int) -> str:
+        """
+        :return: The bundle identifier of a run
+        """
+        return self._bundles[int(self.runs["bundle_key"][run])]
+
+    @property
+    def bundles(self) -> List[str]:
+        return list(self._bundles.values())
+
+    def select(self, bundle: Optional[str] = None, seed: Optional[int] = None, image_hash: Optional[str] = None,
+               geometry_hash: Optional[str] = None) -> np.array:
+        """
+        :return: The indices of all runs matching the given keys (None matches everything)
+        """
+        runs = self.runs
+        mask = np.ones(len(runs), dtype=bool)
+        for column, value in [("bundle_key", bundle), ("image_key", image_hash), ("geometry_key", geometry_hash)]:
+            if value is not None:
+                mask &= runs[column] == np.uint64(hash_key(value))
+        if seed is not None:
+            mask &= runs["seed"] == seed
+        return np.flatnonzero(mask)
+
+    def find(self, bundle: str, seed: int, image_hash: str = "", geometry_hash: str = "") -> np.array:
+        """
+        Looks up the runs of exactly this bundle, seed and inputs in a hash index, which is built from the key
+        columns on the first lookup after new runs were appended.
+        :return: The indices of the matching runs, oldest first
+        """
+        runs = self.runs
+        with self._lock:
+            if self._index is None:
+                self._index = self._build_index(runs)
+            index = self._index
+        key = (hash_key(bundle), seed, hash_key(image_hash) if image_hash else 0,
+               hash_key(geometry_hash) if geometry_hash else 0)
+        return index.get(key, np.zeros(0, dtype=np.int64))
+
+    @staticmethod
+    def _build_index(runs: np.ndarray) -> Dict[Tuple[int, int, int, int], np.array]:
+        keys = np.zeros(len(runs), dtype=[("bundle_key", "<u8"), ("seed", "<i8"), ("image_key", "<u8"),
+                                          ("geometry_key", "<u8")])
+        for column in keys.dtype.names:
+            keys[column] = runs[column]
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        splits = np.cumsum(np.bincount(inverse.ravel(), minlength=len(unique_keys)))[:-1]
+        return {tuple(int(value) for value in key): rows
+                for key, rows in zip(unique_keys.tolist(), np.split(order, splits))}
+
+    def history(self, run: int) -> np.array:
+        """
+        :return: The best fitness of every generation of a run (memory-mapped)
+        """
+        offset, length = self.runs[["history_offset", "history_length"]][run].tolist()
+        return self._histories_map()[offset:offset + length]
+
+    def histories(self, runs: Optional[np.array] = None) -> np.array:
+        """
+        The histories of several runs as a single array, e.g. for plotting.
+        :param runs: The run indices, e.g. from select. Defaults to all runs
+        :return: A (n_runs, n_generations) array, shorter histories are padded with nan
+        """
+        runs = np.arange(len(self)) if runs is None else np.asarray(runs)
+        offsets = self.runs["history_offset"][runs]
+        lengths = self.runs["history_length"][runs]
+        n_generations = int(lengths.max()) if len(runs) else 0
+
+        generations = np.arange(n_generations)
+        valid = generations < lengths[:, None]
+        histories = np.full((len(runs), n_generations), np.nan)
+        histories[valid] = self._histories_map()[(offsets[:, None] + generations)[valid]]
+        return histories
+
+    def records(self, runs: Optional[np.array] = None, with_history: bool = False) -> List[RunRecord]:
+        """
+        :param runs: The run indices, e.g. from select. Defaults to all runs
+        :param with_history: If True, the records contain the (memory-mapped) histories
+        :return: The runs as run records
+        """
+        runs = np.arange(len(self)) if runs is None else np.asarray(runs)
+        selected = self.runs[runs]
+        return [RunRecord(bundle=self._bundles[int(run["bundle_key"])],
+                          seed=int(run["seed"]),
+                          n_generations=int(run["n_generations"]),
+                          converged_generation=int(run["converged_generation"]),
+                          best_fitness=float(run["best_fitness"]),
+                          reprojection_error=float(run["reprojection_error"]),
+                          n_evaluations=int(run["n_evaluations"]),
+                          wall_time=float(run["wall_time"]),
+                          best_dna=np.array(run["best_dna"]),
+                          history=self.history(i) if with_history else None)
+                for i, run in zip(runs, selected)]
+
+    def report(self, runs: Optional[np.array] = None) -> SweepReport:
+        """
+        :return: The sweep report of the runs (defaults to all runs)
+        """
+        return SweepReport(self.records(runs))
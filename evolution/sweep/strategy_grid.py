@@ -0,0 +1,65 @@
+import itertools
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from evolution.base.base_genome_parameters import BaseGenomeParameters
+from evolution.strategies.strategy_bundle import StrategyBundle
+from evolution.sweep.strategy_spec import StrategySpec
+
+
+class BundleSpec(NamedTuple):
+    """
+    The picklable counterpart of a StrategyBundle
+    """
+    populate: StrategySpec
+    fitness: StrategySpec
+    selection: StrategySpec
+    crossover: StrategySpec
+    mutation: StrategySpec
+    termination: StrategySpec
+
+    def build(self, genome_parameters: BaseGenomeParameters) -> StrategyBundle:
+        return StrategyBundle(*(spec.build(genome_parameters) for spec in self))
+
+    def printable_identifier(self):
+        return ",".join(spec.printable_identifier() for spec in self)
+
+
+class StrategyGrid:
+    """
+    The search space of a sweep: a list of candidate specs for every strategy slot of a StrategyBundle.
+    """
+    def __init__(self,
+                 populate: List[StrategySpec],
+                 fitness: List[StrategySpec],
+                 selection: List[StrategySpec],
+                 crossover: List[StrategySpec],
+                 mutation: List[StrategySpec],
+                 termination: List[StrategySpec]) -> None:
+        super().__init__()
+        self._slots = (populate, fitness, selection, crossover, mutation, termination)
+
+    def __len__(self):
+        return int(np.prod([len(slot) for slot in self._slots]))
+
+    def expand(self) -> List[BundleSpec]:
+        """
+        All combinations of the grid
+        :return: List of bundle specs
+        """
+        return [BundleSpec(*specs) for specs in itertools.product(*self._slots)]
+
+    def sample(self, n_bundles: int, seed: Optional[int] = None) -> List[BundleSpec]:
+        """
+        Draws n_bundles distinct combinations uniformly from the grid. Returns the whole grid if it is smaller.
+        :param n_bundles: The number of bundles
+        :param seed: Optional seed for reproducible samples
+        :return: List of bundle specs
+        """
+        rng = np.random.default_rng(seed)
+        n_bundles = min(n_bundles, len(self))
+        slot_sizes = [len(slot) for slot in self._slots]
+        flat_indices = rng.choice(len(self), n_bundles, replace=False)
+        return [BundleSpec(*(slot[i] for slot, i in zip(self._slots, np.unravel_index(flat_idx, slot_sizes))))
+                for flat_idx in flat_indices]
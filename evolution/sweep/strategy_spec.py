@@ -0,0 +1,52 @@
+import inspect
+import itertools
+from typing import List, Type
+
+from evolution.base.base_genome_parameters import BaseGenomeParameters
+from evolution.base.base_strategies import Strategy
+
+
+class StrategySpec:
+    """
+    A picklable recipe for a strategy: the strategy class and its keyword arguments.
+
+    Strategies may carry state between generations (e.g. NoImprovement), so every run needs fresh instances.
+    Specs are cheap to send to worker processes and build a new strategy on demand.
+    """
+    def __init__(self, strategy_class: Type[Strategy], **kwargs) -> None:
+        super().__init__()
+        self.strategy_class = strategy_class
+        self.kwargs = kwargs
+
+    @classmethod
+    def grid(cls, strategy_class: Type[Strategy], **kwargs_lists) -> List["StrategySpec"]:
+        """
+        Creates one spec for every combination of the given keyword argument lists.
+
+        StrategySpec.grid(Tournament, tournament_size=[2, 4]) -> [Tournament(2), Tournament(4)]
+
+        :param strategy_class: The strategy class
+        :param kwargs_lists: For every keyword argument, a list of values to try
+        :return: The list of specs
+        """
+        names = list(kwargs_lists.keys())
+        return [cls(strategy_class, **dict(zip(names, values)))
+                for values in itertools.product(*(kwargs_lists[n] for n in names))]
+
+    def build(self, genome_parameters: BaseGenomeParameters) -> Strategy:
+        """
+        Instantiates the strategy. If the strategy's constructor expects genome_parameters, they are passed along.
+        :param genome_parameters: The genome parameters of the current run
+        :return: A fresh strategy
+        """
+        kwargs = dict(self.kwargs)
+        if "genome_parameters" in inspect.signature(self.strategy_class.__init__).parameters:
+            kwargs["genome_parameters"] = genome_parameters
+        return self.strategy_class(**kwargs)
+
+    def printable_identifier(self):
+        arguments = ",".join("{}={}".format(k, v) for k, v in self.kwargs.items())
+        return "{}({})".format(self.strategy_class.__name__, arguments)
+
+    def __repr__(self):
+        return self.printable_identifier()
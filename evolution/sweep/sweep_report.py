@@ -0,0 +1,90 @@
+import csv
+from typing import List, NamedTuple, Dict, Optional
+
+import numpy as np
+
+
+class RunRecord(NamedTuple):
+    """
+    The outcome of a single run of a sweep
+    """
+    # The identifier of the bundle including all strategy parameters, see BundleSpec.printable_identifier
+    bundle: str
+    seed: int
+    n_generations: int
+    converged_generation: int
+    best_fitness: float
+    reprojection_error: float
+    n_evaluations: int
+    wall_time: float
+    best_dna: np.array
+    # The best fitness of every generation, kept for run archives (see RunArchive)
+    history: Optional[np.array] = None
+
+
+class SweepReport:
+    """
+    Collects the run records of a sweep and aggregates them per bundle.
+
+    Aggregated columns:
+    (A) convergence: the mean number of generations and the mean generation in which the final best fitness was found
+    (B) accuracy: mean / std of the best fitness and the mean reprojection error w.r.t. the reference camera (nan if
+        no reference camera was given)
+    (C) throughput: fitness evaluations per second of wall time
+    """
+    COLUMNS = ["bundle", "n_runs", "best_fitness_mean", "best_fitness_std", "reprojection_error_mean",
+               "reprojection_error_max", "n_generations_mean", "converged_generation_mean", "evaluations_per_second",
+               "wall_time_mean"]
+
+    def __init__(self, records: List[RunRecord]) -> None:
+        super().__init__()
+        self._records = records
+
+    @property
+    def records(self):
+        return self._records
+
+    def table(self) -> List[Dict]:
+        """
+        One row per bundle, sorted by mean best fitness (best first)
+        :return: List of dicts with the keys in SweepReport.COLUMNS
+        """
+        by_bundle = {}
+        for record in self._records:
+            by_bundle.setdefault(record.bundle, []).append(record)
+
+        rows = []
+        for bundle, records in by_bundle.items():
+            best_fitness = np.array([r.best_fitness for r in records])
+            errors = np.array([r.reprojection_error for r in records])
+            wall_time = np.array([r.wall_time for r in records])
+            rows.append({
+                "bundle": bundle,
+                "n_runs": len(records),
+                "best_fitness_mean": float(np.mean(best_fitness)),
+                "best_fitness_std": float(np.std(best_fitness)),
+                "reprojection_error_mean": float(np.mean(errors)),
+                "reprojection_error_max": float(np.max(errors)),
+                "n_generations_mean": float(np.mean([r.n_generations for r in records])),
+                "converged_generation_mean": float(np.mean([r.converged_generation for r in records])),
+                "evaluations_per_second": float(sum(r.n_evaluations for r in records) / max(wall_time.sum(), 1e-9)),
+                "wall_time_mean": float(np.mean(wall_time)),
+            })
+
+        return sorted(rows, key=lambda row: row["best_fitness_mean"], reverse=True)
+
+    def to_csv(self, csv_filename: str):
+        with open(csv_filename, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=SweepReport.COLUMNS)
+            writer.writeheader()
+            writer.writerows(self.table())
+
+    def __str__(self):
+        row_format = "{:10.2f} +-{:8.2f} | err {:8.3f}px | gen {:6.1f} (best @ {:6.1f}) | {:8.1f} eval/s | {}"
+        lines = []
+        for row in self.table():
+            lines.append(row_format.format(
+                row["best_fitness_mean"], row["best_fitness_std"], row["reprojection_error_mean"],
+                row["n_generations_mean"], row["converged_generation_mean"], row["evaluations_per_second"],
+                row["bundle"]))
+        return "\n".join(lines)
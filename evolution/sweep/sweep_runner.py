@@ -0,0 +1,148 @@
+import multiprocessing
+import random
+import time
+from multiprocessing.context import BaseContext
+from typing import List, Tuple, Optional, Dict, Union
+
+import numpy as np
+
+from evolution.camera.camera_algorithm import GeneticCameraAlgorithm
+from evolution.camera.camera_library import image_hash, geometry_hash
+from evolution.camera.camera_reprojection import reprojection_errors
+from evolution.camera.camera_workers import load_geometry, load_genome_parameters
+from evolution.camera.object_geometry import ObjGeometry
+from evolution.sweep.run_archive import RunArchive
+from evolution.sweep.strategy_grid import BundleSpec
+from evolution.sweep.sweep_report import RunRecord, SweepReport
+
+# Per worker process state, installed once by _initialize_worker
+_worker_state = {}
+
+
+def _initialize_worker(parameters_file: str, image_shape: Tuple[int, int], geometry_file: str,
+                       edge_image: np.array, fitness_maps: Dict[str, np.array], start_dna: np.array,
+                       reference_dna: Optional[np.array]):
+    # Already loaded, if the worker was started from a preloaded context (see worker_context)
+    _worker_state["genome_parameters"] = load_genome_parameters(parameters_file, image_shape)
+    _worker_state["geometry"] = load_geometry(geometry_file)
+    _worker_state["edge_image"] = edge_image
+    _worker_state["fitness_maps"] = fitness_maps
+    _worker_state["start_dna"] = start_dna
+    _worker_state["reference_dna"] = reference_dna
+
+
+def _reprojection_error(geometry: ObjGeometry, dna: np.array) -> float:
+    reference_dna = _worker_state["reference_dna"]
+    if reference_dna is None:
+        return np.nan
+    return float(reprojection_errors(reference_dna, dna, geometry.world_points).mean[0])
+
+
+def _run_task(task: Tuple[BundleSpec, int]) -> RunRecord:
+    bundle_spec, seed = task
+    np.random.seed(seed)
+    random.seed(seed)
+
+    genome_parameters = _worker_state["genome_parameters"]
+    geometry = _worker_state["geometry"]
+    fitness_map = _worker_state["fitness_maps"][bundle_spec.fitness.printable_identifier()]
+
+    strategy_bundle = bundle_spec.build(genome_parameters)
+    algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, _worker_state["edge_image"], geometry,
+                                       fitness_map=fitness_map)
+
+    start_time = time.perf_counter()
+    result = algorithm.run(_worker_state["start_dna"].copy())
+    wall_time = time.perf_counter() - start_time
+
+    best_genome, best_fitness = result.best_genome
+    return RunRecord(bundle=bundle_spec.printable_identifier(),
+                     seed=seed,
+                     n_generations=result.n_generations,
+                     converged_generation=int(np.argmax(result.best_fitnesses)),
+                     best_fitness=float(best_fitness),
+                     reprojection_error=_reprojection_error(geometry, best_genome.dna),
+                     n_evaluations=algorithm.n_evaluations,
+                     wall_time=wall_time,
+                     best_dna=best_genome.dna,
+                     history=np.asarray(result.best_fitnesses, dtype=np.float64))
+
+
+class SweepRunner:
+    """
+    Runs every bundle of a sweep for every seed on a pool of worker processes.
+
+    Each worker loads the genome parameters and the geometry once. Fitness maps are created once per distinct fitness
+    strategy in the parent process and shared with all workers.
+    """
+    def __init__(self,
+                 parameters_file: str,
+                 image_shape: Tuple[int, int],
+                 geometry_file: str,
+                 edge_image: np.array,
+                 n_workers: Optional[int] = None,
+                 mp_context: Union[str, BaseContext, None] = None) -> None:
+        """
+        :param parameters_file: The camera genome parameters file
+        :param image_shape: The image shape (height, width)
+        :param geometry_file: The .obj geometry file
+        :param edge_image: The binary edge image
+        :param n_workers: Number of worker processes. Defaults to the number of cpus, 1 runs in-process
+        :param mp_context: Optional multiprocessing start method, e.g. "fork", "spawn" or "forkserver", or a
+            context, e.g. from worker_context
+        """
+        super().__init__()
+        self._parameters_file = parameters_file
+        self._image_shape = image_shape
+        self._geometry_file = geometry_file
+        self._edge_image = edge_image
+        self._n_workers = n_workers or multiprocessing.cpu_count()
+        self._mp_context = mp_context
+
+    def run(self, bundle_specs: List[BundleSpec], seeds: List[int], start_dna: np.array,
+            reference_dna: Optional[np.array] = None, print_info: bool = False,
+            archive: Optional[RunArchive] = None) -> SweepReport:
+        """
+        Runs all bundle / seed combinations.
+        :param bundle_specs: The bundles, e.g. from StrategyGrid.expand or StrategyGrid.sample
+        :param seeds: The seeds, every bundle is run once per seed
+        :param start_dna: The start dna passed to every run
+        :param reference_dna: Optional ground truth camera, used to report reprojection errors
+        :param print_info: If True, prints every finished run
+        :param archive: Optional run archive, all runs and their histories are appended to it at the end
+        :return: The sweep report
+        """
+        genome_parameters = load_genome_parameters(self._parameters_file, self._image_shape)
+        fitness_maps = {}
+        for bundle_spec in bundle_specs:
+            key = bundle_spec.fitness.printable_identifier()
+            if key not in fitness_maps:
+                fitness_maps[key] = bundle_spec.fitness.build(genome_parameters).create_fitness(self._edge_image)
+
+        initargs = (self._parameters_file, self._image_shape, self._geometry_file, self._edge_image, fitness_maps,
+                    start_dna, reference_dna)
+        tasks = [(bundle_spec, seed) for bundle_spec in bundle_specs for seed in seeds]
+
+        records = []
+        if self._n_workers == 1:
+            _initialize_worker(*initargs)
+            for task in tasks:
+                records.append(self._on_record(_run_task(task), print_info))
+        else:
+            context = self._mp_context
+            if context is None or isinstance(context, str):
+                context = multiprocessing.get_context(context)
+            with context.Pool(self._n_workers, initializer=_initialize_worker, initargs=initargs) as pool:
+                for record in pool.imap_unordered(_run_task, tasks):
+                    records.append(self._on_record(record, print_info))
+
+        if archive is not None:
+            archive.append(records, image_hash(self._edge_image), geometry_hash(load_geometry(self._geometry_file)))
+        return SweepReport(records)
+
+    @staticmethod
+    def _on_record(record: RunRecord, print_info: bool) -> RunRecord:
+        if print_info:
+            print("seed={:6} best={:10.2f} gen={:5} {}".format(record.seed, record.best_fitness,
+                                                               record.n_generations, record.bundle))
+        return record
@@ -0,0 +1,64 @@
+import http.client
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import cv2 as cv
+
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, ObjGeometry
+from evolution.service import CalibrationService, run_server
+from synthetic_squash_example import synthetic_target_dna, synthetic_target_edge_image
+
+
+def post(host: str, port: int, path: str, content: dict = None) -> dict:
+    connection = http.client.HTTPConnection(host, port, timeout=600)
+    if content is None:
+        connection.request("GET", path)
+    else:
+        connection.request("POST", path, json.dumps(content), {"Content-Type": "application/json"})
+    response = json.loads(connection.getresponse().read())
+    connection.close()
+    return response
+
+
+if __name__ == '__main__':
+    # 1. Specify all parameters
+    image_shape = (image_height, image_width) = 600, 800
+    parameters_file = os.path.abspath("data/synth/squash_parameters.json")
+    geometry_file = os.path.abspath("data/synth/squash_court.obj")
+    host, port = "127.0.0.1", 8765
+
+    # 2. The service reads edge images from files
+    geometry = ObjGeometry(geometry_file)
+    real_dna = synthetic_target_dna(image_shape)
+    camera_genome_factory = CameraGenomeFactory(CameraGenomeParameters(parameters_file, image_shape))
+    edge_image_file = os.path.join(tempfile.mkdtemp(), "edges.png")
+    edge_image = synthetic_target_edge_image(image_shape, geometry, camera_genome_factory.create(real_dna))
+    cv.imwrite(edge_image_file, edge_image)
+
+    # 3. Start the service. It could also run standalone: python -m evolution.service.http_server --port 8765
+    threading.Thread(target=run_server, args=(CalibrationService(n_workers=4), host, port), daemon=True).start()
+    time.sleep(0.5)
+
+    # 4. Send concurrent jobs for the same image, they share cached parameters, geometry and fitness map and their
+    #    population evaluations are batched
+    def calibrate(job_index: int) -> dict:
+        start_dna = real_dna + np.random.uniform(-1, 1, 15) * np.array([30, 30, 10, 10, .2, .1, .3, .03, .01,
+                                                                         0, 0, 0, 0, 0, 0])
+        return post(host, port, "/calibrate", {"parameters_file": parameters_file,
+                                               "image_shape": [image_height, image_width],
+                                               "geometry_file": geometry_file,
+                                               "edge_image_file": edge_image_file,
+                                               "start_dna": start_dna.tolist(),
+                                               "max_iterations": 100})
+
+    with ThreadPoolExecutor(8) as executor:
+        for response in executor.map(calibrate, range(8)):
+            print("fitness={:9.2f} queue={:5.2f}s run={:5.2f}s".format(response["best_fitness"],
+                                                                       response["queue_time"], response["run_time"]))
+
+    print(json.dumps(post(host, port, "/stats"), indent=2))
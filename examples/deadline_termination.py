@@ -0,0 +1,43 @@
+import time
+
+import numpy as np
+
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, ObjGeometry, GeneticCameraAlgorithm, \
+    reprojection_errors
+from evolution.strategies import ValueUniformPopulation, DistanceMapWithPunishment, DistanceMap, Tournament, \
+    TwoPoint, BoundedUniformMutation, NoImprovement, StrategyBundle, Or, WallClockDeadline, MaxEvaluations
+from synthetic_squash_example import synthetic_target_dna, synthetic_target_edge_image
+
+if __name__ == '__main__':
+    # 1. Specify all parameters
+    image_shape = (image_height, image_width) = 600, 800
+    parameters_file = "data/synth/squash_parameters.json"
+    geometry_file = "data/synth/squash_court.obj"
+
+    genome_parameters = CameraGenomeParameters(parameters_file, image_shape)
+    geometry = ObjGeometry(geometry_file)
+    real_dna = synthetic_target_dna(image_shape)
+    camera_genome_factory = CameraGenomeFactory(genome_parameters)
+    edge_image = synthetic_target_edge_image(image_shape, geometry, camera_genome_factory.create(real_dna))
+    start_dna = real_dna + np.array([40, 40, 10, 10, .2, .1, .3, .03, .01, 0, 0, 0, 0, 0, 0])
+
+    # 2. Hold runs to a latency budget or to an evaluation budget. The large population makes single generations
+    #    slow, evaluating in chunks of 16 genomes keeps the deadline anyway
+    budgets = {"deadline 0.25s": WallClockDeadline(0.25),
+               "deadline 1.00s": WallClockDeadline(1.0),
+               "2000 evaluations": MaxEvaluations(2000)}
+    for name, budget in budgets.items():
+        strategy_bundle = StrategyBundle(ValueUniformPopulation(256),
+                                         DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3),
+                                         Tournament(4),
+                                         TwoPoint(),
+                                         BoundedUniformMutation(genome_parameters),
+                                         Or(NoImprovement(100), budget))
+        camera_algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, edge_image, geometry,
+                                                  evaluation_chunk_size=16)
+        start_time = time.perf_counter()
+        result = camera_algorithm.run(start_dna)
+        best_genome, best_fitness = result.best_genome
+        print("{:>16}: {:.3f}s, {:5} evaluations, {:3} generations, reprojection error {:5.2f}px".format(
+            name, time.perf_counter() - start_time, camera_algorithm.n_evaluations, result.n_generations,
+            reprojection_errors(real_dna, best_genome.dna, geometry.world_points).mean[0]))
@@ -0,0 +1,63 @@
+import multiprocessing
+import random
+import threading
+
+import numpy as np
+
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, ObjGeometry, GeneticCameraAlgorithm
+from evolution.distributed import DistributedEvaluation, run_worker
+from evolution.strategies import ValueUniformPopulation, DistanceMapWithPunishment, DistanceMap, Tournament, \
+    TwoPoint, BoundedUniformMutation, MaxIteration, StrategyBundle
+from synthetic_squash_example import synthetic_target_dna, synthetic_target_edge_image
+
+
+def run_algorithm(evaluation_backend=None, seed=0):
+    np.random.seed(seed)
+    random.seed(seed)
+    strategy_bundle = StrategyBundle(ValueUniformPopulation(32),
+                                     DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3),
+                                     Tournament(4),
+                                     TwoPoint(),
+                                     BoundedUniformMutation(genome_parameters),
+                                     MaxIteration(100))
+    camera_algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, edge_image, geometry,
+                                              evaluation_backend=evaluation_backend)
+    return camera_algorithm.run(start_dna.copy())
+
+
+if __name__ == '__main__':
+    # 1. Specify all parameters
+    image_shape = (image_height, image_width) = 600, 800
+    parameters_file = "data/synth/squash_parameters.json"
+    geometry_file = "data/synth/squash_court.obj"
+    n_workers = 4
+
+    genome_parameters = CameraGenomeParameters(parameters_file, image_shape)
+    camera_genome_factory = CameraGenomeFactory(genome_parameters)
+    geometry = ObjGeometry(geometry_file)
+
+    real_dna = synthetic_target_dna(image_shape)
+    edge_image = synthetic_target_edge_image(image_shape, geometry, camera_genome_factory.create(real_dna))
+    start_dna = real_dna + np.array([30, 30, 10, 10, .2, .1, .3, .03, .01, 0, 0, 0, 0, 0, 0])
+
+    # 2. Start a coordinator and some workers on localhost. On other machines, start workers with
+    #    python -m evolution.distributed.worker <coordinator host> <port>
+    with DistributedEvaluation("127.0.0.1", 0, batch_size=4, heartbeat_timeout=2.0) as evaluation:
+        host, port = evaluation.address
+        workers = [multiprocessing.Process(target=run_worker, args=(host, port, 0.5)) for _ in range(n_workers)]
+        for worker in workers:
+            worker.start()
+        evaluation.wait_for_workers(n_workers)
+
+        # 3. Kill one worker during the run, its batches are re-dispatched to the other workers
+        threading.Timer(0.5, workers[0].kill).start()
+        distributed_result = run_algorithm(evaluation)
+        print(f"{evaluation.n_workers} of {n_workers} workers left, {evaluation.n_redispatched} batches re-dispatched")
+
+    for worker in workers:
+        worker.join()
+
+    # 4. The distributed run evaluates exactly the same genomes as a local run
+    local_result = run_algorithm()
+    assert distributed_result.best_fitnesses == local_result.best_fitnesses, "Distributed run differs from local run"
+    print("best fitness: {:.2f}, identical to the local run".format(distributed_result.best_genome[1]))
@@ -0,0 +1,53 @@
+import time
+
+import numpy as np
+
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, ObjGeometry, CameraTranslator
+from evolution.camera.camera_scorer import CameraScorer
+from evolution.strategies import DistanceMap, DistanceMapWithPunishment, OrientedDistanceMap
+from synthetic_squash_example import synthetic_target_dna, synthetic_target_edge_image
+
+if __name__ == '__main__':
+    # 1. Specify all parameters
+    image_shape = (image_height, image_width) = 600, 800
+    parameters_file = "data/synth/squash_parameters.json"
+    geometry_file = "data/synth/squash_court.obj"
+    n_cameras = 500
+    relative_perturbation = .05
+
+    # 2. Construct a synthetic edge image, a good camera and a population of worse cameras around the target camera
+    genome_parameters = CameraGenomeParameters(parameters_file, image_shape)
+    camera_genome_factory = CameraGenomeFactory(genome_parameters)
+    geometry = ObjGeometry(geometry_file)
+
+    real_dna = synthetic_target_dna(image_shape)
+    edge_image = synthetic_target_edge_image(image_shape, geometry, camera_genome_factory.create(real_dna))
+
+    np.random.seed(0)
+    lower_bounds, upper_bounds = genome_parameters.genome_bounds
+    scale = relative_perturbation * (upper_bounds - lower_bounds)
+    good_genome = camera_genome_factory.create(real_dna + np.random.normal(0, .1 * scale))
+    genomes = [camera_genome_factory.create(real_dna + np.random.normal(0, scale)) for _ in range(n_cameras)]
+
+    # 3. Score the population without and with the early exit against the score of the good camera
+    fitness_strategy = DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3)
+    fitness_maps = {"plain": (fitness_strategy.create_fitness(edge_image), None),
+                    "oriented": (OrientedDistanceMap(fitness_strategy, 4).create_fitness(edge_image), 4)}
+    for name, (fitness_map, n_orientation_bins) in fitness_maps.items():
+        camera_scorer = CameraScorer(fitness_map, geometry, CameraTranslator(), n_orientation_bins=n_orientation_bins)
+        threshold = camera_scorer.score(good_genome)
+
+        start_time = time.perf_counter()
+        scores = [camera_scorer.score(genome) for genome in genomes]
+        full_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        bounded_scores = [camera_scorer.score_bounded(genome, threshold) for genome in genomes]
+        bounded_time = time.perf_counter() - start_time
+
+        # Partial scores are upper bounds below the threshold, full scores are unchanged
+        for score, (bounded_score, is_partial) in zip(scores, bounded_scores):
+            assert score < threshold if is_partial else np.isclose(score, bounded_score, rtol=1e-9, atol=1e-6)
+        n_partial = sum(is_partial for _, is_partial in bounded_scores)
+        print(f"{name:>8}: {n_cameras / full_time:8.1f} cameras/s full, {n_cameras / bounded_time:8.1f} cameras/s "
+              f"with early exit ({n_partial} of {n_cameras} exited early)")
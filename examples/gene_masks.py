@@ -0,0 +1,47 @@
+import random
+import time
+
+import numpy as np
+
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, ObjGeometry, GeneticCameraAlgorithm, \
+    reprojection_errors
+from evolution.strategies import ValueUniformPopulation, DistanceMapWithPunishment, DistanceMap, Tournament, \
+    TwoPoint, BoundedUniformMutation, MaxIteration, StrategyBundle
+from synthetic_squash_example import synthetic_target_dna, synthetic_target_edge_image
+
+if __name__ == '__main__':
+    # 1. Specify all parameters. The masked parameters file freezes cx, cy, d0..d3 and ties fv to fu
+    image_shape = (image_height, image_width) = 600, 800
+    parameters_files = {"full": "data/synth/squash_parameters.json",
+                        "masked": "data/synth/squash_parameters_masked.json"}
+    geometry_file = "data/synth/squash_court.obj"
+
+    geometry = ObjGeometry(geometry_file)
+    real_dna = synthetic_target_dna(image_shape)
+    camera_genome_factory = CameraGenomeFactory(CameraGenomeParameters(parameters_files["full"], image_shape))
+    edge_image = synthetic_target_edge_image(image_shape, geometry, camera_genome_factory.create(real_dna))
+
+    # The start camera knows the principal point and has square pixels, but is off in all other genes
+    start_dna = real_dna + np.array([40, 40, 0, 0, .2, .1, .3, .03, .01, 0, 0, 0, 0, 0, 0])
+
+    # 2. Run the same strategy on the full and on the masked dna
+    for name, parameters_file in parameters_files.items():
+        genome_parameters = CameraGenomeParameters(parameters_file, image_shape)
+        errors = []
+        start_time = time.perf_counter()
+        for seed in range(5):
+            np.random.seed(seed)
+            random.seed(seed)
+            strategy_bundle = StrategyBundle(ValueUniformPopulation(32),
+                                             DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3),
+                                             Tournament(4),
+                                             TwoPoint(),
+                                             BoundedUniformMutation(genome_parameters),
+                                             MaxIteration(100))
+            camera_algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, edge_image, geometry)
+            best_genome, best_fitness = camera_algorithm.run(start_dna).best_genome
+            # Results always contain the full dna
+            errors.append(reprojection_errors(real_dna, best_genome.dna, geometry.world_points).mean[0])
+
+        print("{:>6}: {:2} free genes, mean reprojection error {:5.2f}px ({:.2f}s)".format(
+            name, genome_parameters.n_genes, np.mean(errors), time.perf_counter() - start_time))
@@ -0,0 +1,57 @@
+import random
+import time
+
+import numpy as np
+
+from evolution.base import geometry_levels
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, ObjGeometry, GeneticCameraAlgorithm, \
+    reprojection_errors, projected_connection_lengths
+from evolution.strategies import ValueUniformPopulation, DistanceMapWithPunishment, DistanceMap, Tournament, \
+    TwoPoint, BoundedUniformMutation, MaxIteration, StrategyBundle, GenerationDetail, DiversityDetail
+from synthetic_squash_example import synthetic_target_dna, synthetic_target_edge_image
+
+if __name__ == '__main__':
+    # 1. Specify all parameters
+    image_shape = (image_height, image_width) = 600, 800
+    parameters_file = "data/synth/squash_parameters.json"
+    geometry_file = "data/synth/squash_court.obj"
+
+    genome_parameters = CameraGenomeParameters(parameters_file, image_shape)
+    geometry = ObjGeometry(geometry_file)
+    real_dna = synthetic_target_dna(image_shape)
+    camera_genome_factory = CameraGenomeFactory(genome_parameters)
+    edge_image = synthetic_target_edge_image(image_shape, geometry, camera_genome_factory.create(real_dna))
+    start_dna = real_dna + np.array([40, 40, 10, 10, .2, .1, .3, .03, .01, 0, 0, 0, 0, 0, 0])
+
+    # 2. Levels of detail, ranked by the world length of the connections or by their length in the start camera
+    levels = {"world length": geometry_levels(geometry, (0.3, 0.6, 1.0)),
+              "projected length": geometry_levels(geometry, (0.3, 0.6, 1.0),
+                                                  projected_connection_lengths(geometry, start_dna))}
+    for name, level_geometries in levels.items():
+        print("{:>16}: {} connections per level".format(name, [len(g.connections) for g in level_geometries]))
+
+    # 3. Compare the full geometry with the schedules
+    configurations = {"full": (None, None),
+                      "generations": (levels["world length"], GenerationDetail([40, 80])),
+                      "diversity": (levels["world length"], DiversityDetail([0.05, 0.02])),
+                      "projected": (levels["projected length"], GenerationDetail([40, 80]))}
+    for name, (level_geometries, detail_schedule) in configurations.items():
+        errors = []
+        start_time = time.perf_counter()
+        for seed in range(5):
+            np.random.seed(seed)
+            random.seed(seed)
+            strategy_bundle = StrategyBundle(ValueUniformPopulation(32),
+                                             DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3),
+                                             Tournament(4),
+                                             TwoPoint(),
+                                             BoundedUniformMutation(genome_parameters),
+                                             MaxIteration(120))
+            camera_algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, edge_image, geometry,
+                                                      geometry_levels=level_geometries,
+                                                      detail_schedule=detail_schedule)
+            best_genome, best_fitness = camera_algorithm.run(start_dna).best_genome
+            errors.append(reprojection_errors(real_dna, best_genome.dna, geometry.world_points).mean[0])
+
+        print("{:>12}: mean reprojection error {:5.2f}px ({:.2f}s)".format(name, np.mean(errors),
+                                                                          time.perf_counter() - start_time))
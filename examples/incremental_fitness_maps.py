@@ -0,0 +1,57 @@
+import time
+
+import numpy as np
+import cv2 as cv
+
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, ObjGeometry
+from evolution.preprocessing import IncrementalDistanceMap
+from evolution.strategies import DistanceMapWithPunishment, DistanceMap
+from synthetic_squash_example import synthetic_target_dna, synthetic_target_edge_image
+
+
+def moving_player_frames(court_edges: np.array, n_frames: int):
+    """ A static court with two players, which move a few pixels per frame """
+    height, width = court_edges.shape
+    players = np.array([[width * 0.35, height * 0.6], [width * 0.6, height * 0.55]])
+    for frame_index in range(n_frames):
+        frame = court_edges.copy()
+        for x, y in players + frame_index * np.array([[4, 1], [-3, 2]]):
+            cv.rectangle(frame, (int(x), int(y)), (int(x) + width // 40, int(y) + height // 8), (255,), 2)
+        yield frame
+
+
+if __name__ == '__main__':
+    # 1. Specify all parameters
+    parameters_file = "data/synth/squash_parameters.json"
+    geometry_file = "data/synth/squash_court.obj"
+    geometry = ObjGeometry(geometry_file)
+    fitness_strategy = DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .05)
+
+    for image_shape in [(1080, 1920), (2160, 3840)]:
+        camera_genome_factory = CameraGenomeFactory(CameraGenomeParameters(parameters_file, image_shape))
+        court_edges = synthetic_target_edge_image(image_shape, geometry,
+                                                  camera_genome_factory.create(synthetic_target_dna(image_shape)))
+        frames = list(moving_player_frames(court_edges, 30))
+
+        # 2. Rebuild the full map for every frame
+        start_time = time.perf_counter()
+        for frame in frames:
+            fitness_strategy.create_fitness(frame)
+        full_time = (time.perf_counter() - start_time) / len(frames)
+
+        # 3. Update only the changed tiles
+        incremental_map = IncrementalDistanceMap(fitness_strategy, tile_size=64)
+        incremental_map.update(frames[0])
+        recomputed_fractions = []
+        start_time = time.perf_counter()
+        for frame in frames[1:]:
+            incremental_map.update(frame)
+            recomputed_fractions.append(incremental_map.recomputed_fraction)
+        incremental_time = (time.perf_counter() - start_time) / (len(frames) - 1)
+
+        # The incremental map equals the full map with the same reference distance
+        reference_map = fitness_strategy.fitness_from_distances(fitness_strategy.create_distances(frames[-1]),
+                                                                incremental_map.max_distance)
+        print("{}x{}: full {:6.2f}ms, incremental {:6.2f}ms ({:4.1f}% recomputed), max difference {}".format(
+            image_shape[1], image_shape[0], full_time * 1000, incremental_time * 1000,
+            100 * np.mean(recomputed_fractions), np.abs(incremental_map.fitness_map - reference_map).max()))
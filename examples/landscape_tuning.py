@@ -0,0 +1,55 @@
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, ObjGeometry, GeneticCameraAlgorithm, \
+    PopulationScorer, reprojection_errors
+from evolution.landscape import LandscapeProbe, write_parameters
+from evolution.strategies import ValueUniformPopulation, DistanceMapWithPunishment, DistanceMap, Tournament, \
+    TwoPoint, BoundedUniformMutation, MaxIteration, StrategyBundle
+from synthetic_squash_example import synthetic_target_dna, synthetic_target_edge_image
+
+if __name__ == '__main__':
+    # 1. Specify all parameters
+    image_shape = (image_height, image_width) = 600, 800
+    parameters_file = "data/synth/squash_parameters.json"
+    geometry_file = "data/synth/squash_court.obj"
+    tuned_parameters_file = os.path.join(tempfile.mkdtemp(), "squash_parameters_tuned.json")
+
+    genome_parameters = CameraGenomeParameters(parameters_file, image_shape)
+    geometry = ObjGeometry(geometry_file)
+    real_dna = synthetic_target_dna(image_shape)
+    camera_genome_factory = CameraGenomeFactory(genome_parameters)
+    edge_image = synthetic_target_edge_image(image_shape, geometry, camera_genome_factory.create(real_dna))
+    fitness_strategy = DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3)
+
+    # 2. Probe the landscape around a known solution, all slices are scored in batches. The proposed mutation
+    #    ranges are written as a new parameters file. The same tool runs on the command line:
+    #    python -m evolution.landscape.landscape_probe <parameters> <geometry> <edge image> --dna ... --output ...
+    population_scorer = PopulationScorer(fitness_strategy.create_fitness(edge_image), geometry)
+    start_time = time.perf_counter()
+    landscape_report = LandscapeProbe(population_scorer.score, genome_parameters, real_dna).probe()
+    print("Probed in {:.2f}s\n{}".format(time.perf_counter() - start_time, landscape_report))
+    write_parameters(genome_parameters, landscape_report, tuned_parameters_file)
+
+    # 3. Compare the hand tuned and the proposed mutation ranges
+    start_dna = real_dna + np.array([40, 40, 10, 10, .2, .1, .3, .03, .01, 0, 0, 0, 0, 0, 0])
+    for name, parameters in [("hand tuned", genome_parameters),
+                             ("proposed", CameraGenomeParameters(tuned_parameters_file, image_shape))]:
+        errors = []
+        for seed in range(5):
+            np.random.seed(seed)
+            random.seed(seed)
+            strategy_bundle = StrategyBundle(ValueUniformPopulation(32),
+                                             fitness_strategy,
+                                             Tournament(4),
+                                             TwoPoint(),
+                                             BoundedUniformMutation(parameters),
+                                             MaxIteration(100))
+            camera_algorithm = GeneticCameraAlgorithm(parameters, strategy_bundle, edge_image, geometry)
+            best_genome, best_fitness = camera_algorithm.run(start_dna).best_genome
+            errors.append(reprojection_errors(real_dna, best_genome.dna, geometry.world_points).mean[0])
+        print("{:>10}: mean reprojection error {:5.2f}px".format(name, np.mean(errors)))
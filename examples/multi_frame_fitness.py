@@ -0,0 +1,67 @@
+import random
+import time
+
+import numpy as np
+import cv2 as cv
+
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, ObjGeometry, GeneticCameraAlgorithm, \
+    reprojection_errors
+from evolution.strategies import ValueUniformPopulation, DistanceMapWithPunishment, DistanceMap, Tournament, \
+    TwoPoint, BoundedUniformMutation, MaxIteration, StrategyBundle, MultiFrameFitness
+from synthetic_squash_example import synthetic_target_dna, synthetic_target_edge_image
+
+
+def occluded_frame(edge_image: np.array, n_players: int = 6) -> np.array:
+    """ Players hide parts of the lines and add edges of their own. """
+    frame = edge_image.copy()
+    height, width = frame.shape
+    for _ in range(n_players):
+        x, y = np.random.randint(0, width - 60), np.random.randint(height // 3, height - 120)
+        frame[y:y + 120, x:x + 60] = 0
+        cv.ellipse(frame, (x + 30, y + 60), (25, 55), 0, 0, 360, (255,), 1)
+    return frame
+
+
+if __name__ == '__main__':
+    # 1. Specify all parameters
+    image_shape = (image_height, image_width) = 600, 800
+    parameters_file = "data/synth/squash_parameters.json"
+    geometry_file = "data/synth/squash_court.obj"
+
+    genome_parameters = CameraGenomeParameters(parameters_file, image_shape)
+    geometry = ObjGeometry(geometry_file)
+    camera_genome_factory = CameraGenomeFactory(genome_parameters)
+    real_dna = synthetic_target_dna(image_shape)
+    edge_image = synthetic_target_edge_image(image_shape, geometry, camera_genome_factory.create(real_dna))
+    start_dna = real_dna + np.array([40, 40, 10, 10, .2, .1, .3, .03, .01, 0, 0, 0, 0, 0, 0])
+
+    # 2. Eight frames of a static camera, every one with other occlusions
+    np.random.seed(42)
+    frames = np.array([occluded_frame(edge_image) for _ in range(8)])
+    frame_strategy = DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3)
+
+    # 3. A single frame, the combined maps and the stacked map with a trimmed mean
+    fitness_strategies = {"single frame": (frame_strategy, frames[0]),
+                          "median": (MultiFrameFitness(frame_strategy, "median"), frames),
+                          "max": (MultiFrameFitness(frame_strategy, "max"), frames),
+                          "stack": (MultiFrameFitness(frame_strategy, "stack", trim=0.25), frames)}
+    for name, (fitness_strategy, edge_images) in fitness_strategies.items():
+        errors = []
+        run_time = 0.0
+        for seed in range(5):
+            np.random.seed(seed)
+            random.seed(seed)
+            strategy_bundle = StrategyBundle(ValueUniformPopulation(32),
+                                             fitness_strategy,
+                                             Tournament(4),
+                                             TwoPoint(),
+                                             BoundedUniformMutation(genome_parameters),
+                                             MaxIteration(100))
+            camera_algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, edge_images, geometry,
+                                                      scoring_backend="auto")
+            start_time = time.perf_counter()
+            best_genome, best_fitness = camera_algorithm.run(start_dna).best_genome
+            run_time += time.perf_counter() - start_time
+            errors.append(reprojection_errors(real_dna, best_genome.dna, geometry.world_points).mean[0])
+        print("{:>12}: mean reprojection error {:5.2f}px, {:.2f}s per run".format(name, np.mean(errors),
+                                                                                  run_time / 5))
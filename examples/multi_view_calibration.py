@@ -0,0 +1,70 @@
+import random
+import time
+
+import numpy as np
+
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, ObjGeometry, GeneticCameraAlgorithm, \
+    reprojection_errors, MultiViewCameraAlgorithm, MultiViewGenomeParameters
+from evolution.strategies import ValueUniformPopulation, DistanceMapWithPunishment, DistanceMap, Tournament, \
+    TwoPoint, BoundedUniformMutation, MaxIteration, StrategyBundle, BlockUniform
+from synthetic_squash_example import synthetic_target_dna, synthetic_target_edge_image
+
+if __name__ == '__main__':
+    # 1. Specify all parameters
+    image_shape = (image_height, image_width) = 600, 800
+    parameters_file = "data/synth/squash_parameters.json"
+    geometry_file = "data/synth/squash_court.obj"
+    n_generations = 100
+
+    genome_parameters = CameraGenomeParameters(parameters_file, image_shape)
+    multi_view_parameters = MultiViewGenomeParameters(parameters_file, image_shape, n_views=3)
+    geometry = ObjGeometry(geometry_file)
+    camera_genome_factory = CameraGenomeFactory(genome_parameters)
+
+    # 2. Three identical cameras (same intrinsics) at different mounts
+    intrinsics = np.array([40, 40, 8, -6, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0])
+    mounts = [np.array([0, 0, 0, 0, 1.0, .3, .5, .05, .12, .05, 0, 0, 0, 0, 0]),
+              np.array([0, 0, 0, 0, -1.0, .2, .3, .04, -.12, -.04, 0, 0, 0, 0, 0]),
+              np.array([0, 0, 0, 0, 0, .5, -1.0, .10, 0, 0, 0, 0, 0, 0, 0])]
+    real_dnas = [synthetic_target_dna(image_shape) + intrinsics + mount for mount in mounts]
+    edge_images = [synthetic_target_edge_image(image_shape, geometry, camera_genome_factory.create(dna))
+                   for dna in real_dnas]
+    # The mounts are known roughly, the intrinsics are the defaults
+    start_dnas = [synthetic_target_dna(image_shape) + mount + np.array([0, 0, 0, 0, .2, -.1, .3, .02, -.02, 0,
+                                                                        0, 0, 0, 0, 0]) for mount in mounts]
+    fitness_strategy = DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3)
+
+    def report(name, best_dnas, n_evaluations, run_time):
+        errors = [reprojection_errors(real_dna, dna, geometry.world_points).mean[0]
+                  for real_dna, dna in zip(real_dnas, best_dnas)]
+        focal_lengths = [dna[0] for dna in best_dnas]
+        print("{:>11}: mean reprojection error {:5.2f}px, fu {} (real {:.0f}), {} view scores, {:.2f}s".format(
+            name, np.mean(errors), " / ".join("{:.1f}".format(fu) for fu in focal_lengths), real_dnas[0][0],
+            n_evaluations, run_time))
+
+    # 3. Every camera on its own. Every run gets the same number of generations as the joint run
+    np.random.seed(0)
+    random.seed(0)
+    start_time = time.perf_counter()
+    best_dnas, n_evaluations = [], 0
+    for edge_image, start_dna in zip(edge_images, start_dnas):
+        strategy_bundle = StrategyBundle(ValueUniformPopulation(32), fitness_strategy, Tournament(4), TwoPoint(),
+                                         BoundedUniformMutation(genome_parameters), MaxIteration(n_generations))
+        camera_algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, edge_image, geometry,
+                                                  scoring_backend="auto")
+        best_genome, best_fitness = camera_algorithm.run(start_dna).best_genome
+        best_dnas.append(best_genome.dna)
+        n_evaluations += camera_algorithm.n_evaluations
+    report("independent", best_dnas, n_evaluations, time.perf_counter() - start_time)
+
+    # 4. All cameras at once: shared intrinsics, one pose per view, the same number of view scores
+    np.random.seed(0)
+    random.seed(0)
+    start_time = time.perf_counter()
+    strategy_bundle = StrategyBundle(ValueUniformPopulation(32, multi_view_parameters.random_range()),
+                                     fitness_strategy, Tournament(4), BlockUniform(multi_view_parameters.blocks),
+                                     BoundedUniformMutation(multi_view_parameters), MaxIteration(n_generations))
+    multi_view_algorithm = MultiViewCameraAlgorithm(multi_view_parameters, strategy_bundle, edge_images, geometry)
+    best_genome, best_fitness = multi_view_algorithm.run(multi_view_parameters.combine_dna(start_dnas)).best_genome
+    report("joint", multi_view_parameters.split_dna(best_genome.dna),
+           multi_view_algorithm.n_evaluations * multi_view_parameters.n_views, time.perf_counter() - start_time)
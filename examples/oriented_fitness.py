@@ -0,0 +1,66 @@
+import random
+import time
+
+import numpy as np
+import cv2 as cv
+
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, ObjGeometry, GeneticCameraAlgorithm, \
+    reprojection_errors
+from evolution.strategies import ValueUniformPopulation, DistanceMapWithPunishment, DistanceMap, Tournament, \
+    TwoPoint, BoundedUniformMutation, MaxIteration, StrategyBundle, OrientedDistanceMap
+from synthetic_squash_example import synthetic_target_dna, synthetic_target_edge_image
+
+
+def add_markings(edge_image: np.array, spacing: int = 24) -> np.array:
+    """ Dense markings of other sports on the floor, crossing the court lines. """
+    marked = edge_image.copy()
+    height, width = marked.shape
+    for x in range(spacing // 2, width, spacing):
+        cv.line(marked, (x, height // 2), (x + 40, height - 1), (255,), 1)
+    return marked
+
+
+if __name__ == '__main__':
+    # 1. Specify all parameters
+    image_shape = (image_height, image_width) = 600, 800
+    parameters_file = "data/synth/squash_parameters.json"
+    geometry_file = "data/synth/squash_court.obj"
+
+    genome_parameters = CameraGenomeParameters(parameters_file, image_shape)
+    geometry = ObjGeometry(geometry_file)
+    camera_genome_factory = CameraGenomeFactory(genome_parameters)
+    real_dna = synthetic_target_dna(image_shape)
+    edge_image = synthetic_target_edge_image(image_shape, geometry, camera_genome_factory.create(real_dna))
+    edge_image = add_markings(edge_image)
+    start_dna = real_dna + np.array([40, 40, 10, 10, .2, .1, .3, .03, .01, 0, 0, 0, 0, 0, 0])
+
+    # 2. Look up every pixel in the nearest edge of any direction, or only in edges of the segment's direction
+    distance_map = DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3)
+    for fitness_strategy in [distance_map, OrientedDistanceMap(distance_map, n_bins=4)]:
+        start_time = time.perf_counter()
+        fitness_map = fitness_strategy.create_fitness(edge_image)
+        map_time = time.perf_counter() - start_time
+
+        errors, generations, run_time = [], [], 0.0
+        for seed in range(5):
+            np.random.seed(seed)
+            random.seed(seed)
+            strategy_bundle = StrategyBundle(ValueUniformPopulation(32),
+                                             fitness_strategy,
+                                             Tournament(4),
+                                             TwoPoint(),
+                                             BoundedUniformMutation(genome_parameters),
+                                             MaxIteration(150))
+            camera_algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, edge_image, geometry,
+                                                      fitness_map=fitness_map, scoring_backend="auto")
+            start_time = time.perf_counter()
+            result = camera_algorithm.run(start_dna)
+            run_time += time.perf_counter() - start_time
+            best_genome, best_fitness = result.best_genome
+            errors.append(reprojection_errors(real_dna, best_genome.dna, geometry.world_points).mean[0])
+            # The generation after which the best fitness did not improve anymore
+            generations.append(int(np.argmax(result.best_fitnesses)) + 1)
+
+        print("{:>42}: mean reprojection error {:5.2f}px, converged after {:5.1f} generations, {:.2f}s per run "
+              "(map {:.3f}s)".format(fitness_strategy.printable_identifier(), np.mean(errors), np.mean(generations),
+                                     run_time / 5, map_time))
@@ -0,0 +1,55 @@
+import time
+
+import numpy as np
+
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, CameraTranslator, ObjGeometry, \
+    GeneticCameraAlgorithm, render_geometry_with_camera
+from evolution.preprocessing import PreprocessingPipeline
+from evolution.strategies import ValueUniformPopulation, DistanceMapWithPunishment, DistanceMap, Tournament, \
+    TwoPoint, BoundedUniformMutation, NoImprovement, StrategyBundle, HsvRange
+from synthetic_squash_example import synthetic_target_dna
+
+
+def synthetic_frames(n_frames: int):
+    """ Renders the court with red lines for a slowly moving camera, like a decoded video. """
+    for frame_index in range(n_frames):
+        frame_dna = real_dna + np.array([0, 0, 0, 0, 0.02 * frame_index, 0, 0, 0, 0.002 * frame_index, 0,
+                                         0, 0, 0, 0, 0])
+        frame = np.zeros((image_height, image_width, 3), dtype=np.uint8)
+        A, t, r, d = CameraTranslator().translate_genome(camera_genome_factory.create(frame_dna))
+        render_geometry_with_camera(frame, geometry, A, t, r, d, (0, 0, 255), 2)
+        yield frame
+
+
+if __name__ == '__main__':
+    # 1. Specify all parameters
+    image_shape = (image_height, image_width) = 600, 800
+    parameters_file = "data/synth/squash_parameters.json"
+    geometry_file = "data/synth/squash_court.obj"
+
+    genome_parameters = CameraGenomeParameters(parameters_file, image_shape)
+    camera_genome_factory = CameraGenomeFactory(genome_parameters)
+    geometry = ObjGeometry(geometry_file)
+    real_dna = synthetic_target_dna(image_shape)
+
+    # 2. Edge extraction and fitness maps run in the background, while the previous frame is optimized
+    fitness_strategy = DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3)
+    pipeline = PreprocessingPipeline(HsvRange(), fitness_strategy, n_workers=2, prefetch=4)
+
+    # 3. Track the camera: every frame starts from the best camera of the previous frame
+    start_dna = real_dna.copy()
+    for preprocessed in pipeline.process(synthetic_frames(10)):
+        strategy_bundle = StrategyBundle(ValueUniformPopulation(16),
+                                         fitness_strategy,
+                                         Tournament(4),
+                                         TwoPoint(),
+                                         BoundedUniformMutation(genome_parameters),
+                                         NoImprovement(20))
+        camera_algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, preprocessed.edge_image, geometry,
+                                                  fitness_map=preprocessed.fitness_map)
+        start_time = time.perf_counter()
+        best_genome, best_fitness = camera_algorithm.run(start_dna).best_genome
+        start_dna = best_genome.dna
+        print("frame {:3}: fitness={:10.2f} tx={:6.3f} ({:.2f}s)".format(preprocessed.index, best_fitness,
+                                                                        start_dna[4],
+                                                                        time.perf_counter() - start_time))
@@ -12,6 +12,7 @@ from evolution.camera.camera_rendering import render_geometry_with_camera
 from evolution.camera.camera_translator import CameraTranslator
 from evolution.camera.object_geometry import ObjGeometry
 from evolution.strategies.crossover import TwoPoint
+from evolution.strategies.edges import HsvRange
 from evolution.strategies.fitness import DistanceMapWithPunishment, DistanceMap
 from evolution.strategies.mutation import BoundedUniformMutation
 from evolution.strategies.populate import ValueUniformPopulation
@@ -23,7 +24,6 @@ from evolution.strategies.termination import NoImprovement
 def target_edge_image(file_name: str) -> np.array:
     court_bgr = cv.imread(file_name)
 
-    hsv_image = cv.cvtColor(court_bgr, cv.COLOR_BGR2HSV)
     running = True
     cv.namedWindow("Court")
     noop = lambda i: i
@@ -32,10 +32,10 @@ def target_edge_image(file_name: str) -> np.array:
 
     result = None
     while running:
-        h = hsv_image[:, :, 0]
         h_min = cv.getTrackbarPos("hmin", "Court")
         h_max = cv.getTrackbarPos("hmax", "Court")
-        h = cv.inRange(h, h_min, h_max)
+        # Once the range is known, HsvRange can be used in a PreprocessingPipeline for batch / video work
+        h = HsvRange((h_min, 0, 0), (h_max, 255, 255)).extract_edges(court_bgr)
         cv.imshow("Court", h)
         key = cv.waitKey(1)
         if key == ord('q'):
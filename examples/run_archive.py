@@ -0,0 +1,90 @@
+import csv
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, ObjGeometry, GeneticCameraAlgorithm, \
+    reprojection_errors, image_hash, geometry_hash
+from evolution.strategies import ValueUniformPopulation, DistanceMapWithPunishment, DistanceMap, Tournament, \
+    TwoPoint, Uniform, BoundedUniformMutation, MaxIteration, StrategyBundle
+from evolution.sweep import RunArchive, RunRecord
+from synthetic_squash_example import synthetic_target_dna, synthetic_target_edge_image
+
+if __name__ == '__main__':
+    # 1. Specify all parameters
+    image_shape = (image_height, image_width) = 600, 800
+    parameters_file = "data/synth/squash_parameters.json"
+    geometry_file = "data/synth/squash_court.obj"
+
+    genome_parameters = CameraGenomeParameters(parameters_file, image_shape)
+    geometry = ObjGeometry(geometry_file)
+    camera_genome_factory = CameraGenomeFactory(genome_parameters)
+    real_dna = synthetic_target_dna(image_shape)
+    edge_image = synthetic_target_edge_image(image_shape, geometry, camera_genome_factory.create(real_dna))
+    start_dna = real_dna + np.array([40, 40, 10, 10, .2, .1, .3, .03, .01, 0, 0, 0, 0, 0, 0])
+    inputs = image_hash(edge_image), geometry_hash(geometry)
+
+    archive = RunArchive(tempfile.mkdtemp())
+
+    # 2. Archive a few real runs of two bundles
+    fitness_strategy = DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3)
+    for crossover_strategy in [TwoPoint(), Uniform(0.5)]:
+        for seed in range(3):
+            np.random.seed(seed)
+            random.seed(seed)
+            strategy_bundle = StrategyBundle(ValueUniformPopulation(32), fitness_strategy, Tournament(4),
+                                             crossover_strategy, BoundedUniformMutation(genome_parameters),
+                                             MaxIteration(100))
+            camera_algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, edge_image, geometry,
+                                                      scoring_backend="auto")
+            start_time = time.perf_counter()
+            result = camera_algorithm.run(start_dna)
+            wall_time = time.perf_counter() - start_time
+            best_genome, best_fitness = result.best_genome
+            error = reprojection_errors(real_dna, best_genome.dna, geometry.world_points).mean[0]
+            archive.append_result(strategy_bundle, seed, result, camera_algorithm.n_evaluations, wall_time, error,
+                                  *inputs)
+    print(archive.report())
+    bundle = archive.bundles[0]
+    print("seed 1 of {}: runs {}, final best fitness {:.2f}".format(
+        bundle, archive.find(bundle, 1, *inputs), archive.history(archive.find(bundle, 1, *inputs)[0])[-1]))
+
+    # 3. Ten thousand runs with 200 generations each: the archive against csv lines
+    n_runs, n_generations = 10000, 200
+    records = [RunRecord(bundle=archive.bundles[i % 2], seed=i, n_generations=n_generations,
+                         converged_generation=n_generations - 1, best_fitness=float(i), reprojection_error=1.0,
+                         n_evaluations=6400, wall_time=1.0, best_dna=real_dna,
+                         history=np.sort(np.random.uniform(0, 100, n_generations)))
+               for i in range(n_runs)]
+
+    csv_file = os.path.join(archive.directory, "runs.csv")
+    start_time = time.perf_counter()
+    with open(csv_file, "w", newline="") as file:
+        writer = csv.writer(file)
+        for record in records:
+            writer.writerow([record.bundle, record.seed, record.best_fitness, *record.best_dna, *record.history])
+    csv_write_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    archive.append(records, *inputs)
+    archive_write_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    with open(csv_file, newline="") as file:
+        rows = list(csv.reader(file))
+    csv_histories = np.array([[float(value) for value in row[-n_generations:]] for row in rows
+                              if row[0] == archive.bundles[0]])
+    csv_query_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    reopened = RunArchive(archive.directory)
+    archive_histories = reopened.histories(reopened.select(archive.bundles[0]))
+    archive_query_time = time.perf_counter() - start_time
+
+    print("{} runs x {} generations: write csv {:.2f}s / archive {:.3f}s, load and query csv {:.2f}s / archive "
+          "{:.3f}s, same histories: {}".format(n_runs, n_generations, csv_write_time, archive_write_time,
+                                               csv_query_time, archive_query_time,
+                                               np.array_equal(csv_histories, archive_histories[3:])))
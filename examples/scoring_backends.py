@@ -0,0 +1,43 @@
+import time
+
+import numpy as np
+
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, ObjGeometry, PopulationScorer
+from evolution.camera.camera_kernels import NUMBA_AVAILABLE
+from evolution.strategies import DistanceMap
+from synthetic_squash_example import synthetic_target_dna, synthetic_target_edge_image
+
+if __name__ == '__main__':
+    # 1. Specify all parameters
+    image_shape = (image_height, image_width) = 600, 800
+    parameters_file = "data/synth/squash_parameters.json"
+    geometry_file = "data/synth/squash_court.obj"
+    n_cameras = 1000
+
+    # 2. Construct a synthetic edge image and a population of cameras around the target camera
+    genome_parameters = CameraGenomeParameters(parameters_file, image_shape)
+    camera_genome_factory = CameraGenomeFactory(genome_parameters)
+    geometry = ObjGeometry(geometry_file)
+
+    real_dna = synthetic_target_dna(image_shape)
+    edge_image = synthetic_target_edge_image(image_shape, geometry, camera_genome_factory.create(real_dna))
+    fitness_map = DistanceMap(DistanceMap.DistanceType.L2, .3).create_fitness(edge_image)
+
+    lower_bounds, upper_bounds = genome_parameters.genome_bounds
+    dna_stack = np.random.uniform(lower_bounds, upper_bounds, (n_cameras, genome_parameters.n_genes))
+
+    # 3. Score the population with every available backend, all backends have to agree
+    backends = ["numpy", "numba"] if NUMBA_AVAILABLE else ["numpy"]
+    scores = {}
+    for backend in backends:
+        population_scorer = PopulationScorer(fitness_map, geometry, backend)
+        population_scorer.score(dna_stack[:1])  # warm up, e.g. jit compilation
+
+        start_time = time.perf_counter()
+        scores[backend] = population_scorer.score(dna_stack)
+        elapsed = time.perf_counter() - start_time
+        print(f"{backend:>6}: {n_cameras / elapsed:10.1f} cameras/s")
+
+    for backend in backends[1:]:
+        assert np.allclose(scores["numpy"], scores[backend], rtol=1e-9, atol=1e-9), f"{backend} differs from numpy"
+    print("All backends give identical scores")
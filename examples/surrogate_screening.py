@@ -0,0 +1,49 @@
+import random
+import time
+
+import numpy as np
+
+from evolution.base import SurrogateEvaluation
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, ObjGeometry, GeneticCameraAlgorithm, \
+    reprojection_errors
+from evolution.strategies import ValueUniformPopulation, DistanceMapWithPunishment, DistanceMap, Tournament, \
+    TwoPoint, BoundedUniformMutation, MaxIteration, StrategyBundle, KNearestNeighbours, RadialBasis
+from synthetic_squash_example import synthetic_target_dna, synthetic_target_edge_image
+
+if __name__ == '__main__':
+    # 1. Specify all parameters
+    image_shape = (image_height, image_width) = 600, 800
+    parameters_file = "data/synth/squash_parameters.json"
+    geometry_file = "data/synth/squash_court.obj"
+
+    genome_parameters = CameraGenomeParameters(parameters_file, image_shape)
+    camera_genome_factory = CameraGenomeFactory(genome_parameters)
+    geometry = ObjGeometry(geometry_file)
+
+    real_dna = synthetic_target_dna(image_shape)
+    edge_image = synthetic_target_edge_image(image_shape, geometry, camera_genome_factory.create(real_dna))
+    start_dna = real_dna + np.array([30, 30, 10, 10, .2, .1, .3, .03, .01, 0, 0, 0, 0, 0, 0])
+
+    # 2. Run the same strategy without and with surrogate pre-screening
+    surrogates = {"none": None, "knn": KNearestNeighbours(5), "rbf": RadialBasis(300)}
+    for name, surrogate in surrogates.items():
+        np.random.seed(0)
+        random.seed(0)
+        evaluation = None if surrogate is None else SurrogateEvaluation(surrogate, fraction=0.4, exploration=0.1)
+        strategy_bundle = StrategyBundle(ValueUniformPopulation(32),
+                                         DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3),
+                                         Tournament(4),
+                                         TwoPoint(),
+                                         BoundedUniformMutation(genome_parameters),
+                                         MaxIteration(150))
+        camera_algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, edge_image, geometry,
+                                                  evaluation_backend=evaluation)
+        start_time = time.perf_counter()
+        best_genome, best_fitness = camera_algorithm.run(start_dna).best_genome
+        elapsed = time.perf_counter() - start_time
+
+        error = reprojection_errors(real_dna, best_genome.dna, geometry.world_points).mean[0]
+        print("{:>4}: fitness={:9.1f} error={:5.2f}px time={:5.2f}s".format(name, best_fitness, error, elapsed))
+        if evaluation is not None:
+            # 3. Predicted vs. actual fitness of the truly evaluated genomes and the saved evaluations
+            print("      {}".format(evaluation.accuracy))
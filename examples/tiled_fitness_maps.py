@@ -0,0 +1,33 @@
+import os
+import time
+
+import numpy as np
+
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, ObjGeometry
+from evolution.strategies import DistanceMapWithPunishment, DistanceMap
+from synthetic_squash_example import synthetic_target_dna, synthetic_target_edge_image
+
+if __name__ == '__main__':
+    # 1. Specify all parameters
+    parameters_file = "data/synth/squash_parameters.json"
+    geometry_file = "data/synth/squash_court.obj"
+    geometry = ObjGeometry(geometry_file)
+    print("{} CPUs".format(os.cpu_count()))
+
+    for image_shape in [(2160, 3840), (4320, 7680)]:
+        camera_genome_factory = CameraGenomeFactory(CameraGenomeParameters(parameters_file, image_shape))
+        edge_image = synthetic_target_edge_image(image_shape, geometry,
+                                                 camera_genome_factory.create(synthetic_target_dna(image_shape)))
+
+        for log_div in [.05, .3]:
+            # 2. One distance transform of the whole image and the tiled construction in a thread pool
+            fitness_maps, times = [], []
+            for fitness_strategy in [DistanceMapWithPunishment(DistanceMap.DistanceType.L2, log_div),
+                                     DistanceMapWithPunishment(DistanceMap.DistanceType.L2, log_div, tile_size=2048)]:
+                start_time = time.perf_counter()
+                fitness_maps.append(fitness_strategy.create_fitness(edge_image))
+                times.append(time.perf_counter() - start_time)
+
+            print("{}x{} log_div={:.2f}: full {:6.1f}ms, tiled {:6.1f}ms, max difference {}".format(
+                image_shape[1], image_shape[0], log_div, times[0] * 1000, times[1] * 1000,
+                np.abs(fitness_maps[0] - fitness_maps[1]).max()))
@@ -0,0 +1,55 @@
+import random
+import time
+
+import numpy as np
+
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, ObjGeometry, GeneticCameraAlgorithm, \
+    reprojection_errors, camera_hypotheses, VanishingPointPopulation
+from evolution.strategies import ValueUniformPopulation, DistanceMapWithPunishment, DistanceMap, Tournament, \
+    TwoPoint, BoundedUniformMutation, MaxIteration, StrategyBundle
+from synthetic_squash_example import synthetic_target_dna, synthetic_target_edge_image
+
+if __name__ == '__main__':
+    # 1. Specify all parameters
+    image_shape = (image_height, image_width) = 600, 800
+    parameters_file = "data/synth/squash_parameters.json"
+    geometry_file = "data/synth/squash_court.obj"
+
+    genome_parameters = CameraGenomeParameters(parameters_file, image_shape)
+    geometry = ObjGeometry(geometry_file)
+    camera_genome_factory = CameraGenomeFactory(genome_parameters)
+    real_dna = synthetic_target_dna(image_shape) + np.array([0, 0, 0, 0, 1.0, .3, .5, .05, .12, .05, 0, 0, 0, 0, 0])
+    edge_image = synthetic_target_edge_image(image_shape, geometry, camera_genome_factory.create(real_dna))
+
+    # A new venue: only the principal point is known, the hand typed start camera is far off
+    start_dna = synthetic_target_dna(image_shape) + np.array([150, 150, 0, 0, -1, .5, 1.2, -.1, -.1, 0, 0, 0, 0, 0, 0])
+
+    # 2. The analytic estimate on its own
+    start_time = time.perf_counter()
+    hypotheses = camera_hypotheses(edge_image, geometry, start_dna, bounds=genome_parameters.genome_bounds)
+    print("{} hypotheses in {:.2f}s".format(len(hypotheses), time.perf_counter() - start_time))
+    for dna in hypotheses:
+        error = reprojection_errors(real_dna, dna, geometry.world_points).mean[0]
+        print("    reprojection error {:6.2f}px".format(error))
+
+    # 3. Seed the population around the start dna or around the hypotheses
+    populate_strategies = {"ValueUniformPopulation": lambda: ValueUniformPopulation(32),
+                           "VanishingPointPopulation": lambda: VanishingPointPopulation(edge_image, geometry, 32)}
+    for name, populate_strategy in populate_strategies.items():
+        errors = []
+        start_time = time.perf_counter()
+        for seed in range(5):
+            np.random.seed(seed)
+            random.seed(seed)
+            strategy_bundle = StrategyBundle(populate_strategy(),
+                                             DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3),
+                                             Tournament(4),
+                                             TwoPoint(),
+                                             BoundedUniformMutation(genome_parameters),
+                                             MaxIteration(100))
+            camera_algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, edge_image, geometry)
+            best_genome, best_fitness = camera_algorithm.run(start_dna).best_genome
+            errors.append(reprojection_errors(real_dna, best_genome.dna, geometry.world_points).mean[0])
+
+        print("{:>24}: mean reprojection error {:6.2f}px ({:.2f}s)".format(name, np.mean(errors),
+                                                                          time.perf_counter() - start_time))
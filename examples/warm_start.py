@@ -0,0 +1,80 @@
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from evolution.camera import CameraGenomeParameters, CameraGenomeFactory, ObjGeometry, GeneticCameraAlgorithm, \
+    reprojection_errors, CameraLibrary, LibraryPopulation, CachedResult, run_with_library
+from evolution.strategies import ValueUniformPopulation, DistanceMapWithPunishment, DistanceMap, Tournament, \
+    TwoPoint, BoundedUniformMutation, MaxIteration, StrategyBundle
+from synthetic_squash_example import synthetic_target_dna, synthetic_target_edge_image
+
+if __name__ == '__main__':
+    # 1. Specify all parameters
+    image_shape = (image_height, image_width) = 600, 800
+    parameters_file = "data/synth/squash_parameters.json"
+    geometry_file = "data/synth/squash_court.obj"
+    library_file = os.path.join(tempfile.mkdtemp(), "cameras.sqlite")
+
+    genome_parameters = CameraGenomeParameters(parameters_file, image_shape)
+    geometry = ObjGeometry(geometry_file)
+    camera_genome_factory = CameraGenomeFactory(genome_parameters)
+    library = CameraLibrary(library_file)
+
+    # 2. Earlier calibrations of the venue: three camera mounts, stored with their edge images
+    mounts = [np.array([0, 0, 0, 0, 1.0, .3, .5, .05, .12, .05, 0, 0, 0, 0, 0]),
+              np.array([0, 0, 0, 0, -1.0, .2, .3, .04, -.12, -.04, 0, 0, 0, 0, 0]),
+              np.array([80, 80, 0, 0, 0, .5, -1.0, .10, 0, 0, 0, 0, 0, 0, 0])]
+    for i, mount in enumerate(mounts):
+        dna = synthetic_target_dna(image_shape) + mount
+        library.add(dna, 1.0, synthetic_target_edge_image(image_shape, geometry, camera_genome_factory.create(dna)),
+                    geometry, name="mount {}".format(i))
+
+    # 3. The first mount was moved slightly. The hand typed start camera is the default one
+    real_dna = synthetic_target_dna(image_shape) + mounts[0] + np.array([5, 5, 0, 0, .1, -.05, .2, .01, .01, 0,
+                                                                         0, 0, 0, 0, 0])
+    edge_image = synthetic_target_edge_image(image_shape, geometry, camera_genome_factory.create(real_dna))
+    start_dna = synthetic_target_dna(image_shape)
+
+    start_time = time.perf_counter()
+    priors = library.nearest(edge_image, geometry, k=2)
+    print("Lookup in {:.2f}ms".format(1000 * (time.perf_counter() - start_time)))
+    for prior in priors:
+        print("    {}: descriptor distance {:.4f}, reprojection error {:6.2f}px".format(
+            prior.name, prior.distance, reprojection_errors(real_dna, prior.dna, geometry.world_points).mean[0]))
+
+    # 4. Seed the population around the start dna or around the prior cameras
+    populate_strategies = {"ValueUniformPopulation": lambda: ValueUniformPopulation(32),
+                           "LibraryPopulation": lambda: LibraryPopulation(library, edge_image, geometry, 32, k=2)}
+    for name, populate_strategy in populate_strategies.items():
+        errors = []
+        for seed in range(5):
+            np.random.seed(seed)
+            random.seed(seed)
+            strategy_bundle = StrategyBundle(populate_strategy(),
+                                             DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3),
+                                             Tournament(4),
+                                             TwoPoint(),
+                                             BoundedUniformMutation(genome_parameters),
+                                             MaxIteration(50))
+            camera_algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, edge_image, geometry)
+            best_genome, best_fitness = camera_algorithm.run(start_dna).best_genome
+            errors.append(reprojection_errors(real_dna, best_genome.dna, geometry.world_points).mean[0])
+        print("{:>22}: mean reprojection error {:6.2f}px".format(name, np.mean(errors)))
+
+    # 5. Exact hits: the same image, geometry, bundle and start dna are not optimized again
+    strategy_bundle = StrategyBundle(LibraryPopulation(library, edge_image, geometry, 32, k=2),
+                                     DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3),
+                                     Tournament(4),
+                                     TwoPoint(),
+                                     BoundedUniformMutation(genome_parameters),
+                                     MaxIteration(50))
+    for _ in range(2):
+        camera_algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, edge_image, geometry)
+        start_time = time.perf_counter()
+        result = run_with_library(library, camera_algorithm, edge_image, geometry, strategy_bundle, start_dna)
+        print("{:>6} run in {:.3f}s".format("cached" if isinstance(result, CachedResult) else "new",
+                                            time.perf_counter() - start_time))
+    print("{} cameras in {}".format(len(library), library_file))
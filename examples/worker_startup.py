@@ -0,0 +1,55 @@
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from evolution.camera import worker_context, load_geometry, load_genome_parameters
+
+image_shape = (image_height, image_width) = 600, 800
+parameters_file = "data/synth/squash_parameters.json"
+geometry_file = "data/synth/squash_court.obj"
+n_workers = 4
+
+
+def short_job(seed: int) -> float:
+    """ A short job, e.g. a single evaluation batch: score 64 random cameras. """
+    from evolution.camera import PopulationScorer
+    genome_parameters = load_genome_parameters(parameters_file, image_shape)
+    geometry = load_geometry(geometry_file)
+    lower_bounds, upper_bounds = genome_parameters.genome_bounds
+    dna_stack = np.random.default_rng(seed).uniform(lower_bounds, upper_bounds, (64, genome_parameters.n_genes))
+    return float(PopulationScorer(np.ones(image_shape, dtype=np.float32), geometry).score(dna_stack).sum())
+
+
+def cold_start(method: str) -> float:
+    """ Seconds from creating a pool to the results of the first job of every worker. """
+    start_time = time.perf_counter()
+    if method == "preloaded forkserver":
+        context = worker_context("forkserver", [geometry_file], [(parameters_file, image_shape)])
+    elif method == "preloaded fork":
+        context = worker_context("fork", [geometry_file], [(parameters_file, image_shape)])
+    else:
+        context = worker_context(method, compile_kernels=False)
+    with context.Pool(n_workers) as pool:
+        pool.map(short_job, range(n_workers), chunksize=1)
+    return time.perf_counter() - start_time
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        print(cold_start(sys.argv[1]))
+        sys.exit()
+
+    # 1. Importing the package: a single name only imports its submodule
+    for statement in ["import evolution.camera", "from evolution.camera import ObjGeometry",
+                      "from evolution.camera import *; from evolution.strategies import *"]:
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        print("{:>64}: {:.3f}s (with interpreter startup)".format(statement, time.perf_counter() - start_time))
+
+    # 2. Cold start of a pool with short jobs. Every start method in a fresh process, a forkserver can not be restarted
+    for method in ["spawn", "forkserver", "preloaded forkserver", "fork", "preloaded fork"]:
+        times = [float(subprocess.run([sys.executable, __file__, method], check=True, capture_output=True,
+                                      text=True).stdout) for _ in range(3)]
+        print("{:>20}: {} workers ready and done after {:.3f}s (best of 3)".format(method, n_workers, min(times)))
@@ -8,5 +8,8 @@ setup(
     license='',
     author='sudochris',
     author_email='',
-    description='basic evolutionary algorithm for camera resectioning'
+    description='basic evolutionary algorithm for camera resectioning',
+    extras_require={
+        'jit': ['numba'],
+    }
 )
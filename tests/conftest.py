@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+import pytest
+
+from evolution.camera.camera_genome_factory import CameraGenomeFactory
+from evolution.camera.camera_genome_parameters import CameraGenomeParameters
+from evolution.camera.camera_rendering import render_geometry_with_camera
+from evolution.camera.camera_translator import CameraTranslator
+from evolution.camera.object_geometry import ObjGeometry
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(__file__), os.pardir, "examples", "data", "synth")
+PARAMETERS_FILE = os.path.join(DATA_DIRECTORY, "squash_parameters.json")
+GEOMETRY_FILE = os.path.join(DATA_DIRECTORY, "squash_court.obj")
+IMAGE_SHAPE = (600, 800)
+
+
+@pytest.fixture(scope="session")
+def genome_parameters():
+    return CameraGenomeParameters(PARAMETERS_FILE, IMAGE_SHAPE)
+
+
+@pytest.fixture(scope="session")
+def geometry():
+    return ObjGeometry(GEOMETRY_FILE)
+
+
+@pytest.fixture(scope="session")
+def real_dna():
+    # The camera of examples/synthetic_squash_example.py
+    return np.array([700, 700, 400, 300, 0.00, 2.35, 8.40, 0.29, 0, 0, 0, 0, 0, 0, 0], dtype=np.float64)
+
+
+@pytest.fixture(scope="session")
+def start_dna(real_dna):
+    return real_dna + np.array([40, 40, 10, 10, .2, .1, .3, .03, .01, 0, 0, 0, 0, 0, 0])
+
+
+@pytest.fixture(scope="session")
+def edge_image(genome_parameters, geometry, real_dna):
+    edge_image = np.zeros(IMAGE_SHAPE, dtype=np.uint8)
+    genome = CameraGenomeFactory(genome_parameters).create(real_dna)
+    A, t, r, d = CameraTranslator().translate_genome(genome)
+    render_geometry_with_camera(edge_image, geometry, A, t, r, d, (255,))
+    return edge_image
+
+
+@pytest.fixture(autouse=True)
+def seeded():
+    np.random.seed(0)
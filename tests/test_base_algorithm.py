@@ -0,0 +1,106 @@
+from evolution.base.base_geometry import geometry_levels
+from evolution.base.base_strategies import RestartStrategy
+from evolution.base.base_surrogate_evaluation import SurrogateEvaluation
+from evolution.camera.camera_algorithm import GeneticCameraAlgorithm
+from evolution.strategies.crossover import TwoPoint
+from evolution.strategies.detail import GenerationDetail
+from evolution.strategies.fitness import DistanceMapWithPunishment, DistanceMap
+from evolution.strategies.mutation import BoundedUniformMutation
+from evolution.strategies.populate import ValueUniformPopulation
+from evolution.strategies.restart import IPOPRestart
+from evolution.strategies.selection import Tournament
+from evolution.strategies.strategy_bundle import StrategyBundle
+from evolution.strategies.surrogate import KNearestNeighbours
+from evolution.strategies.termination import MaxEvaluations, MaxIteration, NoImprovement
+
+
+class _RecordingRestart(RestartStrategy):
+    def __init__(self) -> None:
+        super().__init__()
+        self.n_resets = 0
+        self.n_runs = 0
+
+    def should_restart(self, current_generation: int, best_fitness: float, n_evaluations: int) -> bool:
+        return False
+
+    def restart(self, genome_factory, best_genome):
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        self.n_resets += 1
+
+    def start_run(self) -> None:
+        self.n_runs += 1
+
+    def printable_identifier(self):
+        return "RecordingRestart"
+
+
+def _algorithm(genome_parameters, geometry, edge_image, termination_strategy, **kwargs):
+    strategy_bundle = StrategyBundle(ValueUniformPopulation(64),
+                                     DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3),
+                                     Tournament(4),
+                                     TwoPoint(),
+                                     BoundedUniformMutation(genome_parameters),
+                                     termination_strategy)
+    return GeneticCameraAlgorithm(genome_parameters, strategy_bundle, edge_image, geometry, **kwargs)
+
+
+def test_evaluation_budget_spans_level_switches(genome_parameters, geometry, edge_image, start_dna):
+    algorithm = _algorithm(genome_parameters, geometry, edge_image, MaxEvaluations(2000),
+                           geometry_levels=geometry_levels(geometry, (0.5, 1.0)),
+                           detail_schedule=GenerationDetail([3, 6]), scoring_backend="numpy")
+    for _ in range(2):
+        n_evaluations = algorithm.n_evaluations
+        result = algorithm.run(start_dna)
+        assert algorithm.n_evaluations - n_evaluations == 2048
+        assert result.n_generations == 32
+
+
+def test_evaluation_budget_counts_true_evaluations(genome_parameters, geometry, edge_image, start_dna):
+    surrogate_evaluation = SurrogateEvaluation(KNearestNeighbours(), fraction=0.25, exploration=0.0, n_warmup=64)
+    algorithm = _algorithm(genome_parameters, geometry, edge_image, MaxEvaluations(1000),
+                           evaluation_backend=surrogate_evaluation)
+    result = algorithm.run(start_dna)
+    accuracy = surrogate_evaluation.accuracy
+    assert algorithm.n_evaluations == accuracy.n_true_evaluations
+    assert accuracy.n_skipped > 0
+    # Only true evaluations use up the budget, so the run lasts longer than 1000 / 64 generations
+    assert result.n_generations > 16
+
+
+def test_restart_budget_is_per_run(genome_parameters, geometry, edge_image, start_dna):
+    restart_strategy = IPOPRestart(NoImprovement(5), evaluation_budget=1000)
+    algorithm = _algorithm(genome_parameters, geometry, edge_image, MaxIteration(1000), scoring_backend="numpy",
+                           restart_strategy=restart_strategy)
+    for _ in range(2):
+        n_evaluations = algorithm.n_evaluations
+        algorithm.run(start_dna)
+        # Every run spends its budget, up to a generation of the enlarged population (at most 256 genomes)
+        assert 1000 - 256 < algorithm.n_evaluations - n_evaluations <= 1000
+
+
+def test_restart_count_is_per_run(genome_parameters, geometry, edge_image, start_dna):
+    restart_strategy = IPOPRestart(NoImprovement(1), max_restarts=1)
+    algorithm = _algorithm(genome_parameters, geometry, edge_image, MaxIteration(20), scoring_backend="numpy",
+                           restart_strategy=restart_strategy)
+    restarts = []
+    restart = restart_strategy.restart
+    restart_strategy.restart = lambda *args: restarts.append(1) or restart(*args)
+    for n_runs in range(1, 3):
+        algorithm.run(start_dna)
+        # max_restarts restarts in every run
+        assert len(restarts) == n_runs
+        assert restart_strategy.n_restarts == 1
+
+
+def test_level_switches_reset_the_restart_strategy(genome_parameters, geometry, edge_image, start_dna):
+    restart_strategy = _RecordingRestart()
+    algorithm = _algorithm(genome_parameters, geometry, edge_image, MaxIteration(10),
+                           geometry_levels=geometry_levels(geometry, (0.5, 1.0)),
+                           detail_schedule=GenerationDetail([3, 6]), scoring_backend="numpy",
+                           restart_strategy=restart_strategy)
+    algorithm.run(start_dna)
+    assert algorithm.level == 1
+    assert restart_strategy.n_resets == 1
+    assert restart_strategy.n_runs == 1
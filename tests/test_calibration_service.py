@@ -0,0 +1,47 @@
+import random
+
+import cv2 as cv
+import numpy as np
+
+from conftest import PARAMETERS_FILE, GEOMETRY_FILE, IMAGE_SHAPE
+from evolution.camera.camera_algorithm import GeneticCameraAlgorithm
+from evolution.camera.camera_kernels import PopulationScorer
+from evolution.service.calibration_service import CalibrationService, CalibrationRequest
+from evolution.strategies.crossover import TwoPoint
+from evolution.strategies.fitness import DistanceMap, DistanceMapWithPunishment
+from evolution.strategies.mutation import BoundedUniformMutation
+from evolution.strategies.populate import ValueUniformPopulation
+from evolution.strategies.selection import Tournament
+from evolution.strategies.strategy_bundle import StrategyBundle
+from evolution.strategies.termination import MaxIteration
+
+
+def test_service_matches_population_scorer_algorithm(tmp_path, genome_parameters, geometry, edge_image, start_dna):
+    edge_image_file = str(tmp_path / "edges.png")
+    cv.imwrite(edge_image_file, edge_image)
+    request = CalibrationRequest(PARAMETERS_FILE, IMAGE_SHAPE, GEOMETRY_FILE, edge_image_file, start_dna,
+                                 population_size=16, max_iterations=20)
+    service = CalibrationService(n_workers=1)
+    try:
+        np.random.seed(1)
+        random.seed(1)
+        result = service.calibrate(request)
+    finally:
+        service.shutdown()
+
+    strategy_bundle = StrategyBundle(ValueUniformPopulation(16),
+                                     DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3),
+                                     Tournament(4),
+                                     TwoPoint(),
+                                     BoundedUniformMutation(genome_parameters),
+                                     MaxIteration(20))
+    camera_algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, edge_image, geometry,
+                                              scoring_backend="auto")
+    np.random.seed(1)
+    random.seed(1)
+    best_genome, best_fitness = camera_algorithm.run(start_dna).best_genome
+
+    np.testing.assert_array_equal(result["best_dna"], best_genome.dna)
+    assert result["best_fitness"] == best_fitness
+    fitness_map = strategy_bundle.fitness_strategy.create_fitness(edge_image)
+    assert PopulationScorer(fitness_map, geometry).score(np.array(result["best_dna"]))[0] == best_fitness
@@ -0,0 +1,50 @@
+import pytest
+
+from evolution.base.base_evaluation import SerialEvaluation
+from evolution.base.base_steady_state import SteadyStateEvolution
+from evolution.camera.camera_algorithm import GeneticCameraAlgorithm
+from evolution.strategies.crossover import TwoPoint
+from evolution.strategies.fitness import DistanceMapWithPunishment, DistanceMap
+from evolution.strategies.mutation import BoundedUniformMutation
+from evolution.strategies.populate import ValueUniformPopulation
+from evolution.strategies.selection import Tournament
+from evolution.strategies.strategy_bundle import StrategyBundle
+from evolution.strategies.termination import MaxIteration
+
+
+def _strategy_bundle(genome_parameters) -> StrategyBundle:
+    return StrategyBundle(ValueUniformPopulation(16),
+                          DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3),
+                          Tournament(4),
+                          TwoPoint(),
+                          BoundedUniformMutation(genome_parameters),
+                          MaxIteration(2))
+
+
+@pytest.mark.parametrize("kwargs", [{"scoring_backend": "numpy"}, {"early_exit": True}])
+def test_evaluation_backend_is_not_ignored(kwargs, genome_parameters, geometry, edge_image):
+    with pytest.raises(ValueError):
+        GeneticCameraAlgorithm(genome_parameters, _strategy_bundle(genome_parameters), edge_image, geometry,
+                               evaluation_backend=SerialEvaluation(), **kwargs)
+
+
+def test_early_exit_is_not_ignored_by_the_scoring_backend(genome_parameters, geometry, edge_image):
+    with pytest.raises(ValueError):
+        GeneticCameraAlgorithm(genome_parameters, _strategy_bundle(genome_parameters), edge_image, geometry,
+                               scoring_backend="numpy", early_exit=True)
+
+
+@pytest.mark.parametrize("kwargs", [{"scoring_backend": "numpy"}, {"early_exit": True}])
+def test_steady_state_evolution_is_not_ignored(kwargs, genome_parameters, geometry, edge_image):
+    algorithm = GeneticCameraAlgorithm(genome_parameters, _strategy_bundle(genome_parameters), edge_image, geometry,
+                                       **kwargs)
+    with pytest.raises(ValueError):
+        SteadyStateEvolution(algorithm)
+
+
+def test_steady_state_evolution_counts_and_tracks_the_best(genome_parameters, geometry, edge_image, start_dna):
+    algorithm = GeneticCameraAlgorithm(genome_parameters, _strategy_bundle(genome_parameters), edge_image, geometry)
+    result = SteadyStateEvolution(algorithm).run(start_dna)
+    best_genome, best_fitness = result.best_genome
+    assert algorithm.best_fitness == best_fitness == algorithm.fitness(best_genome)
+    assert algorithm.n_evaluations >= 16
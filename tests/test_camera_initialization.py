@@ -0,0 +1,27 @@
+import numpy as np
+
+from evolution.camera.camera_genome_factory import CameraGenomeFactory
+from evolution.camera.camera_initialization import _Chamfer
+from evolution.camera.camera_rendering import project_segments
+from evolution.camera.camera_translator import CameraTranslator
+
+
+def test_chamfer_measures_edges_against_the_projected_segments(genome_parameters, geometry, edge_image, real_dna,
+                                                               start_dna):
+    chamfer = _Chamfer(edge_image, geometry, 10, 20.0)
+    camera = CameraTranslator().translate_genome(CameraGenomeFactory(genome_parameters).create(start_dna))
+    segments, _ = project_segments(geometry, *camera, chamfer.width, chamfer.height)
+
+    # Densely sampled segments as the reference
+    alphas = np.linspace(0, 1, 1000)[None, :, None]
+    points = (segments[:, None, 0] + alphas * (segments[:, None, 1] - segments[:, None, 0])).reshape(-1, 2)
+    expected = np.array([np.min(np.linalg.norm(points - sample, axis=1)) for sample in chamfer.edge_samples])
+    np.testing.assert_allclose(chamfer._segment_distances(segments), expected, atol=.5)
+
+    # The target camera is closer to the edges than the start camera
+    distances = []
+    for dna in (real_dna, start_dna):
+        camera_matrix, t_vector, r_vector, d_vector = CameraTranslator().translate_genome(
+            CameraGenomeFactory(genome_parameters).create(dna))
+        distances.append(chamfer.distance(camera_matrix, r_vector, t_vector, d_vector))
+    assert distances[0] < 1.0 < distances[1]
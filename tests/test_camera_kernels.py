@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from evolution.camera.camera_genome_factory import CameraGenomeFactory
+from evolution.camera.camera_kernels import PopulationScorer, NUMBA_AVAILABLE, rotation_matrices, \
+    _score_population_loop
+from evolution.camera.camera_scorer import CameraScorer
+from evolution.camera.camera_translator import CameraTranslator
+from evolution.strategies.fitness import DistanceMap, DistanceMapWithPunishment, OrientedDistanceMap
+
+backends = ["numpy", "numba"] if NUMBA_AVAILABLE else ["numpy"]
+
+
+@pytest.fixture(scope="module")
+def dna_stack(real_dna):
+    offsets = np.array([[0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+                        [40, 40, 10, 10, .2, .1, .3, .03, .01, 0, 0, 0, 0, 0, 0],
+                        [-60, -50, -20, 15, -.3, .2, -.5, -.05, .04, .02, 0, 0, 0, 0, 0],
+                        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, .05, -.02, .001, -.001, .01],
+                        # Most of the court outside of the image
+                        [200, 200, 300, -250, 3, -1, 2, .4, .5, .3, 0, 0, 0, 0, 0]])
+    return real_dna + offsets
+
+
+def _loop_scores(fitness_map: np.array, geometry, dna_stack: np.array, n_bins: int = 0) -> np.array:
+    # The plain Python loop, which numba compiles (the fallback, if numba is not installed)
+    fitness_map = np.ascontiguousarray(fitness_map, dtype=np.float32).reshape(np.shape(fitness_map)[:2] + (-1,))
+    rotations = rotation_matrices(dna_stack[:, 7:10]).reshape(-1, 9)
+    stamps = np.zeros(fitness_map.shape[:2], dtype=np.int64)
+    return _score_population_loop(dna_stack, rotations, np.asarray(geometry.world_points, dtype=np.float64),
+                                  geometry.segments, fitness_map, stamps, 1, n_bins, 1e-3)[0][:, 0]
+
+
+@pytest.mark.parametrize("backend", backends)
+def test_backends_agree_with_python_loop(backend, geometry, edge_image, dna_stack):
+    fitness_map = DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3).create_fitness(edge_image)
+    expected = _loop_scores(fitness_map, geometry, dna_stack)
+    scores = PopulationScorer(fitness_map, geometry, backend).score(dna_stack)
+    np.testing.assert_allclose(scores, expected, rtol=1e-9)
+    # The target camera scores better than the perturbed ones
+    assert scores[0] > max(scores[1], scores[2], scores[4])
+
+
+@pytest.mark.parametrize("backend", backends)
+def test_oriented_backends_agree_with_python_loop(backend, geometry, edge_image, dna_stack):
+    fitness_strategy = OrientedDistanceMap(DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3), 4)
+    fitness_map = fitness_strategy.create_fitness(edge_image)
+    expected = _loop_scores(fitness_map, geometry, dna_stack, 4)
+    scores = PopulationScorer(fitness_map, geometry, backend, n_orientation_bins=4).score(dna_stack)
+    np.testing.assert_allclose(scores, expected, rtol=1e-9)
+
+
+@pytest.mark.parametrize("backend", backends)
+def test_stacked_maps_score_every_frame(backend, geometry, edge_image, dna_stack):
+    fitness_map = DistanceMap().create_fitness(edge_image)
+    stacked_map = np.stack([fitness_map, 0.5 * fitness_map], axis=2)
+    scores = PopulationScorer(fitness_map, geometry, backend).score(dna_stack)
+    stacked_scores = PopulationScorer(stacked_map, geometry, backend).score(dna_stack)
+    np.testing.assert_allclose(stacked_scores, 0.75 * scores, rtol=1e-6)
+
+
+@pytest.mark.parametrize("backend", backends)
+def test_cameras_behind_the_geometry_are_culled(backend, geometry, edge_image, real_dna, genome_parameters):
+    fitness_map = DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3).create_fitness(edge_image)
+    # Moved towards the court: the same camera, with a part (tz = 0.5, 0) or all (tz = -9.1) of the court behind it
+    dna_stack = np.repeat(real_dna[None], 5, axis=0)
+    dna_stack[:, 6] = [8.4, 2.0, 0.5, 0.0, -9.1]
+    population_scorer = PopulationScorer(fitness_map, geometry, backend)
+    scores = population_scorer.score(dna_stack)
+    np.testing.assert_allclose(scores[:4], _loop_scores(fitness_map, geometry, dna_stack)[:4], rtol=1e-9)
+    assert np.all(scores[4] == -np.inf)
+    assert population_scorer.n_culled == 1
+    assert PopulationScorer(fitness_map, geometry, backend, culled_fitness=-1.0).score(dna_stack)[4] == -1.0
+
+    # Partially visible geometries are cut at the near plane and clipped to the image like by CameraScorer
+    camera_scorer = CameraScorer(fitness_map, geometry, CameraTranslator(), line_thickness=1)
+    factory = CameraGenomeFactory(genome_parameters)
+    camera_scores = np.array([camera_scorer.score(factory.create(dna)) for dna in dna_stack])
+    assert camera_scores[4] == -np.inf
+    np.testing.assert_allclose(scores[:4], camera_scores[:4], rtol=1e-5)
+
+
+@pytest.mark.parametrize("backend", backends)
+def test_geometries_outside_of_the_image_are_culled(backend, geometry, edge_image, real_dna):
+    fitness_map = DistanceMap().create_fitness(edge_image)
+    # Looking away from the court, which is still in front of the camera
+    dna_stack = real_dna[None].copy()
+    dna_stack[0, 2] += 5000
+    population_scorer = PopulationScorer(fitness_map, geometry, backend)
+    assert population_scorer.score(dna_stack)[0] == -np.inf
+    assert population_scorer.n_culled == 1
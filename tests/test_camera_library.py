@@ -0,0 +1,31 @@
+import numpy as np
+
+from evolution.camera.camera_library import bundle_hash
+from evolution.strategies.crossover import TwoPoint, Uniform
+from evolution.strategies.fitness import DistanceMapWithPunishment, DistanceMap
+from evolution.strategies.mutation import BoundedUniformMutation
+from evolution.strategies.populate import ValueUniformPopulation
+from evolution.strategies.selection import Tournament
+from evolution.strategies.strategy_bundle import StrategyBundle
+from evolution.strategies.termination import MaxIteration
+
+
+def _bundle(genome_parameters, fitness_strategy, crossover_strategy=None):
+    return StrategyBundle(ValueUniformPopulation(16), fitness_strategy, Tournament(4), crossover_strategy or TwoPoint(),
+                          BoundedUniformMutation(genome_parameters), MaxIteration(10))
+
+
+def test_bundle_hash_ignores_speed_parameters(genome_parameters, start_dna):
+    serial = DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3)
+    tiled = DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3, tile_size=256, n_workers=4)
+    assert bundle_hash(_bundle(genome_parameters, serial), genome_parameters, start_dna) == \
+        bundle_hash(_bundle(genome_parameters, tiled), genome_parameters, start_dna)
+
+
+def test_bundle_hash_distinguishes_result_parameters(genome_parameters, start_dna):
+    hashes = {bundle_hash(_bundle(genome_parameters, DistanceMapWithPunishment(DistanceMap.DistanceType.L2, log_div),
+                                  crossover_strategy), genome_parameters, start_dna)
+              for log_div in [.1, .3] for crossover_strategy in [Uniform(0.3), Uniform(0.5)]}
+    assert len(hashes) == 4
+    assert bundle_hash(_bundle(genome_parameters, DistanceMap()), genome_parameters, start_dna) != \
+        bundle_hash(_bundle(genome_parameters, DistanceMap()), genome_parameters, start_dna + np.eye(15)[0])
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from evolution.camera.camera_algorithm import GeneticCameraAlgorithm
+from evolution.camera.camera_genome_factory import CameraGenomeFactory
+from evolution.camera.camera_scorer import CameraScorer
+from evolution.camera.camera_translator import CameraTranslator
+from evolution.strategies.crossover import TwoPoint
+from evolution.strategies.fitness import DistanceMapWithPunishment, DistanceMap, OrientedDistanceMap
+from evolution.strategies.mutation import BoundedUniformMutation
+from evolution.strategies.populate import ValueUniformPopulation
+from evolution.strategies.selection import Tournament
+from evolution.strategies.strategy_bundle import StrategyBundle
+from evolution.strategies.termination import MaxIteration
+
+
+def _perturbed_genomes(genome_parameters, real_dna, n_genomes: int, relative_scale: float = .05):
+    lower_bounds, upper_bounds = genome_parameters.genome_bounds
+    factory = CameraGenomeFactory(genome_parameters)
+    scale = relative_scale * (upper_bounds - lower_bounds)
+    return [factory.create(real_dna + np.random.normal(0, scale)) for _ in range(n_genomes)]
+
+
+@pytest.mark.parametrize("n_orientation_bins", [None, 4])
+def test_bounded_scores_are_complete_or_below_the_threshold(n_orientation_bins, genome_parameters, geometry,
+                                                            edge_image, real_dna):
+    fitness_strategy = DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3)
+    if n_orientation_bins is not None:
+        fitness_strategy = OrientedDistanceMap(fitness_strategy, n_orientation_bins)
+    camera_scorer = CameraScorer(fitness_strategy.create_fitness(edge_image), geometry, CameraTranslator(),
+                                 n_orientation_bins=n_orientation_bins)
+    genomes = _perturbed_genomes(genome_parameters, real_dna, 100)
+    threshold = camera_scorer.score(CameraGenomeFactory(genome_parameters).create(real_dna)) * .9
+
+    n_partial = 0
+    for genome in genomes:
+        bounded_score, is_partial = camera_scorer.score_bounded(genome, threshold)
+        score = camera_scorer.score(genome)
+        if is_partial:
+            n_partial += 1
+            assert score < threshold
+            assert abs(bounded_score) <= camera_scorer.score_bound
+        else:
+            assert bounded_score == pytest.approx(score, rel=1e-9, abs=1e-6)
+    assert 0 < n_partial < len(genomes)
+    assert camera_scorer.n_partial_scores == n_partial
+
+
+def test_partial_scores_rank_below_complete_scores(genome_parameters, geometry, edge_image, real_dna):
+    strategy_bundle = StrategyBundle(ValueUniformPopulation(16),
+                                     DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3),
+                                     Tournament(4),
+                                     TwoPoint(),
+                                     BoundedUniformMutation(genome_parameters),
+                                     MaxIteration(2))
+    algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, edge_image, geometry, early_exit=True)
+    population = [CameraGenomeFactory(genome_parameters).create(real_dna)]
+    population += _perturbed_genomes(genome_parameters, real_dna, 63, .2)
+    complete_scores = np.array([algorithm.fitness(genome) for genome in population])
+    algorithm._survivor_fitness = np.sort(complete_scores)[-8]
+
+    scores = np.array(algorithm.evaluate_population(population))
+    is_partial = scores != complete_scores
+    is_complete = ~is_partial & np.isfinite(scores)
+    assert np.any(is_partial) and np.any(is_complete)
+    # Every finite complete score, even the ones below the threshold, ranks above every partial score
+    assert scores[is_partial].max() < scores[is_complete].min()
+    assert np.all(complete_scores[is_partial] < algorithm._survivor_fitness)
@@ -0,0 +1,42 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import GEOMETRY_FILE
+
+# The forkserver of a process can not be restarted, so every check runs in a fresh interpreter
+SCRIPT = """
+import os
+import subprocess
+import sys
+
+from evolution.camera import camera_workers
+from evolution.camera.camera_workers import worker_context, PRELOAD_ENVIRONMENT
+
+
+def worker_state():
+    return sorted(key[0] for key in camera_workers._shared), os.environ.get(PRELOAD_ENVIRONMENT)
+
+
+if __name__ == '__main__':
+    context = worker_context("forkserver", [sys.argv[1]], compile_kernels=False)
+    print(os.environ.get(PRELOAD_ENVIRONMENT))
+    with context.Pool(1) as pool:
+        print(pool.apply(worker_state))
+    child = "import os; print(os.environ.get({!r}))".format(PRELOAD_ENVIRONMENT)
+    print(subprocess.run([sys.executable, "-c", child], capture_output=True, text=True, check=True).stdout.strip())
+"""
+
+
+@pytest.mark.skipif("forkserver" not in multiprocessing.get_all_start_methods(), reason="forkserver not available")
+def test_forkserver_preload_does_not_leak_into_the_environment(tmp_path):
+    script_file = tmp_path / "forkserver_preload.py"
+    script_file.write_text(SCRIPT)
+    environment = dict(os.environ, PYTHONPATH=os.path.join(os.path.dirname(__file__), os.pardir))
+    output = subprocess.run([sys.executable, str(script_file), GEOMETRY_FILE], capture_output=True, text=True,
+                            check=True, env=environment).stdout.splitlines()
+    # Neither this process, nor the workers or other children keep the variable, but the workers are preloaded
+    assert output == ["None", "(['geometry'], None)", "None"]
@@ -0,0 +1,69 @@
+import multiprocessing
+import time
+
+import numpy as np
+
+from evolution.base.base_evaluation import SerialEvaluation
+from evolution.camera.camera_algorithm import GeneticCameraAlgorithm
+from evolution.camera.camera_genome_factory import CameraGenomeFactory
+from evolution.distributed import DistributedEvaluation, run_worker
+from evolution.strategies.crossover import TwoPoint
+from evolution.strategies.fitness import DistanceMapWithPunishment, DistanceMap
+from evolution.strategies.mutation import BoundedUniformMutation
+from evolution.strategies.populate import ValueUniformPopulation
+from evolution.strategies.selection import Tournament
+from evolution.strategies.strategy_bundle import StrategyBundle
+from evolution.strategies.termination import MaxIteration
+
+
+class _SlowAlgorithm(GeneticCameraAlgorithm):
+    # Keeps batches in flight long enough to kill a worker in the middle of one
+    def fitness(self, genome) -> float:
+        time.sleep(0.05)
+        return super().fitness(genome)
+
+
+def _wait_until(condition, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_batches_of_killed_workers_are_redispatched(genome_parameters, geometry, edge_image, start_dna):
+    strategy_bundle = StrategyBundle(ValueUniformPopulation(24),
+                                     DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3),
+                                     Tournament(4),
+                                     TwoPoint(),
+                                     BoundedUniformMutation(genome_parameters),
+                                     MaxIteration(1))
+    algorithm = _SlowAlgorithm(genome_parameters, strategy_bundle, edge_image, geometry)
+    population = strategy_bundle.populate_strategy.populate(CameraGenomeFactory(genome_parameters), start_dna)
+
+    serial_evaluation = SerialEvaluation()
+    serial_evaluation.start(algorithm)
+    expected_fitness = serial_evaluation.evaluate(population)
+
+    # Fresh interpreters, forked workers would inherit the coordinator's threads
+    context = multiprocessing.get_context("spawn")
+    with DistributedEvaluation("127.0.0.1", 0, batch_size=4, heartbeat_timeout=10.0) as evaluation:
+        host, port = evaluation.address
+        workers = [context.Process(target=run_worker, args=(host, port, 0.5)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        try:
+            assert evaluation.wait_for_workers(len(workers), timeout=60.0)
+            evaluation.start(algorithm)
+            futures = [evaluation.submit(genome) for genome in population]
+
+            # Every worker evaluates a batch, so the killed worker loses at least one
+            _wait_until(lambda: all(worker.batches for worker in evaluation._workers.values()))
+            workers[0].kill()
+            fitness = [future.result(timeout=60.0) for future in futures]
+            assert evaluation.n_redispatched >= 1
+            assert evaluation.n_workers == len(workers) - 1
+        finally:
+            for worker in workers:
+                worker.kill()
+                worker.join()
+    np.testing.assert_array_equal(fitness, expected_fitness)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from evolution.preprocessing.incremental_distance_map import IncrementalDistanceMap
+from evolution.strategies.fitness import DistanceMap, DistanceMapWithPunishment
+
+
+@pytest.mark.parametrize("fitness_strategy", [DistanceMap(),
+                                              DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3)])
+def test_fitness_from_distances_keeps_the_distances(fitness_strategy, edge_image):
+    distances = fitness_strategy.create_distances(edge_image)
+    original_distances = distances.copy()
+    fitness_map = fitness_strategy.fitness_from_distances(distances, 100.0)
+    np.testing.assert_array_equal(distances, original_distances)
+    # Several normalizations of the same distances
+    np.testing.assert_array_equal(fitness_strategy.fitness_from_distances(distances, 100.0), fitness_map)
+    assert not np.array_equal(fitness_strategy.fitness_from_distances(distances, 200.0), fitness_map)
+    np.testing.assert_array_equal(fitness_strategy.fitness_from_distances(distances, float(distances.max())),
+                                  fitness_strategy.create_fitness(edge_image))
+
+
+def test_tiled_and_incremental_maps_equal_the_full_map(edge_image):
+    fitness_strategy = DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3)
+    full_map = fitness_strategy.create_fitness(edge_image)
+    tiled_strategy = DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3, tile_size=128, n_workers=2)
+    np.testing.assert_array_equal(tiled_strategy.create_fitness(edge_image), full_map)
+
+    incremental_map = IncrementalDistanceMap(fitness_strategy, tile_size=64)
+    incremental_map.update(edge_image)
+    changed_image = edge_image.copy()
+    changed_image[100:140, 200:300] = 0
+    incremental_map.update(changed_image)
+    assert incremental_map.recomputed_fraction < 1.0
+    reference_map = fitness_strategy.fitness_from_distances(fitness_strategy.create_distances(changed_image),
+                                                            incremental_map.max_distance)
+    np.testing.assert_array_equal(incremental_map.fitness_map, reference_map)
+
+
+@pytest.mark.parametrize("fitness_strategy", [DistanceMap(),
+                                              DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3)])
+def test_edge_only_images_have_the_best_fitness_everywhere(fitness_strategy):
+    edge_image = np.full((60, 80), 255, dtype=np.uint8)
+    expected = np.ones(edge_image.shape, dtype=np.float32)
+    np.testing.assert_array_equal(fitness_strategy.create_fitness(edge_image), expected)
+
+    tiled_strategy = type(fitness_strategy)(DistanceMap.DistanceType.L2, .3, tile_size=32, n_workers=2)
+    np.testing.assert_array_equal(tiled_strategy.create_fitness(edge_image), expected)
+
+    incremental_map = IncrementalDistanceMap(fitness_strategy, tile_size=32)
+    incremental_map.update(edge_image)
+    np.testing.assert_array_equal(incremental_map.fitness_map, expected)
+    # Pixels, which are not on an edge anymore, saturate at the reference distance 0
+    changed_image = edge_image.copy()
+    changed_image[10:20, 10:20] = 0
+    incremental_map.update(changed_image)
+    assert np.all(np.isfinite(incremental_map.fitness_map))
+    saturated_fitness = fitness_strategy.fitness_from_distances(np.float32([1e6]), 1.0)[0]
+    assert np.all(incremental_map.fitness_map[12:18, 12:18] == saturated_fitness)
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from conftest import PARAMETERS_FILE, IMAGE_SHAPE
+from evolution.camera.camera_genome_factory import CameraGenomeFactory
+from evolution.camera.camera_rendering import render_geometry_with_camera
+from evolution.camera.camera_translator import CameraTranslator
+from evolution.camera.multi_view import MultiViewCameraAlgorithm, MultiViewGenomeParameters, INTRINSIC_GENES
+from evolution.strategies.crossover import BlockUniform
+from evolution.strategies.fitness import DistanceMapWithPunishment, DistanceMap
+from evolution.strategies.mutation import BoundedUniformMutation
+from evolution.strategies.populate import ValueUniformPopulation
+from evolution.strategies.selection import Tournament
+from evolution.strategies.strategy_bundle import StrategyBundle
+from evolution.strategies.termination import MaxIteration
+
+MOUNTS = np.array([[0, 0, 0, 0, 1.0, .3, .5, .05, .12, .05, 0, 0, 0, 0, 0],
+                   [0, 0, 0, 0, -1.0, .2, .3, .04, -.12, -.04, 0, 0, 0, 0, 0]])
+
+
+@pytest.fixture(scope="module")
+def multi_view_parameters():
+    return MultiViewGenomeParameters(PARAMETERS_FILE, IMAGE_SHAPE, n_views=len(MOUNTS))
+
+
+def test_blocks_split_and_combine(multi_view_parameters, real_dna):
+    camera_dna = real_dna + MOUNTS
+    dna = multi_view_parameters.combine_dna(camera_dna)
+    np.testing.assert_allclose(multi_view_parameters.split_dna(dna), camera_dna)
+
+    blocks = multi_view_parameters.blocks
+    assert [len(block) for block in blocks] == [9, 6, 6]
+    np.testing.assert_array_equal(np.concatenate(blocks), np.arange(len(dna)))
+    np.testing.assert_allclose(dna[blocks[0]], real_dna[INTRINSIC_GENES])
+
+
+def test_block_crossover_exchanges_whole_blocks(multi_view_parameters):
+    factory = CameraGenomeFactory(multi_view_parameters)
+    lower_bounds, upper_bounds = multi_view_parameters.genome_bounds
+    genome_a, genome_b = (factory.create(np.random.uniform(lower_bounds, upper_bounds)) for _ in range(2))
+    crossover = BlockUniform(multi_view_parameters.blocks)
+
+    n_exchanged = 0
+    for _ in range(20):
+        child_a, child_b = crossover.crossover(factory, genome_a, genome_b)
+        for block in multi_view_parameters.blocks:
+            exchanged = np.array_equal(child_a.dna[block], genome_b.dna[block])
+            parent_a, parent_b = (genome_b, genome_a) if exchanged else (genome_a, genome_b)
+            np.testing.assert_array_equal(child_a.dna[block], parent_a.dna[block])
+            np.testing.assert_array_equal(child_b.dna[block], parent_b.dna[block])
+            n_exchanged += exchanged
+    assert 0 < n_exchanged < 20 * len(multi_view_parameters.blocks)
+
+
+def test_joint_run_shares_the_intrinsics(multi_view_parameters, genome_parameters, geometry, real_dna):
+    edge_images = []
+    for camera_dna in real_dna + MOUNTS:
+        edge_image = np.zeros(IMAGE_SHAPE, dtype=np.uint8)
+        A, t, r, d = CameraTranslator().translate_genome(CameraGenomeFactory(genome_parameters).create(camera_dna))
+        render_geometry_with_camera(edge_image, geometry, A, t, r, d, (255,))
+        edge_images.append(edge_image)
+
+    strategy_bundle = StrategyBundle(ValueUniformPopulation(16, multi_view_parameters.random_range()),
+                                     DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3),
+                                     Tournament(4),
+                                     BlockUniform(multi_view_parameters.blocks),
+                                     BoundedUniformMutation(multi_view_parameters),
+                                     MaxIteration(10))
+    algorithm = MultiViewCameraAlgorithm(multi_view_parameters, strategy_bundle, edge_images, geometry,
+                                         scoring_backend="numpy", n_workers=2)
+    start_dna = multi_view_parameters.combine_dna(real_dna + MOUNTS + [20, 20, 5, 5, .1, .1, .2, .02, .02, 0,
+                                                                       0, 0, 0, 0, 0])
+    best_genome, best_fitness = algorithm.run(start_dna).best_genome
+
+    # The fitness is the sum over the views, every view is scored with the shared intrinsics
+    assert best_fitness == pytest.approx(algorithm.view_fitness(best_genome.dna).sum())
+    assert best_fitness > algorithm.view_fitness(start_dna).sum()
+    camera_dna = multi_view_parameters.split_dna(best_genome.dna)
+    np.testing.assert_array_equal(camera_dna[0, INTRINSIC_GENES], camera_dna[1, INTRINSIC_GENES])
+    # The scoring threads do not outlive the run
+    assert algorithm._executor is None
@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+
+from evolution.base.base_genome import BaseGenome
+from evolution.base.base_result import BaseResult
+from evolution.strategies.crossover import Uniform
+from evolution.strategies.fitness import DistanceMap
+from evolution.strategies.mutation import BoundedUniformMutation
+from evolution.strategies.populate import ValueUniformPopulation
+from evolution.strategies.selection import Tournament
+from evolution.strategies.strategy_bundle import StrategyBundle
+from evolution.strategies.termination import MaxIteration
+from evolution.sweep.run_archive import RunArchive
+from evolution.sweep.sweep_report import RunRecord
+
+
+def _record(bundle: str, seed: int, history) -> RunRecord:
+    return RunRecord(bundle=bundle, seed=seed, n_generations=len(history), converged_generation=0,
+                     best_fitness=float(max(history)), reprojection_error=np.nan, n_evaluations=10, wall_time=1.0,
+                     best_dna=np.arange(15, dtype=np.float64), history=np.asarray(history, dtype=np.float64))
+
+
+def _result(history) -> BaseResult:
+    result = BaseResult()
+    for fitness in history:
+        result.add_generation(0, None, fitness, BaseGenome(np.zeros(15)), fitness)
+    return result
+
+
+def test_append_result_keys_on_all_strategy_parameters(genome_parameters, tmp_path):
+    archive = RunArchive(str(tmp_path))
+    bundles = [StrategyBundle(ValueUniformPopulation(16), DistanceMap(log_div=log_div), Tournament(4), Uniform(p),
+                              BoundedUniformMutation(genome_parameters), MaxIteration(10))
+               for log_div in [.1, .3] for p in [.3, .5]]
+    for bundle in bundles:
+        archive.append_result(bundle, 0, _result([1.0, 2.0]))
+    assert len(archive.bundles) == 4
+    for i, bundle in enumerate(bundles):
+        assert list(archive.find(bundle.identifier, 0)) == [i]
+
+
+def test_append_after_crashed_writer(tmp_path):
+    archive = RunArchive(str(tmp_path))
+    archive.append([_record("a", 0, [1.0, 2.0, 3.0])])
+    # A writer crashed in the middle of every file
+    for file_name, partial in [("bundles.jsonl", b'[123, "b'), ("histories.bin", b"\x01\x02\x03"),
+                               ("runs.bin", b"\x04\x05")]:
+        with open(os.path.join(str(tmp_path), file_name), "ab") as file:
+            file.write(partial)
+
+    reopened = RunArchive(str(tmp_path))
+    assert len(reopened) == 1
+    reopened.append([_record("b", 1, [4.0, 5.0])])
+
+    archive = RunArchive(str(tmp_path))
+    assert archive.bundles == ["a", "b"]
+    assert list(archive.history(0)) == [1.0, 2.0, 3.0]
+    assert list(archive.history(1)) == [4.0, 5.0]
+    assert list(archive.find("b", 1)) == [1]
+    np.testing.assert_array_equal(archive.histories(), [[1.0, 2.0, 3.0], [4.0, 5.0, np.nan]])
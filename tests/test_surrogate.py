@@ -0,0 +1,69 @@
+import numpy as np
+
+from evolution.base.base_geometry import geometry_levels
+from evolution.base.base_surrogate_evaluation import SurrogateEvaluation
+from evolution.camera.camera_algorithm import GeneticCameraAlgorithm
+from evolution.strategies.crossover import TwoPoint
+from evolution.strategies.detail import GenerationDetail
+from evolution.strategies.fitness import DistanceMapWithPunishment, DistanceMap
+from evolution.strategies.mutation import BoundedUniformMutation
+from evolution.strategies.populate import ValueUniformPopulation
+from evolution.strategies.selection import Tournament
+from evolution.strategies.strategy_bundle import StrategyBundle
+from evolution.strategies.surrogate import KNearestNeighbours, RadialBasis
+from evolution.strategies.termination import MaxIteration
+
+
+class _RecordingSurrogate(KNearestNeighbours):
+    def __init__(self) -> None:
+        super().__init__()
+        self.n_samples_at_reset = []
+
+    def reset(self) -> None:
+        self.n_samples_at_reset.append(self.n_samples)
+        super().reset()
+
+
+def test_level_switches_and_runs_empty_the_surrogate(genome_parameters, geometry, edge_image, start_dna):
+    surrogate = _RecordingSurrogate()
+    surrogate_evaluation = SurrogateEvaluation(surrogate, n_warmup=32)
+    strategy_bundle = StrategyBundle(ValueUniformPopulation(16),
+                                     DistanceMapWithPunishment(DistanceMap.DistanceType.L2, .3),
+                                     Tournament(4),
+                                     TwoPoint(),
+                                     BoundedUniformMutation(genome_parameters),
+                                     MaxIteration(8))
+    algorithm = GeneticCameraAlgorithm(genome_parameters, strategy_bundle, edge_image, geometry,
+                                       geometry_levels=geometry_levels(geometry, (0.5, 1.0)),
+                                       detail_schedule=GenerationDetail([4]), evaluation_backend=surrogate_evaluation)
+    algorithm.run(start_dna)
+    # Emptied at the start of the run and at the level switch after the 4th generation
+    assert len(surrogate.n_samples_at_reset) == 2
+    assert surrogate.n_samples_at_reset[0] == 0 and surrogate.n_samples_at_reset[1] > 0
+
+    algorithm.run(start_dna)
+    assert len(surrogate.n_samples_at_reset) == 4
+    assert surrogate.n_samples_at_reset[2] > 0
+
+
+def test_radial_basis_fits_once_per_prediction(monkeypatch):
+    normalized_dna = np.random.uniform(0, 1, (40, 5))
+    fitness = np.sum(normalized_dna, axis=1)
+    batch_surrogate = RadialBasis()
+    batch_surrogate.update(normalized_dna, fitness)
+
+    n_fits = []
+    lstsq = np.linalg.lstsq
+    monkeypatch.setattr(np.linalg, "lstsq", lambda *args, **kwargs: n_fits.append(1) or lstsq(*args, **kwargs))
+    surrogate = RadialBasis()
+    for dna, value in zip(normalized_dna, fitness):
+        surrogate.update(dna[None], [value])
+    assert len(n_fits) == 0
+
+    queries = np.random.uniform(0, 1, (10, 5))
+    np.testing.assert_allclose(surrogate.predict(queries), batch_surrogate.predict(queries))
+    surrogate.predict(queries)
+    assert len(n_fits) == 2  # the batch fitted surrogate and a single fit of the incrementally updated surrogate
+
+    surrogate.reset()
+    assert surrogate.n_samples == 0
@@ -0,0 +1,29 @@
+from conftest import PARAMETERS_FILE, GEOMETRY_FILE, IMAGE_SHAPE
+from evolution.strategies.crossover import TwoPoint
+from evolution.strategies.fitness import DistanceMapWithPunishment, DistanceMap
+from evolution.strategies.mutation import BoundedUniformMutation
+from evolution.strategies.populate import ValueUniformPopulation
+from evolution.strategies.selection import Tournament
+from evolution.strategies.termination import MaxIteration
+from evolution.sweep.strategy_grid import StrategyGrid
+from evolution.sweep.strategy_spec import StrategySpec
+from evolution.sweep.sweep_runner import SweepRunner
+
+
+def small_grid():
+    return StrategyGrid([StrategySpec(ValueUniformPopulation, population_size=16)],
+                        StrategySpec.grid(DistanceMapWithPunishment, distance_type=[DistanceMap.DistanceType.L2],
+                                          log_div=[0.1, 0.3]),
+                        [StrategySpec(Tournament, tournament_size=4)],
+                        [StrategySpec(TwoPoint)],
+                        [StrategySpec(BoundedUniformMutation)],
+                        [StrategySpec(MaxIteration, max_generations=3)])
+
+
+def test_parameter_variants_are_reported_separately(edge_image, start_dna):
+    runner = SweepRunner(PARAMETERS_FILE, IMAGE_SHAPE, GEOMETRY_FILE, edge_image, n_workers=1)
+    report = runner.run(small_grid().expand(), [0, 1], start_dna)
+    rows = report.table()
+    assert len(rows) == 2
+    assert all(row["n_runs"] == 2 for row in rows)
+    assert any("log_div=0.1" in row["bundle"] for row in rows)